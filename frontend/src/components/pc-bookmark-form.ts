@@ -9,10 +9,14 @@ export default class PCBookmarkFormElement extends LitElement {
     urlField?: HTMLInputElement | null;
     titleField?: HTMLInputElement | null;
     descriptionField?: HTMLTextAreaElement | null;
+    tagsField?: HTMLInputElement | null;
+    tagSuggestions?: HTMLDataListElement;
     submitButton?: HTMLButtonElement | null;
 
     autoSubmitDelay = 500;
     isUnfurlLoading = false;
+    unfurlPollInterval = 1000;
+    unfurlPollAttempts = 20;
 
     refreshButtonOriginalContent?: string;
 
@@ -25,6 +29,8 @@ export default class PCBookmarkFormElement extends LitElement {
         return {
             isUnfurlLoading: { type: Boolean },
             autoSubmitDelay: { type: Number },
+            unfurlPollInterval: { type: Number },
+            unfurlPollAttempts: { type: Number },
         };
     }
 
@@ -76,6 +82,25 @@ export default class PCBookmarkFormElement extends LitElement {
         this.descriptionField = this.querySelector(
             "textarea[name=description]"
         );
+
+        // The server queued the unfurl instead of waiting on it, so poll
+        if (this.hasAttribute("unfurl-pending")) {
+            this.pollUnfurl();
+        }
+
+        this.tagsField = this.querySelector("input[name=tags]");
+        if (this.tagsField) {
+            this.tagSuggestions = document.createElement("datalist");
+            this.tagSuggestions.id = "pc-bookmark-form-tag-suggestions";
+            this.tagsField.after(this.tagSuggestions);
+            this.tagsField.setAttribute("list", this.tagSuggestions.id);
+            this.tagsField.setAttribute("autocomplete", "off");
+            this.tagsField.addEventListener(
+                "input",
+                delayFn(this.onTagsInput.bind(this), 150),
+                commonEventOptions
+            );
+        }
     }
 
     disconnectCallback() {
@@ -88,38 +113,47 @@ export default class PCBookmarkFormElement extends LitElement {
         }
     }
 
-    async onUnfurlRefresh() {
-        this.isUnfurlLoading = true;
+    async onTagsInput() {
+        if (!this.tagsField || !this.tagSuggestions) return;
 
-        try {
-            const urlField: HTMLInputElement | null =
-                this.querySelector("input[name=url]");
-            if (urlField) {
-                const { value } = urlField;
-                const params = new URLSearchParams({ href: value });
+        // Complete the last space-separated tag, keeping the ones before it
+        const { value } = this.tagsField;
+        const splitAt = value.lastIndexOf(" ") + 1;
+        const head = value.slice(0, splitAt);
+        const prefix = value.slice(splitAt);
+
+        let names: string[] = [];
+        if (prefix) {
+            try {
+                const params = new URLSearchParams({ q: prefix });
                 const resp = await fetch(
-                    `/bookmarks/unfurl?${params.toString()}`
+                    `/bookmarks/tags/suggest?${params.toString()}`
                 );
                 if (resp.status === 200) {
-                    const unfurlDataField: HTMLTextAreaElement | null =
-                        this.querySelector(
-                            ".unfurl-data textarea[name=unfurl_metadata]"
-                        );
-                    if (unfurlDataField) {
-                        const { title, description, ...data } =
-                            await resp.json();
-                        if (this.titleField && !this.titleField.value) {
-                            this.titleField.value = title;
-                        }
-                        if (
-                            this.descriptionField &&
-                            !this.descriptionField.value
-                        ) {
-                            this.descriptionField.value = description;
-                        }
-                        unfurlDataField.value = JSON.stringify(data, null, 2);
-                    }
+                    const { tags } = await resp.json();
+                    names = tags.map((tag: { name: string }) => tag.name);
                 }
+            } catch (err: any) {
+                console.error("tag suggestions failed", err);
+            }
+        }
+
+        this.tagSuggestions.replaceChildren(
+            ...names.map((name) => {
+                const option = document.createElement("option");
+                option.value = `${head}${name} `;
+                return option;
+            })
+        );
+    }
+
+    async onUnfurlRefresh() {
+        this.isUnfurlLoading = true;
+
+        try {
+            const resp = await this.fetchUnfurl();
+            if (resp && resp.status === 200) {
+                this.applyUnfurl(await resp.json());
             }
         } catch (err: any) {
             console.error("unfurl refresh failed", err);
@@ -127,6 +161,63 @@ export default class PCBookmarkFormElement extends LitElement {
 
         this.isUnfurlLoading = false;
     }
+
+    async pollUnfurl() {
+        this.isUnfurlLoading = true;
+
+        try {
+            for (
+                let attempt = 0;
+                attempt < this.unfurlPollAttempts;
+                attempt++
+            ) {
+                const resp = await this.fetchUnfurl({ cached: "1" });
+                // 202 means the unfurl is still queued or running
+                if (!resp || resp.status !== 202) {
+                    if (resp && resp.status === 200) {
+                        this.applyUnfurl(await resp.json());
+                    }
+                    break;
+                }
+                await new Promise((resolve) =>
+                    setTimeout(resolve, this.unfurlPollInterval)
+                );
+            }
+        } catch (err: any) {
+            console.error("unfurl poll failed", err);
+        }
+
+        this.isUnfurlLoading = false;
+    }
+
+    async fetchUnfurl(extraParams: Record<string, string> = {}) {
+        const urlField: HTMLInputElement | null =
+            this.querySelector("input[name=url]");
+        if (!urlField || !urlField.value) return null;
+
+        const params = new URLSearchParams({
+            href: urlField.value,
+            ...extraParams,
+        });
+        return fetch(`/bookmarks/unfurl?${params.toString()}`, {
+            signal: this.disconnectAbortSignal.signal,
+        });
+    }
+
+    applyUnfurl({ title, description, ...data }: Record<string, any>) {
+        const unfurlDataField: HTMLTextAreaElement | null = this.querySelector(
+            ".unfurl-data textarea[name=unfurl_metadata]"
+        );
+        if (!unfurlDataField) return;
+
+        if (this.titleField && !this.titleField.value) {
+            this.titleField.value = title;
+        }
+        if (this.descriptionField && !this.descriptionField.value) {
+            this.descriptionField.value = description;
+        }
+        unfurlDataField.value = JSON.stringify(data, null, 2);
+    }
 }
 
 customElements.define("pc-bookmark-form", PCBookmarkFormElement);
@@ -5,6 +5,8 @@ import BatchQueue from "../utils/batch-queue";
 import "./pc-feed.css";
 
 const DEFAULT_PER_FEED_LIMIT = 100;
+const REFRESH_POLL_INTERVAL = 2000;
+const REFRESH_POLL_ATTEMPTS = 30;
 
 export default class PCFeedElement extends LitElement {
   url?: string;
@@ -180,6 +182,17 @@ export class PCFeedElementManager extends ElementManager<PCFeedElement> {
     }
 
     const results = await response.json();
+    this.applyResults(batch, results);
+
+    // A POST queues polls in the background - check back for their results
+    const refreshToken = response.headers.get("X-Refresh-Token");
+    if (refreshToken) {
+      const refreshed = await this.waitForRefresh(refreshToken);
+      if (refreshed) this.applyResults(batch, refreshed);
+    }
+  }
+
+  applyResults(batch: FetchFeedQueueJob[], results: any) {
     for (const { element, url } of batch) {
       const result = results[url];
       element.isLoading = false;
@@ -192,6 +205,24 @@ export class PCFeedElementManager extends ElementManager<PCFeedElement> {
       }
     }
   }
+
+  async waitForRefresh(token: string): Promise<any | null> {
+    const params = new URLSearchParams();
+    params.set("per_feed_limit", String(this.perFeedLimit));
+    if (this.since) params.set("since", this.since);
+
+    for (let attempt = 0; attempt < REFRESH_POLL_ATTEMPTS; attempt++) {
+      await new Promise((resolve) =>
+        setTimeout(resolve, REFRESH_POLL_INTERVAL)
+      );
+      const response = await fetch(
+        `/feeds/refresh/${encodeURIComponent(token)}?${params.toString()}`
+      );
+      if (response.status === 200) return response.json();
+      if (response.status !== 202) return null;
+    }
+    return null;
+  }
 }
 
 interface FetchFeedQueueJob {
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Bookmark, Tag, ImportJob
+from .models import Bookmark, BookmarkTag, Tag, ImportJob
 from .tasks import unfurl_bookmark_metadata
 
 
@@ -11,12 +11,18 @@ class TagAdmin(admin.ModelAdmin):
     ordering = ("name",)
 
 
+class BookmarkTagInline(admin.TabularInline):
+    model = BookmarkTag
+    autocomplete_fields = ("tag",)
+    extra = 0
+
+
 @admin.register(Bookmark)
 class BookmarkAdmin(admin.ModelAdmin):
     list_display = ("title", "url", "owner", "created_at")
     list_filter = ("owner",)
     search_fields = ("title", "url", "description")
-    autocomplete_fields = ("tags",)
+    inlines = [BookmarkTagInline]
     readonly_fields = ("unique_hash", "unfurl_metadata")
     actions = ["unfurl_selected_bookmarks"]
     fieldsets = (
@@ -28,7 +34,6 @@ class BookmarkAdmin(admin.ModelAdmin):
                     "url",
                     "title",
                     "description",
-                    "tags",
                 )
             },
         ),
@@ -37,12 +42,30 @@ class BookmarkAdmin(admin.ModelAdmin):
             {
                 "fields": (
                     "unique_hash",
+                    "feed_url",
+                    "image_url",
+                    "site_name",
                     "unfurl_metadata",
                 ),
             },
         ),
     )
 
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not BookmarkTag:
+            return super().save_formset(request, form, formset, change)
+        # Go through the M2M manager so tag counts and the search index,
+        # which follow m2m_changed signals, stay in step. Saving without
+        # commit only collects the changes the admin log reports.
+        formset.save(commit=False)
+        tags = [
+            inline_form.cleaned_data["tag"]
+            for inline_form in formset.forms
+            if inline_form.cleaned_data.get("tag")
+            and not inline_form.cleaned_data.get("DELETE")
+        ]
+        form.instance.tags.set(tags)
+
     def get_list_filter(self, request):
         # Only show owner filter, hide tags filter
         return ("owner",)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BookmarksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pebbling_apps.bookmarks"
+
+    def ready(self):
+        import pebbling_apps.bookmarks.signals
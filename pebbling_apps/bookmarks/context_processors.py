@@ -13,6 +13,17 @@ DEFAULT_SHOW_ATTACHMENTS = [
 ]
 
 
+def get_show_attachments(request) -> List[str]:
+    """Attachment names requested with ?show=, or the defaults."""
+    valid_attachmennt_names = [item.value for item in BookmarkAttachmentNames]
+
+    show_param = request.GET.get("show") or ""
+    show_list = [
+        item for item in show_param.split(",") if item in valid_attachmennt_names
+    ]
+    return show_list or DEFAULT_SHOW_ATTACHMENTS
+
+
 def bookmark_context(request):
     context = {
         "BookmarkAttachmentNames": BookmarkAttachmentNames,
@@ -20,12 +31,7 @@ def bookmark_context(request):
 
     valid_attachmennt_names = [item.value for item in BookmarkAttachmentNames]
 
-    show_param = request.GET.get("show") or ""
-    show_list = [
-        item for item in show_param.split(",") if item in valid_attachmennt_names
-    ]
-    if not show_list:
-        show_list = DEFAULT_SHOW_ATTACHMENTS
+    show_list = get_show_attachments(request)
     context["show_attachments"] = show_list
 
     open_param = request.GET.get("open") or DEFAULT_OPEN_ATTACHMENT
@@ -1,4 +1,3 @@
-import json
 from django.utils.html import escape
 from datetime import datetime
 import xml.etree.ElementTree as ET
@@ -51,23 +50,9 @@ class NetscapeBookmarkExporter:
         if bookmark.unique_hash:
             bookmark_html += f' ID="{escape(bookmark.unique_hash)}"'
 
-        # Add feed URL from unfurl metadata if present
-        if bookmark.unfurl_metadata:
-            try:
-                # unfurl_metadata might be a string or an UnfurlMetadata object
-                if isinstance(bookmark.unfurl_metadata, str):
-                    metadata = json.loads(bookmark.unfurl_metadata)
-                    feed_url = metadata.get("feed")
-                else:
-                    # For UnfurlMetadata objects, check if feed is set and not the default "No Feed"
-                    feed_url = getattr(bookmark.unfurl_metadata, "feed", None)
-                    if feed_url == "No Feed":
-                        feed_url = None
-
-                if feed_url:
-                    bookmark_html += f' FEED="{escape(feed_url)}"'
-            except (json.JSONDecodeError, TypeError, AttributeError):
-                pass
+        # Add the feed URL found when the bookmark was unfurled, if any
+        if bookmark.feed_url:
+            bookmark_html += f' FEED="{escape(bookmark.feed_url)}"'
 
         # Add tags if present
         tags = bookmark.tags.all()
@@ -178,23 +163,11 @@ class OPMLBookmarkExporter:
             tag_names = [tag.name for tag in tags]
             attrs["category"] = ",".join(tag_names)
 
-        # Check for feed URL in unfurl metadata
-        if bookmark.unfurl_metadata:
-            try:
-                if isinstance(bookmark.unfurl_metadata, str):
-                    metadata = json.loads(bookmark.unfurl_metadata)
-                    feed_url = metadata.get("feed")
-                else:
-                    feed_url = getattr(bookmark.unfurl_metadata, "feed", None)
-                    if feed_url == "No Feed":
-                        feed_url = None
-
-                if feed_url:
-                    # Add RSS feed URL for subscription lists
-                    attrs["xmlUrl"] = feed_url
-                    attrs["type"] = "rss"  # Override type for RSS feeds
-            except (json.JSONDecodeError, TypeError, AttributeError):
-                pass
+        # Check for the feed URL found when the bookmark was unfurled
+        if bookmark.feed_url:
+            # Add RSS feed URL for subscription lists
+            attrs["xmlUrl"] = bookmark.feed_url
+            attrs["type"] = "rss"  # Override type for RSS feeds
 
         # Use XMLGenerator to create the outline element
         output = StringIO()
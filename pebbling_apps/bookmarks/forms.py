@@ -1,5 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from django.conf import settings
+from pebbling_apps.unfurl.forms import UnfurlMetadataFormField
 from .models import Bookmark, Tag
 
 
@@ -38,6 +40,10 @@ class TagsFormField(forms.CharField):
 
 class BookmarkForm(forms.ModelForm):
     tags = TagsFormField()
+    # Not a model field: saved to the shared unfurl record on save
+    unfurl_metadata = UnfurlMetadataFormField(
+        omit_html=getattr(settings, "OMIT_HTML_FROM_UNFURL_METADATA", True)
+    )
 
     class Meta:
         model = Bookmark
@@ -46,6 +52,8 @@ class BookmarkForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop("user", None)
         super().__init__(*args, **kwargs)
+        if self.instance.pk and "unfurl_metadata" not in self.initial:
+            self.initial["unfurl_metadata"] = self.instance.unfurl_metadata
         self.fields["tags"].user = self.user
         self.fields["tags"].widget.attrs["autofocus"] = True
         self.fields["description"].widget.attrs["rows"] = 5
@@ -0,0 +1,102 @@
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from pebbling_apps.bookmarks.models import Bookmark
+from pebbling_apps.bookmarks.search import BookmarkSearchIndex, filter_queryset_legacy
+
+
+class Command(BaseCommand):
+    help = """Compare search latency of the full-text index against icontains.
+
+    Each iteration evaluates one page of results plus the total count, which
+    is what a paginated bookmark list render costs.
+
+    Examples:
+        python manage.py benchmark_search python
+        python manage.py benchmark_search "django orm" css --user alice
+        python manage.py benchmark_search rust --iterations 50 --limit 25
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("queries", nargs="+", help="Search strings to time")
+        parser.add_argument(
+            "--user",
+            type=str,
+            default=None,
+            help="Only search bookmarks owned by this username",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=20,
+            help="Number of timed runs per query and path (default: 20)",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=10,
+            help="Page size to fetch per run (default: 10)",
+        )
+
+    def handle(self, *args, **options):
+        owner = None
+        if options["user"]:
+            User = get_user_model()
+            try:
+                owner = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" not found')
+
+        search_index = BookmarkSearchIndex()
+        if not search_index.is_supported():
+            raise CommandError(
+                f"No search index for the '{search_index.vendor}' backend"
+            )
+
+        base = Bookmark.objects.query(owner=owner)
+        self.stdout.write(
+            f"Benchmarking {len(options['queries'])} queries over "
+            f"{base.count()} bookmarks, {options['iterations']} iterations each"
+        )
+
+        for search in options["queries"]:
+            paths = {
+                "icontains": lambda: filter_queryset_legacy(base, search),
+                "fulltext": lambda: search_index.filter_queryset(base, search),
+            }
+            results = {}
+            for name, build_queryset in paths.items():
+                timings, total = self.time_path(
+                    build_queryset, options["iterations"], options["limit"]
+                )
+                results[name] = timings
+                self.stdout.write(
+                    f"  {search!r:24} {name:10} "
+                    f"median {statistics.median(timings):8.2f}ms  "
+                    f"p95 {self.percentile(timings, 95):8.2f}ms  "
+                    f"matches {total}"
+                )
+
+            speedup = statistics.median(results["icontains"]) / max(
+                statistics.median(results["fulltext"]), 0.001
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f"  {search!r:24} speedup {speedup:.1f}x")
+            )
+
+    def time_path(self, build_queryset, iterations, limit):
+        timings = []
+        total = 0
+        for _ in range(iterations):
+            started = time.perf_counter()
+            queryset = build_queryset()
+            total = queryset.count()
+            list(queryset[:limit])
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings, total
+
+    def percentile(self, values, percent):
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return ordered[index]
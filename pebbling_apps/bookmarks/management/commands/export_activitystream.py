@@ -9,6 +9,7 @@ from django.contrib.auth import get_user_model
 
 from pebbling_apps.common.utils import parse_since
 from ...models import Bookmark, Tag
+from ...tag_filter import TagFilter
 from ...serializers import ActivityStreamSerializer
 from ...streaming import stream_bookmark_collection
 
@@ -68,7 +69,7 @@ class Command(BaseCommand):
         # Validate tags
         if tags:
             for tag_name in tags:
-                if not Tag.objects.filter(name=tag_name).exists():
+                if not Tag.objects.filter(name=tag_name, owner=user).exists():
                     raise CommandError(f"Tag '{tag_name}' does not exist")
 
         # Parse since parameter
@@ -81,17 +82,11 @@ class Command(BaseCommand):
 
         # Get bookmarks query with optimized prefetching
         bookmarks = (
-            Bookmark.objects.query(owner=user)
-            .prefetch_related("tags")
+            Bookmark.objects.query(owner=user, tags=TagFilter(all_of=tuple(tags or ())))
+            .prefetch_related("tags", "unfurl_record")
             .select_related("owner")
         )
 
-        # Apply tag filtering
-        if tags:
-            for tag_name in tags:
-                bookmarks = bookmarks.filter(tags__name=tag_name)
-            bookmarks = bookmarks.distinct()
-
         # Apply date filtering
         if since_date:
             bookmarks = bookmarks.filter(created_at__gte=since_date)
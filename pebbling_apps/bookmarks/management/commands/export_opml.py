@@ -7,6 +7,7 @@ from django.contrib.auth import get_user_model
 
 from pebbling_apps.common.utils import parse_since
 from ...models import Bookmark, Tag
+from ...tag_filter import TagFilter
 from ...exporters import OPMLBookmarkExporter
 
 logger = logging.getLogger(__name__)
@@ -59,7 +60,7 @@ class Command(BaseCommand):
         # Validate tags
         if tags:
             for tag_name in tags:
-                if not Tag.objects.filter(name=tag_name).exists():
+                if not Tag.objects.filter(name=tag_name, owner=user).exists():
                     raise CommandError(f"Tag '{tag_name}' does not exist")
 
         # Parse since parameter
@@ -71,13 +72,9 @@ class Command(BaseCommand):
                 raise CommandError(f"Invalid 'since' parameter: {str(e)}")
 
         # Get bookmarks query
-        bookmarks = Bookmark.objects.query(owner=user).prefetch_related("tags")
-
-        # Apply tag filtering
-        if tags:
-            for tag_name in tags:
-                bookmarks = bookmarks.filter(tags__name=tag_name)
-            bookmarks = bookmarks.distinct()
+        bookmarks = Bookmark.objects.query(
+            owner=user, tags=TagFilter(all_of=tuple(tags or ()))
+        ).prefetch_related("tags")
 
         # Apply date filtering
         if since_date:
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from pebbling_apps.bookmarks.search import BookmarkSearchIndex
+
+
+class Command(BaseCommand):
+    help = "Rebuild the bookmark full-text search index from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of bookmarks to index per batch (default: 1000)",
+        )
+        parser.add_argument(
+            "--database",
+            type=str,
+            default=None,
+            help="Database alias holding bookmarks (default: routed alias)",
+        )
+
+    def handle(self, *args, **options):
+        search_index = BookmarkSearchIndex(using=options["database"])
+
+        if not search_index.is_supported():
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No search index for the '{search_index.vendor}' backend; "
+                    "searches use icontains matching."
+                )
+            )
+            return
+
+        def report_progress(indexed):
+            self.stdout.write(f"  Indexed {indexed} bookmarks")
+
+        indexed = search_index.rebuild(
+            batch_size=options["batch_size"], progress=report_progress
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt search index with {indexed} bookmarks")
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from pebbling_apps.bookmarks.models import BookmarkCount, Tag
+
+
+class Command(BaseCommand):
+    help = """Recompute cached bookmark and tag usage counts, repairing drift.
+
+    Counts are maintained incrementally by signals, so writes that bypass
+    them (bulk_create, raw SQL, restores) can leave totals out of step.
+
+    Examples:
+        python manage.py reconcile_bookmark_counts
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            type=str,
+            default=None,
+            help="Database alias holding bookmarks (default: routed alias)",
+        )
+
+    def handle(self, *args, **options):
+        counts = BookmarkCount.objects.db_manager(options["database"])
+        repaired = counts.reconcile()
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} bookmark counts"))
+
+        tags = Tag.objects.db_manager(options["database"])
+        recounted = tags.recount_usage()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired usage counts for {recounted} tags")
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from pebbling_apps.bookmarks.models import FeedActivity
+
+
+class Command(BaseCommand):
+    help = """Copy feed newest item dates into the bookmarks feed activity projection.
+
+    Feed polling keeps the projection current. Run this after migrating a
+    separate feeds database or to repair drift.
+
+    Examples:
+        python manage.py sync_feed_activity
+        python manage.py sync_feed_activity --batch-size 2000
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of feeds to write per batch (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        synced = FeedActivity.objects.sync_from_feeds(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Synced activity for {synced} feeds"))
@@ -0,0 +1,105 @@
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS bookmarks_bookmark_fts USING fts5(
+        title,
+        description,
+        url,
+        tags,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO bookmarks_bookmark_fts (rowid, title, description, url, tags)
+    SELECT
+        b.id,
+        COALESCE(b.title, ''),
+        COALESCE(b.description, ''),
+        COALESCE(b.url, ''),
+        COALESCE(
+            (
+                SELECT group_concat(t.name, ' ')
+                FROM bookmarks_bookmark_tags bt
+                JOIN bookmarks_tag t ON t.id = bt.tag_id
+                WHERE bt.bookmark_id = b.id
+            ),
+            ''
+        )
+    FROM bookmarks_bookmark b
+    """,
+]
+
+SQLITE_REVERSE = ["DROP TABLE IF EXISTS bookmarks_bookmark_fts"]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE TABLE IF NOT EXISTS bookmarks_bookmark_search (
+        bookmark_id bigint PRIMARY KEY
+            REFERENCES bookmarks_bookmark (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS bookmarks_bookmark_search_document_gin
+    ON bookmarks_bookmark_search USING GIN (document)
+    """,
+    """
+    INSERT INTO bookmarks_bookmark_search (bookmark_id, document)
+    SELECT
+        b.id,
+        setweight(to_tsvector('simple', COALESCE(b.title, '')), 'A')
+        || setweight(to_tsvector('simple', COALESCE(b.description, '')), 'C')
+        || setweight(to_tsvector('simple', COALESCE(b.url, '')), 'D')
+        || setweight(
+            to_tsvector(
+                'simple',
+                COALESCE(
+                    (
+                        SELECT string_agg(t.name, ' ')
+                        FROM bookmarks_bookmark_tags bt
+                        JOIN bookmarks_tag t ON t.id = bt.tag_id
+                        WHERE bt.bookmark_id = b.id
+                    ),
+                    ''
+                )
+            ),
+            'B'
+        )
+    FROM bookmarks_bookmark b
+    ON CONFLICT (bookmark_id) DO NOTHING
+    """,
+]
+
+POSTGRES_REVERSE = ["DROP TABLE IF EXISTS bookmarks_bookmark_search"]
+
+
+def _run_statements(schema_editor, statements_by_vendor):
+    statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    """Create and backfill the full-text index for the current backend."""
+    _run_statements(
+        schema_editor, {"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    _run_statements(
+        schema_editor, {"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarks", "0013_fix_tag_unique_constraint"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
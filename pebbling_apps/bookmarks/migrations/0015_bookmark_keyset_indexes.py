@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-16 22:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarks", "0014_bookmark_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["owner", "created_at", "id"],
+                name="bookmarks_b_owner_i_265380_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["created_at", "id"], name="bookmarks_b_created_4c09ae_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["owner", "title", "id"], name="bookmarks_b_owner_i_6fdb02_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["title", "id"], name="bookmarks_b_title_a36b7a_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.1.6 on 2026-10-16 22:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_bookmark_counts(apps, schema_editor):
+    """Seed per-owner and per-owner-and-tag totals with grouped counts."""
+    db_alias = schema_editor.connection.alias
+    Bookmark = apps.get_model("bookmarks", "Bookmark")
+    BookmarkCount = apps.get_model("bookmarks", "BookmarkCount")
+
+    owner_totals = (
+        Bookmark.objects.using(db_alias).values("owner").annotate(total=Count("id"))
+    )
+    tag_totals = (
+        Bookmark.tags.through.objects.using(db_alias)
+        .values("bookmark__owner", "tag")
+        .annotate(total=Count("id"))
+    )
+
+    rows = [
+        BookmarkCount(owner_id=row["owner"], count=row["total"]) for row in owner_totals
+    ]
+    rows += [
+        BookmarkCount(
+            owner_id=row["bookmark__owner"], tag_id=row["tag"], count=row["total"]
+        )
+        for row in tag_totals
+    ]
+    BookmarkCount.objects.using(db_alias).bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarks", "0015_bookmark_keyset_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookmarkCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="bookmarks.tag",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("tag__isnull", True)),
+                        fields=("owner",),
+                        name="unique_bookmark_count_owner",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("tag__isnull", False)),
+                        fields=("owner", "tag"),
+                        name="unique_bookmark_count_owner_tag",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_bookmark_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.1.6 on 2026-10-16 22:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import DatabaseError, migrations, models, router
+
+
+def backfill_feed_activity(apps, schema_editor):
+    """
+    Copy newest item dates from feeds.Feed. With SQLITE_MULTIPLE_DB the feeds
+    database may not be migrated yet; `manage.py sync_feed_activity` fills
+    the projection in later if so.
+    """
+    Feed = apps.get_model("feeds", "Feed")
+    FeedActivity = apps.get_model("bookmarks", "FeedActivity")
+
+    feeds = Feed.objects.using(router.db_for_read(Feed)).filter(
+        newest_item_date__isnull=False
+    )
+    try:
+        rows = [
+            FeedActivity(feed_url=url, newest_item_date=newest_item_date)
+            for url, newest_item_date in feeds.values_list("url", "newest_item_date")
+        ]
+    except DatabaseError:
+        return
+
+    FeedActivity.objects.using(schema_editor.connection.alias).bulk_create(
+        rows, batch_size=500, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarks", "0016_bookmark_count"),
+        ("feeds", "0008_fix_poll_feeds_priority"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("feed_url", models.URLField(max_length=2048, unique=True)),
+                ("newest_item_date", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "feed activity",
+                "indexes": [
+                    models.Index(
+                        fields=["newest_item_date"],
+                        name="bookmarks_f_newest__e30902_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="bookmark",
+            name="feed_activity",
+            field=models.ForeignObject(
+                from_fields=["feed_url"],
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="bookmarks.feedactivity",
+                to_fields=["feed_url"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookmark",
+            index=models.Index(
+                fields=["feed_url"], name="bookmarks_b_feed_ur_81fbf0_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_feed_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Cover tag-filter semi-joins on the auto-created bookmark/tag through
+    table. Its unique (bookmark_id, tag_id) index serves lookups by bookmark;
+    this one serves "bookmarks carrying tag X" without visiting table rows.
+    """
+
+    dependencies = [
+        ("bookmarks", "0017_feed_activity"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS bookmarks_bookmark_tags_tag_bookmark_idx "
+            "ON bookmarks_bookmark_tags (tag_id, bookmark_id)",
+            "DROP INDEX IF EXISTS bookmarks_bookmark_tags_tag_bookmark_idx",
+        ),
+    ]
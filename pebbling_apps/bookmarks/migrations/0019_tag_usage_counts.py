@@ -0,0 +1,75 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:01
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_tag_usage(apps, schema_editor):
+    """Seed usage counters and last use from the existing tag links."""
+    db_alias = schema_editor.connection.alias
+    Tag = apps.get_model("bookmarks", "Tag")
+    Bookmark = apps.get_model("bookmarks", "Bookmark")
+    InboxItem = apps.get_model("inbox", "InboxItem")
+
+    def per_tag(through, aggregate):
+        return Subquery(
+            through.objects.filter(tag_id=OuterRef("pk"))
+            .values("tag_id")
+            .annotate(value=aggregate)
+            .values("value")[:1]
+        )
+
+    Tag.objects.using(db_alias).update(
+        bookmark_count=Coalesce(per_tag(Bookmark.tags.through, Count("id")), 0),
+        inbox_item_count=Coalesce(per_tag(InboxItem.tags.through, Count("id")), 0),
+        last_used_at=per_tag(Bookmark.tags.through, Max("bookmark__created_at")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarks", "0018_bookmark_tags_tag_bookmark_index"),
+        ("inbox", "0005_populate_source_type_improved"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tag",
+            name="bookmark_count",
+            field=models.IntegerField(
+                default=0, help_text="Number of bookmarks carrying this tag"
+            ),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="inbox_item_count",
+            field=models.IntegerField(
+                default=0, help_text="Number of inbox items carrying this tag"
+            ),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="last_used_at",
+            field=models.DateTimeField(
+                blank=True, help_text="When this tag was last applied", null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tag",
+            index=models.Index(
+                fields=["owner", "bookmark_count"],
+                name="bookmarks_t_owner_i_680793_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tag",
+            index=models.Index(
+                fields=["owner", "last_used_at"], name="bookmarks_t_owner_i_69004e_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_tag_usage, migrations.RunPython.noop),
+    ]
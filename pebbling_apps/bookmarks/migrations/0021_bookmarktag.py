@@ -0,0 +1,75 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Declare the tags M2M's through table as the BookmarkTag model, so that
+    the (tag_id, bookmark_id) index 0018 created with raw SQL is part of
+    the model state. The table already exists, so only the state changes;
+    the index is then renamed to fit the model index name limit.
+    """
+
+    dependencies = [
+        ("bookmarks", "0020_unfurl_record_columns"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="BookmarkTag",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "bookmark",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="bookmarks.bookmark",
+                            ),
+                        ),
+                        (
+                            "tag",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="bookmarks.tag",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "bookmarks_bookmark_tags",
+                        "indexes": [
+                            models.Index(
+                                fields=["tag", "bookmark"],
+                                name="bookmarks_bookmark_tags_tag_bookmark_idx",
+                            )
+                        ],
+                        "unique_together": {("bookmark", "tag")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="bookmark",
+                    name="tags",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        related_name="bookmarks",
+                        through="bookmarks.BookmarkTag",
+                        to="bookmarks.tag",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RenameIndex(
+            model_name="bookmarktag",
+            new_name="bookmark_tags_tag_bm_idx",
+            old_name="bookmarks_bookmark_tags_tag_bookmark_idx",
+        ),
+    ]
@@ -5,14 +5,16 @@ import functools
 from django.conf import settings
 from django.db import models
 from django.conf import settings
-from django.db import connection, connections
+from django.db import IntegrityError, connection, transaction
 from django.contrib.auth import get_user_model
 from pebbling_apps.common.models import QueryPage, TimestampedModel
 from pebbling_apps.common.utils import django_enum
-from pebbling_apps.unfurl.models import UnfurlMetadataField
+from pebbling_apps.unfurl.models import UnfurledModel
 from urllib.parse import urlparse
-from django.db.models import Case, When, Value, Q, F
-from django.db.models.expressions import RawSQL
+from django.db.models import Case, Count, When, Value, Q, F, Sum
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
 import logging
 
 
@@ -32,6 +34,57 @@ class TagManager(models.Manager):
         )
         return tag
 
+    def with_prefix(self, prefix):
+        """
+        Filter tags whose name starts with prefix, as a range scan that the
+        (owner, name) index can serve on every backend.
+        """
+        if not prefix:
+            return self.all()
+        return self.filter(name__gte=prefix, name__lt=prefix + "\U0010ffff")
+
+    def adjust_usage(self, tag_ids, field, delta):
+        """
+        Add delta to a usage counter (bookmark_count or inbox_item_count)
+        for the given tags, stamping last_used_at when usage grows.
+        """
+        tag_ids = list(tag_ids or [])
+        if not tag_ids or not delta:
+            return
+        updates = {field: F(field) + delta}
+        if delta > 0:
+            updates["last_used_at"] = now()
+        self.filter(id__in=tag_ids).update(**updates)
+
+    def recount_usage(self):
+        """
+        Recompute every tag's usage counters from the M2M tables.
+
+        Returns:
+            int: Number of tags whose counters changed
+        """
+        from pebbling_apps.inbox.models import InboxItem
+
+        def count_links(through):
+            return Subquery(
+                through.objects.filter(tag_id=OuterRef("pk"))
+                .values("tag_id")
+                .annotate(total=Count("id"))
+                .values("total")[:1],
+                output_field=models.IntegerField(),
+            )
+
+        bookmark_total = Coalesce(count_links(Bookmark.tags.through), 0)
+        inbox_total = Coalesce(count_links(InboxItem.tags.through), 0)
+        return (
+            self.annotate(bookmark_total=bookmark_total, inbox_total=inbox_total)
+            .filter(
+                ~Q(bookmark_count=F("bookmark_total"))
+                | ~Q(inbox_item_count=F("inbox_total"))
+            )
+            .update(bookmark_count=bookmark_total, inbox_item_count=inbox_total)
+        )
+
 
 class Tag(TimestampedModel):
     objects = TagManager()
@@ -40,11 +93,22 @@ class Tag(TimestampedModel):
     is_system = models.BooleanField(
         default=False, help_text="Whether this is a system-managed tag"
     )
+    bookmark_count = models.IntegerField(
+        default=0, help_text="Number of bookmarks carrying this tag"
+    )
+    inbox_item_count = models.IntegerField(
+        default=0, help_text="Number of inbox items carrying this tag"
+    )
+    last_used_at = models.DateTimeField(
+        null=True, blank=True, help_text="When this tag was last applied"
+    )
 
     class Meta:
         unique_together = ["name", "owner"]
         indexes = [
             models.Index(fields=["owner", "name"]),
+            models.Index(fields=["owner", "bookmark_count"]),
+            models.Index(fields=["owner", "last_used_at"]),
         ]
 
     def __str__(self):
@@ -56,6 +120,11 @@ class Tag(TimestampedModel):
         """Check if this is a system tag."""
         return self.is_system
 
+    @property
+    def usage_count(self):
+        """Total number of bookmarks and inbox items carrying this tag."""
+        return self.bookmark_count + self.inbox_item_count
+
 
 @django_enum
 class BookmarkSort(StrEnum):
@@ -72,6 +141,8 @@ class BookmarkSort(StrEnum):
     FEED_DESC = auto()
 
 
+BOOKMARK_FEED_SORTS = (BookmarkSort.FEED, BookmarkSort.FEED_ASC, BookmarkSort.FEED_DESC)
+
 BOOKMARK_SORT_COLUMNS = {
     BookmarkSort.DATE: "-created_at",
     BookmarkSort.DATE_ASC: "created_at",
@@ -84,86 +155,99 @@ BOOKMARK_SORT_COLUMNS = {
     BookmarkSort.FEED_DESC: "-newest_item_date",
 }
 
+# Keysets for cursor pagination: (field, descending) pairs matching each sort,
+# with id as a tie-breaker so that every row has a unique position.
+BOOKMARK_SORT_KEYSETS = {
+    BookmarkSort.DATE: [("created_at", True), ("id", True)],
+    BookmarkSort.DATE_ASC: [("created_at", False), ("id", False)],
+    BookmarkSort.DATE_DESC: [("created_at", True), ("id", True)],
+    BookmarkSort.TITLE: [("title", False), ("id", False)],
+    BookmarkSort.TITLE_ASC: [("title", False), ("id", False)],
+    BookmarkSort.TITLE_DESC: [("title", True), ("id", True)],
+    BookmarkSort.FEED: [("feed_newest_item_date", True), ("id", True)],
+    BookmarkSort.FEED_ASC: [("feed_newest_item_date", False), ("id", False)],
+    BookmarkSort.FEED_DESC: [("feed_newest_item_date", True), ("id", True)],
+}
 
-class BookmarkWithFeedsQuerySet(models.QuerySet):
-    """
-    Custom QuerySet for Bookmark model that interacts with the feeds database.
 
-    Kind of hacky and some queryset methods may be broken, mainly intended
-    to support the option to sort bookmarks by last new feed item date.
-    """
+class FeedActivityManager(models.Manager):
+    def record(self, feed_url, newest_item_date):
+        """
+        Advance the projected newest item date for a feed. Older dates are
+        ignored, so out-of-order polls cannot move a feed backwards.
+        """
+        if not feed_url or not newest_item_date:
+            return
+        advanced = (
+            self.filter(feed_url=feed_url)
+            .filter(
+                Q(newest_item_date__isnull=True)
+                | Q(newest_item_date__lt=newest_item_date)
+            )
+            .update(newest_item_date=newest_item_date)
+        )
+        if not advanced:
+            self.get_or_create(
+                feed_url=feed_url, defaults={"newest_item_date": newest_item_date}
+            )
 
-    def __init__(self, *args, **kwargs):
-        self.feeds_db_alias = kwargs.pop("feeds_db_alias", None)
-        self.feeds_db_path = kwargs.pop("feeds_db_path", None)
-        super().__init__(*args, **kwargs)
-
-    def _clone(self):
-        """Override _clone to preserve custom attributes."""
-        clone = super()._clone()
-        clone.feeds_db_alias = self.feeds_db_alias
-        clone.feeds_db_path = self.feeds_db_path
-        return clone
-
-    def _attach_db(self):
-        if self.feeds_db_path and self.feeds_db_alias:
-            with connections[self.db].cursor() as cursor:
-                cursor.execute(
-                    "ATTACH DATABASE %s AS %s",
-                    [str(self.feeds_db_path), self.feeds_db_alias],
-                )
+    def sync_from_feeds(self, batch_size=500):
+        """
+        Copy the newest item date of every feed into the projection,
+        overwriting what is there. Used to backfill and to repair drift.
+
+        Returns:
+            int: Number of feeds synced
+        """
+        from pebbling_apps.feeds.models import Feed
+
+        feeds = Feed.objects.filter(newest_item_date__isnull=False).values_list(
+            "url", "newest_item_date"
+        )
 
-    def _detach_db(self):
-        if self.feeds_db_path and self.feeds_db_alias:
-            with connections[self.db].cursor() as cursor:
-                cursor.execute("DETACH DATABASE %s", [self.feeds_db_alias])
-
-    def _fetch_all(self):
-        self._attach_db()
-        try:
-            super()._fetch_all()
-        finally:
-            self._detach_db()
-
-    def count(self):
-        if self._result_cache is not None:
-            return len(self._result_cache)
-
-        self._attach_db()
-        try:
-            count = self.query.get_count(using=self.db)
-        finally:
-            self._detach_db()
-        return count
-
-    def with_feed_newest_item_date(self) -> "BookmarkWithFeedsQuerySet":
-        clone = self._clone()
-
-        # Use RawSQL to select the newest_item_date from the feeds database
-        db_alias = self.feeds_db_alias
-        clone = clone.annotate(
-            feed_newest_item_date=RawSQL(
-                f"""
-                    SELECT {db_alias}.feeds_feed.newest_item_date
-                    FROM {db_alias}.feeds_feed
-                    WHERE {db_alias}.feeds_feed.url = bookmarks_bookmark.feed_url
-                """,
-                [],
+        synced = 0
+        batch = []
+        for feed_url, newest_item_date in feeds.iterator(chunk_size=batch_size):
+            batch.append(
+                FeedActivity(feed_url=feed_url, newest_item_date=newest_item_date)
             )
+            if len(batch) >= batch_size:
+                synced += self._upsert(batch)
+                batch = []
+        if batch:
+            synced += self._upsert(batch)
+        return synced
+
+    def _upsert(self, rows):
+        self.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["feed_url"],
+            update_fields=["newest_item_date"],
         )
+        return len(rows)
 
-        return clone
 
-    def exclude_null_feed_dates(self) -> "BookmarkWithFeedsQuerySet":
-        return self.exclude(feed_newest_item_date__isnull=True)
+class FeedActivity(models.Model):
+    """
+    Projection of feeds.Feed.newest_item_date kept beside bookmarks in the
+    main database, so sorting by feed activity is a single indexed join
+    rather than a cross-database lookup.
+    """
 
-    def order_by_feed_newest_item_date(
-        self, descending=True
-    ) -> "BookmarkWithFeedsQuerySet":
-        order_prefix = "-" if descending else ""
-        return self.with_feed_newest_item_date().order_by(
-            f"{order_prefix}feed_newest_item_date"
-        )
+    objects = FeedActivityManager()
+
+    feed_url = models.URLField(max_length=2048, unique=True)
+    newest_item_date = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "feed activity"
+        indexes = [
+            models.Index(fields=["newest_item_date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.feed_url}: {self.newest_item_date}"
 
 
 class BookmarkManager(models.Manager):
@@ -175,23 +259,6 @@ class BookmarkManager(models.Manager):
         normalizer = URLNormalizer()
         return normalizer.generate_hash(url)
 
-    def get_queryset_with_feeds_db(
-        self, feeds_db_alias="feeds_db", feeds_db_name="feeds_db"
-    ):
-        if getattr(settings, "SQLITE_MULTIPLE_DB", True):
-            # Multiple database mode - use the cross-database queryset
-            feeds_db_path = settings.DATABASES[feeds_db_name]["NAME"]
-            return BookmarkWithFeedsQuerySet(
-                model=self.model,
-                using=self._db,
-                hints=self._hints,
-                feeds_db_path=feeds_db_path,
-                feeds_db_alias=feeds_db_alias,
-            )
-        else:
-            # Single database mode - return regular queryset
-            return self.get_queryset()
-
     def update_or_create(self, url, defaults=None, **kwargs):
         """Override update_or_create to handle URL-based lookups."""
         defaults = defaults or {}
@@ -213,7 +280,7 @@ class BookmarkManager(models.Manager):
         ):
             defaults["feed_url"] = existing_item.unfurl_metadata.feed
         elif (
-            "unfurl_metadata" in defaults
+            defaults.get("unfurl_metadata")
             and defaults["unfurl_metadata"].feed
             and "feed_url" not in defaults
         ):
@@ -231,40 +298,17 @@ class BookmarkManager(models.Manager):
         since=None,
         sort=BookmarkSort.DATE,
     ):
-        if sort in (BookmarkSort.FEED, BookmarkSort.FEED_ASC, BookmarkSort.FEED_DESC):
-            if getattr(settings, "SQLITE_MULTIPLE_DB", True):
-                # Multiple database mode - use cross-database queryset
-                queryset = (
-                    self.get_queryset_with_feeds_db()
-                    .with_feed_newest_item_date()
-                    .exclude_null_feed_dates()
-                    .order_by_feed_newest_item_date(
-                        descending=sort != BookmarkSort.FEED_DESC
-                    )
-                )
-                if since:
-                    queryset = queryset.filter(feed_newest_item_date__gte=since)
-            else:
-                # Single database mode - use subquery
-                from pebbling_apps.feeds.models import Feed
-                from django.db.models import Subquery, OuterRef
-
-                feed_date_subquery = Feed.objects.filter(
-                    url=OuterRef("feed_url")
-                ).values("newest_item_date")[:1]
-
-                queryset = (
-                    self.get_queryset()
-                    .annotate(feed_newest_item_date=Subquery(feed_date_subquery))
-                    .exclude(feed_newest_item_date__isnull=True)
-                )
-
-                descending = sort != BookmarkSort.FEED_ASC
-                order_prefix = "-" if descending else ""
-                queryset = queryset.order_by(f"{order_prefix}feed_newest_item_date")
-
-                if since:
-                    queryset = queryset.filter(feed_newest_item_date__gte=since)
+        if sort in BOOKMARK_FEED_SORTS:
+            descending = sort != BookmarkSort.FEED_ASC
+            order_prefix = "-" if descending else ""
+            queryset = (
+                self.get_queryset()
+                .annotate(feed_newest_item_date=F("feed_activity__newest_item_date"))
+                .filter(feed_newest_item_date__isnull=False)
+                .order_by(f"{order_prefix}feed_newest_item_date")
+            )
+            if since:
+                queryset = queryset.filter(feed_newest_item_date__gte=since)
 
         elif sort in BOOKMARK_SORT_COLUMNS:
             queryset = self.get_queryset().order_by(BOOKMARK_SORT_COLUMNS[sort])
@@ -275,35 +319,25 @@ class BookmarkManager(models.Manager):
             queryset = queryset.filter(owner=owner)
 
         if tags:
-            tag_ids = Tag.objects.filter(name__in=tags).values_list("id", flat=True)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            from .tag_filter import TagFilter
+
+            if not isinstance(tags, TagFilter):
+                tags = TagFilter.from_tags(tags)
+            queryset = tags.apply(queryset, owner=owner)
 
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search)
-                | Q(url__icontains=search)
-                | Q(description__icontains=search)
-                | Q(tags__name__icontains=search)
-            ).distinct()
-
-            queryset = queryset.annotate(
-                search_rank=Case(
-                    When(title__icontains=search, then=Value(1)),
-                    When(description__icontains=search, then=Value(2)),
-                    default=Value(3),
-                    output_field=models.IntegerField(),
-                )
-            ).order_by("search_rank")
+            from .search import BookmarkSearchIndex
+
+            search_index = BookmarkSearchIndex(using=queryset.db)
+            queryset = search_index.filter_queryset(queryset, search)
 
         return queryset
 
 
 # mypy cannot analyze this pattern, but it's the standard django-prometheus usage
-class Bookmark(TimestampedModel):
+class Bookmark(UnfurledModel, TimestampedModel):
     """Bookmark model with url and title."""
 
-    omit_html = getattr(settings, "OMIT_HTML_FROM_UNFURL_METADATA", True)
-
     objects = BookmarkManager()
 
     url = models.URLField(verbose_name="URL", max_length=10240)
@@ -311,13 +345,33 @@ class Bookmark(TimestampedModel):
     unique_hash = models.CharField(max_length=255)
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
-    tags = models.ManyToManyField("bookmarks.Tag", related_name="bookmarks", blank=True)
+    tags = models.ManyToManyField(
+        "bookmarks.Tag",
+        related_name="bookmarks",
+        blank=True,
+        through="bookmarks.BookmarkTag",
+    )
 
-    unfurl_metadata = UnfurlMetadataField(blank=True, null=True, omit_html=omit_html)
     feed_url = models.URLField(blank=True, null=True, verbose_name="Feed URL")
+    feed_activity = models.ForeignObject(
+        FeedActivity,
+        on_delete=models.DO_NOTHING,
+        from_fields=["feed_url"],
+        to_fields=["feed_url"],
+        null=True,
+        related_name="+",
+    )
 
     class Meta:
         unique_together = ["owner", "unique_hash"]
+        indexes = [
+            models.Index(fields=["feed_url"]),
+            # Support keyset pagination for the date and title sorts
+            models.Index(fields=["owner", "created_at", "id"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["owner", "title", "id"]),
+            models.Index(fields=["title", "id"]),
+        ]
 
     def __str__(self):
         return self.title
@@ -344,6 +398,141 @@ class Bookmark(TimestampedModel):
         return urlparse(self.url).hostname
 
 
+class BookmarkTag(models.Model):
+    """
+    A bookmark's link to a tag. This is the table Django created for the
+    tags M2M, declared so that its indexes are part of the model state.
+    """
+
+    bookmark = models.ForeignKey(Bookmark, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = "bookmarks_bookmark_tags"
+        unique_together = ["bookmark", "tag"]
+        indexes = [
+            # Serves tag filters: "bookmarks carrying tag X" from the index
+            models.Index(fields=["tag", "bookmark"], name="bookmark_tags_tag_bm_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.bookmark_id}: {self.tag_id}"
+
+
+class BookmarkCountManager(models.Manager):
+    def adjust(self, owner_id, tag_ids=None, delta=1):
+        """
+        Add delta to the owner's bookmark total, or to the owner's per-tag
+        totals when tag_ids are given.
+        """
+        for tag_id in tag_ids if tag_ids is not None else [None]:
+            counts = self.filter(owner_id=owner_id, tag_id=tag_id)
+            if counts.update(count=F("count") + delta) or delta <= 0:
+                continue
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(owner_id=owner_id, tag_id=tag_id, count=delta)
+            except IntegrityError:
+                # Another writer created the row first
+                counts.update(count=F("count") + delta)
+
+    def for_query(self, owner=None, tags=None, search=None, since=None, sort=None):
+        """
+        Return the cached total for a BookmarkManager.query() call, or None
+        when the query is filtered in a way the counts do not cover.
+        """
+        if search or since or sort in BOOKMARK_FEED_SORTS:
+            return None
+        if tags and (not isinstance(tags, (list, tuple)) or len(tags) > 1):
+            return None
+
+        counts = self.all()
+        if owner:
+            counts = counts.filter(owner=owner)
+        if tags:
+            counts = counts.filter(tag__name=tags[0])
+        else:
+            counts = counts.filter(tag__isnull=True)
+
+        return counts.aggregate(total=Sum("count"))["total"]
+
+    def reconcile(self):
+        """
+        Recompute every count from the bookmarks table in bulk and repair
+        rows that have drifted.
+
+        Returns:
+            int: Number of rows created, updated or deleted
+        """
+        expected = {
+            (row["owner"], None): row["total"]
+            for row in Bookmark.objects.values("owner").annotate(total=Count("id"))
+        }
+        expected.update(
+            {
+                (row["bookmark__owner"], row["tag"]): row["total"]
+                for row in Bookmark.tags.through.objects.values(
+                    "bookmark__owner", "tag"
+                ).annotate(total=Count("id"))
+            }
+        )
+
+        with transaction.atomic(using=self.db):
+            stale_ids = []
+            changed = []
+            for row in self.all():
+                key = (row.owner_id, row.tag_id)
+                if key not in expected:
+                    stale_ids.append(row.id)
+                    continue
+                total = expected.pop(key)
+                if row.count != total:
+                    row.count = total
+                    changed.append(row)
+
+            self.filter(id__in=stale_ids).delete()
+            self.bulk_update(changed, ["count"], batch_size=500)
+            self.bulk_create(
+                [
+                    BookmarkCount(owner_id=owner_id, tag_id=tag_id, count=total)
+                    for (owner_id, tag_id), total in expected.items()
+                ],
+                batch_size=500,
+            )
+
+        return len(stale_ids) + len(changed) + len(expected)
+
+
+class BookmarkCount(models.Model):
+    """
+    Denormalized bookmark totals per owner (tag is null) and per owner and
+    tag, kept up to date by signals so list views can skip COUNT(*).
+    """
+
+    objects = BookmarkCountManager()
+
+    owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, null=True, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner"],
+                condition=Q(tag__isnull=True),
+                name="unique_bookmark_count_owner",
+            ),
+            models.UniqueConstraint(
+                fields=["owner", "tag"],
+                condition=Q(tag__isnull=False),
+                name="unique_bookmark_count_owner_tag",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id}/{self.tag_id}: {self.count}"
+
+
 class ImportJob(TimestampedModel):
     """Model to track bookmark import jobs."""
 
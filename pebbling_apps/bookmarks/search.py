@@ -0,0 +1,275 @@
+"""Full-text search index for bookmarks.
+
+On SQLite the index is an FTS5 virtual table whose rowid is the bookmark id.
+On PostgreSQL it is a side table holding a weighted tsvector per bookmark,
+backed by a GIN index. Any other backend falls back to the original
+icontains search.
+"""
+
+import logging
+import re
+from typing import Iterable, List, Optional
+
+from django.db import connections, router
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Bookmark
+
+logger = logging.getLogger(__name__)
+
+SQLITE_FTS_TABLE = "bookmarks_bookmark_fts"
+POSTGRES_SEARCH_TABLE = "bookmarks_bookmark_search"
+
+# BM25 column weights, in FTS5 column order: title, description, url, tags
+SQLITE_BM25_WEIGHTS = "10.0, 4.0, 2.0, 6.0"
+
+# Keep IN (...) lists comfortably below SQLite's host parameter limit
+ID_BATCH_SIZE = 500
+
+SEARCH_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def filter_queryset_legacy(queryset, search):
+    """The original search path: OR'd icontains predicates plus a Case/When rank."""
+    queryset = queryset.filter(
+        Q(title__icontains=search)
+        | Q(url__icontains=search)
+        | Q(description__icontains=search)
+        | Q(tags__name__icontains=search)
+    ).distinct()
+
+    return queryset.annotate(
+        search_rank=Case(
+            When(title__icontains=search, then=Value(1)),
+            When(description__icontains=search, then=Value(2)),
+            default=Value(3),
+            output_field=IntegerField(),
+        )
+    ).order_by("search_rank")
+
+
+class BookmarkSearchIndex:
+    """Maintains and queries the bookmark full-text index for one database."""
+
+    def __init__(self, using: Optional[str] = None):
+        self.using = using or router.db_for_write(Bookmark)
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    @property
+    def vendor(self) -> str:
+        return self.connection.vendor
+
+    def is_supported(self) -> bool:
+        """Whether this database has a maintained search index."""
+        return self.vendor in ("sqlite", "postgresql")
+
+    def parse_search_terms(self, search: str) -> List[str]:
+        """Split free text into word tokens safe to embed in a match query."""
+        return SEARCH_TOKEN_RE.findall(search or "")
+
+    def build_match_query(self, terms: List[str]) -> str:
+        """Build a prefix-matching query requiring every term to appear."""
+        if self.vendor == "postgresql":
+            return " & ".join(f"{term}:*" for term in terms)
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def filter_queryset(self, queryset, search: str):
+        """
+        Restrict a bookmark queryset to matches for the search string.
+
+        Annotates each row with search_rank, where lower values are better
+        matches, and orders the queryset by it.
+        """
+        terms = self.parse_search_terms(search)
+        if not self.is_supported() or not terms:
+            return filter_queryset_legacy(queryset, search)
+
+        match = self.build_match_query(terms)
+
+        # Join the index table rather than using correlated subqueries, so
+        # ranking statistics are computed once per query rather than per row.
+        if self.vendor == "postgresql":
+            tsquery = "to_tsquery('simple', %s)"
+            return queryset.extra(
+                tables=[POSTGRES_SEARCH_TABLE],
+                where=[
+                    f"{POSTGRES_SEARCH_TABLE}.bookmark_id = bookmarks_bookmark.id",
+                    f"{POSTGRES_SEARCH_TABLE}.document @@ {tsquery}",
+                ],
+                params=[match],
+                # ts_rank_cd grows with relevance, so negate it to sort ascending
+                select={
+                    "search_rank": f"-ts_rank_cd({POSTGRES_SEARCH_TABLE}.document, {tsquery})"
+                },
+                select_params=[match],
+            ).order_by("search_rank")
+
+        # bm25() is negative and smaller for better matches
+        return queryset.extra(
+            tables=[SQLITE_FTS_TABLE],
+            where=[
+                f"{SQLITE_FTS_TABLE}.rowid = bookmarks_bookmark.id",
+                f"{SQLITE_FTS_TABLE} MATCH %s",
+            ],
+            params=[match],
+            select={"search_rank": f"bm25({SQLITE_FTS_TABLE}, {SQLITE_BM25_WEIGHTS})"},
+        ).order_by("search_rank")
+
+    def index_bookmarks(self, bookmark_ids: Iterable[int]) -> int:
+        """(Re)index the given bookmarks, dropping entries for missing ones."""
+        if not self.is_supported():
+            return 0
+
+        indexed = 0
+        bookmark_ids = [pk for pk in bookmark_ids if pk is not None]
+        for start in range(0, len(bookmark_ids), ID_BATCH_SIZE):
+            batch = bookmark_ids[start : start + ID_BATCH_SIZE]
+            rows = self._build_documents(batch)
+            self.remove_bookmarks(batch)
+            self._insert_documents(rows)
+            indexed += len(rows)
+        return indexed
+
+    def remove_bookmarks(self, bookmark_ids: Iterable[int]) -> None:
+        """Drop index entries for the given bookmark ids."""
+        if not self.is_supported():
+            return
+
+        bookmark_ids = list(bookmark_ids)
+        if not bookmark_ids:
+            return
+
+        id_column = "bookmark_id" if self.vendor == "postgresql" else "rowid"
+        table = self._table_name()
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(bookmark_ids), ID_BATCH_SIZE):
+                batch = bookmark_ids[start : start + ID_BATCH_SIZE]
+                placeholders = ", ".join(["%s"] * len(batch))
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE {id_column} IN ({placeholders})",
+                    batch,
+                )
+
+    def reindex_tags(self, tag_ids: Iterable[int]) -> int:
+        """Reindex every bookmark carrying any of the given tags."""
+        bookmark_ids = list(
+            Bookmark.tags.through.objects.using(self.using)
+            .filter(tag_id__in=list(tag_ids))
+            .values_list("bookmark_id", flat=True)
+            .distinct()
+        )
+        return self.index_bookmarks(bookmark_ids)
+
+    def clear(self) -> None:
+        """Remove every entry from the index."""
+        if not self.is_supported():
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self._table_name()}")
+
+    def rebuild(self, batch_size: int = 1000, progress=None) -> int:
+        """
+        Rebuild the whole index in primary-key order.
+
+        Args:
+            batch_size: Number of bookmarks to index per batch
+            progress: Optional callable receiving the running indexed count
+
+        Returns:
+            int: Number of bookmarks indexed
+        """
+        if not self.is_supported():
+            return 0
+
+        self.clear()
+
+        indexed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                Bookmark.objects.using(self.using)
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            self._insert_documents(self._build_documents(batch))
+            indexed += len(batch)
+            last_id = batch[-1]
+            if progress:
+                progress(indexed)
+
+        if self.vendor == "sqlite":
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('optimize')"
+                )
+
+        return indexed
+
+    def _table_name(self) -> str:
+        if self.vendor == "postgresql":
+            return POSTGRES_SEARCH_TABLE
+        return SQLITE_FTS_TABLE
+
+    def _build_documents(self, bookmark_ids: List[int]) -> List[tuple]:
+        """Collect (id, title, description, url, tags) rows for indexing."""
+        tag_names: dict = {}
+        tag_rows = (
+            Bookmark.tags.through.objects.using(self.using)
+            .filter(bookmark_id__in=bookmark_ids)
+            .values_list("bookmark_id", "tag__name")
+        )
+        for bookmark_id, name in tag_rows:
+            tag_names.setdefault(bookmark_id, []).append(name)
+
+        rows = (
+            Bookmark.objects.using(self.using)
+            .filter(id__in=bookmark_ids)
+            .values_list("id", "title", "description", "url")
+        )
+        return [
+            (
+                pk,
+                title or "",
+                description or "",
+                url or "",
+                " ".join(tag_names.get(pk, [])),
+            )
+            for pk, title, description, url in rows
+        ]
+
+    def _insert_documents(self, rows: List[tuple]) -> None:
+        if not rows:
+            return
+
+        with self.connection.cursor() as cursor:
+            if self.vendor == "postgresql":
+                cursor.executemany(
+                    f"""
+                        INSERT INTO {POSTGRES_SEARCH_TABLE} (bookmark_id, document)
+                        VALUES (
+                            %s,
+                            setweight(to_tsvector('simple', %s), 'A')
+                            || setweight(to_tsvector('simple', %s), 'C')
+                            || setweight(to_tsvector('simple', %s), 'D')
+                            || setweight(to_tsvector('simple', %s), 'B')
+                        )
+                        ON CONFLICT (bookmark_id)
+                        DO UPDATE SET document = EXCLUDED.document
+                    """,
+                    rows,
+                )
+            else:
+                cursor.executemany(
+                    f"""
+                        INSERT INTO {SQLITE_FTS_TABLE}
+                            (rowid, title, description, url, tags)
+                        VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    rows,
+                )
@@ -1,7 +1,7 @@
 # pebbling_apps/bookmarks/service.py
 
 from pebbling_apps.bookmarks.models import Bookmark
-from pebbling_apps.unfurl.unfurl import UnfurlMetadata
+from pebbling_apps.unfurl.services import UnfurlFailed, UnfurlService
 from pebbling_apps.feeds.services import FeedService
 import logging
 import hashlib
@@ -27,16 +27,17 @@ class BookmarksService:
         bookmark = Bookmark.objects.get(id=bookmark_id)
         logger.debug(f"Bookmark found: {bookmark}")
 
-        # Instantiate UnfurlMetadata
-        unfurl_metadata = UnfurlMetadata(url=bookmark.url)
-        logger.debug(f"UnfurlMetadata instantiated with URL: {bookmark.url}")
-
-        # Fetch the metadata (assuming a method exists for this)
-        unfurl_metadata.unfurl()  # This method should be defined in UnfurlMetadata
+        # Look up the metadata in the shared unfurl cache, fetching on a miss
+        try:
+            record = UnfurlService().get_record(bookmark.url)
+        except UnfurlFailed as e:
+            logger.warning(f"Could not unfurl bookmark ID {bookmark_id}: {e}")
+            return
+        unfurl_metadata = record.metadata
         logger.debug(f"Metadata unfurled successfully. {unfurl_metadata.image}")
 
-        # Save the fetched metadata to the bookmark's unfurl_metadata property
-        bookmark.unfurl_metadata = unfurl_metadata
+        # Point the bookmark at the cached metadata, which is already stored
+        bookmark.set_unfurl_record(record)
         bookmark.save()
         logger.debug("Bookmark's unfurl_metadata saved successfully.")
 
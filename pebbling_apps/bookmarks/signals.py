@@ -0,0 +1,142 @@
+from collections import Counter
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import Bookmark, BookmarkCount, Tag
+from .search import BookmarkSearchIndex
+
+
+@receiver(post_save, sender=Bookmark)
+def index_bookmark_on_save(sender, instance, raw=False, using=None, **kwargs):
+    """Keep the search index entry in step with the saved bookmark."""
+    if raw:
+        return
+    BookmarkSearchIndex(using=using).index_bookmarks([instance.pk])
+
+
+@receiver(post_delete, sender=Bookmark)
+def unindex_bookmark_on_delete(sender, instance, using=None, **kwargs):
+    """Drop the search index entry for a deleted bookmark."""
+    BookmarkSearchIndex(using=using).remove_bookmarks([instance.pk])
+
+
+@receiver(m2m_changed, sender=Bookmark.tags.through)
+def index_bookmarks_on_tags_changed(
+    sender, instance, action, reverse, pk_set, using=None, **kwargs
+):
+    """Reindex bookmarks whose tag set changed, from either side of the M2M."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            BookmarkSearchIndex(using=using).index_bookmarks([instance.pk])
+        return
+
+    # Reverse side: instance is a Tag and pk_set holds bookmark ids
+    if action == "pre_clear":
+        instance._search_clear_bookmark_ids = list(
+            instance.bookmarks.values_list("id", flat=True)
+        )
+    elif action in ("post_add", "post_remove"):
+        BookmarkSearchIndex(using=using).index_bookmarks(pk_set or [])
+    elif action == "post_clear":
+        bookmark_ids = getattr(instance, "_search_clear_bookmark_ids", [])
+        BookmarkSearchIndex(using=using).index_bookmarks(bookmark_ids)
+
+
+@receiver(post_save, sender=Tag)
+def reindex_bookmarks_on_tag_save(
+    sender, instance, created, raw=False, using=None, **kwargs
+):
+    """A renamed tag changes the indexed text of every bookmark carrying it."""
+    if raw or created:
+        return
+    BookmarkSearchIndex(using=using).reindex_tags([instance.pk])
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_bookmarks_on_tag_delete(sender, instance, using=None, **kwargs):
+    """Deleting a tag cascades through the M2M without m2m_changed signals."""
+    instance._search_delete_bookmark_ids = list(
+        instance.bookmarks.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+def reindex_bookmarks_on_tag_delete(sender, instance, using=None, **kwargs):
+    bookmark_ids = getattr(instance, "_search_delete_bookmark_ids", [])
+    BookmarkSearchIndex(using=using).index_bookmarks(bookmark_ids)
+
+
+@receiver(post_save, sender=Bookmark)
+def count_bookmark_on_create(
+    sender, instance, created, raw=False, using=None, **kwargs
+):
+    if raw or not created:
+        return
+    BookmarkCount.objects.db_manager(using).adjust(instance.owner_id)
+
+
+@receiver(pre_delete, sender=Bookmark)
+def remember_tags_on_bookmark_delete(sender, instance, **kwargs):
+    """Deleting a bookmark drops its tag links without m2m_changed signals."""
+    instance._count_tag_ids = list(instance.tags.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Bookmark)
+def count_bookmark_on_delete(sender, instance, using=None, **kwargs):
+    counts = BookmarkCount.objects.db_manager(using)
+    counts.adjust(instance.owner_id, delta=-1)
+    tag_ids = getattr(instance, "_count_tag_ids", [])
+    counts.adjust(instance.owner_id, tag_ids, delta=-1)
+    Tag.objects.db_manager(using).adjust_usage(tag_ids, "bookmark_count", -1)
+
+
+@receiver(m2m_changed, sender=Bookmark.tags.through)
+def count_bookmarks_on_tags_changed(
+    sender, instance, action, reverse, pk_set, using=None, **kwargs
+):
+    """
+    Keep per-tag counts and tag usage counters in step with tag links, from
+    either side of the M2M.
+    """
+    counts = BookmarkCount.objects.db_manager(using)
+    tags = Tag.objects.db_manager(using)
+
+    if not reverse:
+        # instance is a Bookmark and pk_set holds tag ids. Removal pk_sets may
+        # name tags that were never linked, so record the real ones up front.
+        if action == "pre_remove":
+            instance._count_removed_tag_ids = list(
+                instance.tags.filter(id__in=pk_set).values_list("id", flat=True)
+            )
+        elif action == "pre_clear":
+            instance._count_removed_tag_ids = list(
+                instance.tags.values_list("id", flat=True)
+            )
+        elif action == "post_add":
+            counts.adjust(instance.owner_id, pk_set or [], delta=1)
+            tags.adjust_usage(pk_set, "bookmark_count", 1)
+        elif action in ("post_remove", "post_clear"):
+            tag_ids = getattr(instance, "_count_removed_tag_ids", [])
+            counts.adjust(instance.owner_id, tag_ids, delta=-1)
+            tags.adjust_usage(tag_ids, "bookmark_count", -1)
+        return
+
+    # Reverse side: instance is a Tag and pk_set holds bookmark ids
+    if action == "pre_remove":
+        instance._count_removed_owner_ids = list(
+            instance.bookmarks.filter(id__in=pk_set).values_list("owner_id", flat=True)
+        )
+    elif action == "pre_clear":
+        instance._count_removed_owner_ids = list(
+            instance.bookmarks.values_list("owner_id", flat=True)
+        )
+    elif action == "post_add":
+        added = Bookmark.objects.using(using).filter(id__in=pk_set or [])
+        owner_ids = added.values_list("owner_id", flat=True)
+        for owner_id, total in Counter(owner_ids).items():
+            counts.adjust(owner_id, [instance.pk], delta=total)
+        tags.adjust_usage([instance.pk], "bookmark_count", len(pk_set or []))
+    elif action in ("post_remove", "post_clear"):
+        owner_ids = getattr(instance, "_count_removed_owner_ids", [])
+        for owner_id, total in Counter(owner_ids).items():
+            counts.adjust(owner_id, [instance.pk], delta=-total)
+        tags.adjust_usage([instance.pk], "bookmark_count", -len(owner_ids))
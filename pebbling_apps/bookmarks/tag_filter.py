@@ -0,0 +1,68 @@
+"""Tag filters for bookmark querysets.
+
+Each term compiles to a semi-join on the bookmark/tag through table, i.e.
+`id IN (SELECT bookmark_id FROM bookmarks_bookmark_tags WHERE tag_id IN ...)`,
+which the (tag_id, bookmark_id) index answers without touching the bookmark
+rows and without the duplicate rows a plain M2M join produces.
+
+Tags are always matched against tags belonging to the bookmark's owner, so
+another user's tag of the same name never widens the results.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+from django.db.models import F, Q
+
+from .models import Bookmark, Tag
+
+
+@dataclass(frozen=True)
+class TagFilter:
+    """
+    Match bookmarks carrying every tag in all_of, at least one tag in
+    any_of, and none of the tags in none_of.
+    """
+
+    all_of: Tuple[str, ...] = ()
+    any_of: Tuple[str, ...] = ()
+    none_of: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_tags(cls, tags: Iterable[str]) -> "TagFilter":
+        """
+        Build a filter from a list of tag names, as passed to
+        BookmarkManager.query(): any of the names matches.
+        """
+        return cls(any_of=tuple(tags))
+
+    def __bool__(self) -> bool:
+        return bool(self.all_of or self.any_of or self.none_of)
+
+    def names(self) -> Tuple[str, ...]:
+        """Every tag name the filter mentions."""
+        return self.all_of + self.any_of + self.none_of
+
+    def apply(self, queryset, owner=None):
+        """Restrict a bookmark queryset, optionally already scoped to owner."""
+        for name in self.all_of:
+            queryset = queryset.filter(self._tagged([name], owner))
+        if self.any_of:
+            queryset = queryset.filter(self._tagged(self.any_of, owner))
+        if self.none_of:
+            queryset = queryset.exclude(self._tagged(self.none_of, owner))
+        return queryset
+
+    def _tagged(self, names: Iterable[str], owner=None) -> Q:
+        """Bookmarks carrying at least one of the named tags."""
+        links = Bookmark.tags.through.objects.all()
+        if owner is not None:
+            # Resolve the owner's tags by (owner, name) and then scan the
+            # (tag_id, bookmark_id) index for just those tags
+            tag_ids = Tag.objects.filter(owner=owner, name__in=names).values("id")
+            links = links.filter(tag_id__in=tag_ids)
+        else:
+            links = links.filter(
+                tag__name__in=names, tag__owner_id=F("bookmark__owner_id")
+            )
+        return Q(id__in=links.values("bookmark_id"))
@@ -0,0 +1,134 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pebbling_apps.bookmarks.models import Bookmark, BookmarkCount, Tag
+
+User = get_user_model()
+
+
+class BookmarkCountTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="12345"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="12345"
+        )
+        self.tag = Tag.objects.create(name="python", owner=self.user)
+        self.bookmarks = [
+            Bookmark.objects.create(
+                url=f"https://example.com/{i}", owner=self.user, title=f"Bookmark {i}"
+            )
+            for i in range(3)
+        ]
+        Bookmark.objects.create(
+            url="https://example.com/other", owner=self.other, title="Other"
+        )
+
+    def cached(self, **kwargs):
+        return BookmarkCount.objects.for_query(**kwargs)
+
+    def actual(self, **kwargs):
+        return Bookmark.objects.query(**kwargs).count()
+
+    def assertCountsMatch(self):
+        for kwargs in [
+            {},
+            {"owner": self.user},
+            {"owner": self.other},
+            {"tags": ["python"]},
+            {"owner": self.user, "tags": ["python"]},
+        ]:
+            with self.subTest(**kwargs):
+                self.assertEqual(self.cached(**kwargs) or 0, self.actual(**kwargs))
+
+    def test_counts_follow_create_and_delete(self):
+        self.assertEqual(self.cached(owner=self.user), 3)
+        self.assertEqual(self.cached(), 4)
+
+        self.bookmarks[0].tags.add(self.tag)
+        self.bookmarks[0].delete()
+        self.assertCountsMatch()
+
+    def test_counts_follow_tag_changes_from_both_sides(self):
+        self.bookmarks[0].tags.add(self.tag)
+        self.bookmarks[0].tags.add(self.tag)
+        self.tag.bookmarks.add(self.bookmarks[1], self.bookmarks[2])
+        self.assertEqual(self.cached(owner=self.user, tags=["python"]), 3)
+
+        self.bookmarks[0].tags.remove(self.tag)
+        self.bookmarks[0].tags.remove(self.tag)
+        self.tag.bookmarks.remove(self.bookmarks[1])
+        self.assertCountsMatch()
+
+        self.bookmarks[2].tags.clear()
+        self.assertCountsMatch()
+
+        self.tag.bookmarks.set(self.bookmarks)
+        self.tag.bookmarks.clear()
+        self.assertCountsMatch()
+
+    def test_counts_follow_tag_changes_in_the_admin(self):
+        admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="12345"
+        )
+        self.client.force_login(admin)
+        bookmark = self.bookmarks[0]
+        prefix = "bookmarktag_set"
+
+        response = self.client.post(
+            reverse("admin:bookmarks_bookmark_change", args=[bookmark.pk]),
+            {
+                "owner": self.user.pk,
+                "url": bookmark.url,
+                "title": bookmark.title,
+                "description": "",
+                "feed_url": "",
+                "image_url": "",
+                "site_name": "",
+                f"{prefix}-TOTAL_FORMS": "1",
+                f"{prefix}-INITIAL_FORMS": "0",
+                f"{prefix}-0-tag": self.tag.pk,
+                f"{prefix}-0-bookmark": bookmark.pk,
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(list(bookmark.tags.all()), [self.tag])
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.bookmark_count, 1)
+        self.assertCountsMatch()
+
+    def test_filtered_queries_are_not_cached(self):
+        self.assertIsNone(self.cached(owner=self.user, search="python"))
+        self.assertIsNone(self.cached(owner=self.user, tags=["a", "b"]))
+        self.assertIsNone(self.cached(owner=self.user, sort="feed"))
+
+    def test_reconcile_repairs_drift(self):
+        self.bookmarks[0].tags.add(self.tag)
+        BookmarkCount.objects.filter(owner=self.user, tag=None).update(count=42)
+        BookmarkCount.objects.filter(owner=self.other).delete()
+        Bookmark.objects.bulk_create(
+            [Bookmark(url="https://example.com/bulk", owner=self.user, title="Bulk")]
+        )
+
+        out = StringIO()
+        call_command("reconcile_bookmark_counts", stdout=out)
+
+        self.assertIn("Repaired 2 bookmark counts", out.getvalue())
+        self.assertCountsMatch()
+
+    def test_list_view_uses_cached_count(self):
+        url = reverse("profiles:view", args=[self.user.username])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {"limit": 2, "page": 1})
+
+        self.assertContains(response, "Page 1 of 2")
+        self.assertFalse(
+            any("COUNT(*)" in query["sql"] for query in context.captured_queries)
+        )
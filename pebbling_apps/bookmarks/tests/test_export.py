@@ -227,6 +227,42 @@ class BookmarkFilterTest(TestCase):
         self.assertIn("Bookmark 1", content)
         self.assertNotIn("Bookmark 2", content)
 
+    def test_any_and_exclude_tag_filters(self):
+        """Test filtering by any of several tags while excluding another."""
+        self.bookmark1.tags.add(self.tag1, self.tag3)
+        self.bookmark2.tags.add(self.tag2)
+        self.bookmark3.tags.add(self.tag1)
+
+        response = self.client.get(
+            self.url + "?any_tag=python&any_tag=django&exclude_tag=web"
+        )
+        content = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertNotIn("Bookmark 1", content)
+        self.assertIn("Bookmark 2", content)
+        self.assertIn("Bookmark 3", content)
+
+    def test_excluding_unknown_tags_matches_everything(self):
+        """Test that excluding a tag the user does not have is not an error."""
+        self.bookmark1.tags.add(self.tag1)
+
+        response = self.client.get(self.url + "?exclude_tag=nonexistent")
+        content = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertEqual(response.status_code, 200)
+        for title in ("Bookmark 1", "Bookmark 2", "Bookmark 3"):
+            self.assertIn(title, content)
+
+    def test_other_users_tag_error(self):
+        """Test that tags belonging to another user are not accepted."""
+        other = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="testpass"
+        )
+        Tag.objects.create(name="theirs", owner=other)
+
+        response = self.client.get(self.url + "?tag=theirs")
+        self.assertEqual(response.status_code, 400)
+
     def test_nonexistent_tag_error(self):
         """Test that nonexistent tags return 400 error."""
         response = self.client.get(self.url + "?tag=nonexistent")
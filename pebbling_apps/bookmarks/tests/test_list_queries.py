@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pebbling_apps.bookmarks.models import Bookmark, Tag
+from pebbling_apps.unfurl.models import UnfurlRecord
+from pebbling_apps.unfurl.unfurl import UnfurlMetadata
+
+User = get_user_model()
+
+# Session and user, profile and tag lookups, one page of bookmarks with owners
+# joined, one tag prefetch and one unfurl record prefetch
+MAX_LIST_QUERIES = 7
+
+
+class BookmarkListQueryCountTestCase(TestCase):
+    """Rendering a page of bookmarks costs the same queries at any page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser", password="12345")
+        tags = [Tag.objects.create(name=f"tag{i}", owner=cls.user) for i in range(3)]
+
+        # Bulk insert to keep setup fast; signals are irrelevant to rendering
+        bookmarks = Bookmark.objects.bulk_create(
+            [
+                Bookmark(
+                    url=f"https://example.com/{i}",
+                    unique_hash=f"hash-{i}",
+                    owner=cls.user,
+                    title=f"Bookmark {i}",
+                    description="Notes",
+                    feed_url="https://example.com/feed",
+                    image_url="https://example.com/image.png",
+                )
+                for i in range(1000)
+            ]
+        )
+        UnfurlRecord.objects.bulk_create(
+            [
+                UnfurlRecord(
+                    url_hash=b.unique_hash,
+                    url=b.url,
+                    metadata=UnfurlMetadata(url=b.url, feeds=[b.feed_url]),
+                )
+                for b in bookmarks
+            ]
+        )
+        Through = Bookmark.tags.through
+        Through.objects.bulk_create(
+            [Through(bookmark=b, tag=tag) for b in bookmarks for tag in tags[:2]]
+        )
+
+    def setUp(self):
+        self.client.login(username="testuser", password="12345")
+
+    def count_queries(self, url, limit):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {"limit": limit})
+        self.assertEqual(len(response.context["bookmarks"]), limit)
+        self.assertContains(response, "tag1")
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url):
+        counts = {limit: self.count_queries(url, limit) for limit in (10, 100, 1000)}
+        self.assertEqual(len(set(counts.values())), 1, counts)
+        self.assertLessEqual(counts[10], MAX_LIST_QUERIES, counts)
+
+    def test_bookmark_list(self):
+        self.assertConstantQueries(reverse("bookmarks:list"))
+
+    def test_profile_list(self):
+        self.assertConstantQueries(reverse("profiles:view", args=["testuser"]))
+
+    def test_profile_tag_list(self):
+        self.assertConstantQueries(reverse("profiles:tag", args=["testuser", "tag0"]))
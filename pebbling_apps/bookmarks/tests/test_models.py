@@ -1,11 +1,21 @@
-from django.test import TransactionTestCase, TestCase
+from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.conf import settings
-from pebbling_apps.bookmarks.models import Bookmark, BookmarkManager, BookmarkSort
+from django.core.management import call_command
+from feedparser import FeedParserDict
+from io import StringIO
+from pebbling_apps.bookmarks.models import (
+    Bookmark,
+    BookmarkManager,
+    BookmarkSort,
+    FeedActivity,
+)
+from pebbling_apps.inbox.models import InboxItem
+from pebbling_apps.unfurl.models import UnfurlRecord
 from pebbling_apps.unfurl.unfurl import UnfurlMetadata
 from django.utils import timezone
+from unittest.mock import patch
 import datetime
-from unittest import skipIf
 
 
 User = get_user_model()
@@ -95,254 +105,222 @@ class BookmarkManagerTestCase(TestCase):
         self.assertEqual(bookmark.feed_url, "http://example.com/newest-feed")
 
 
-# Note: This test case requires TransactionTestCase to avoid issues with
-# TestCase using a transaction that results database locking errors
-@skipIf(
-    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
-    "Cross-database tests only run when SQLITE_MULTIPLE_DB is enabled",
-)
-class BookmarkManagerCrossDatabaseTestCase(TransactionTestCase):
-    databases = (
-        {"default", "feeds_db"}
-        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
-        else {"default"}
-    )
+class BookmarkFeedSortTestCase(TestCase):
+    """Test sorting bookmarks by the feed activity projection."""
 
     def setUp(self):
-        from pebbling_apps.feeds.models import Feed
-
         self.user = User.objects.create_user(username="testuser", password="12345")
 
-        self.bookmark1 = Bookmark.objects.create(
-            url="http://example1.com",
-            owner=self.user,
-            feed_url="http://example1.com/feed",
-            title="Test Bookmark 1",
-        )
-        self.bookmark2 = Bookmark.objects.create(
-            url="http://example2.com",
-            owner=self.user,
-            feed_url="http://example2.com/feed",
-            title="Test Bookmark 2",
+        self.bookmarks = []
+        for day in range(1, 4):
+            feed_url = f"http://example{day}.com/feed"
+            FeedActivity.objects.create(
+                feed_url=feed_url,
+                newest_item_date=timezone.make_aware(
+                    datetime.datetime(2023, 1, day, 10, 0, 0)
+                ),
+            )
+            self.bookmarks.append(
+                Bookmark.objects.create(
+                    url=f"http://example{day}.com",
+                    owner=self.user,
+                    feed_url=feed_url,
+                    title=f"Test Bookmark {day}",
+                )
+            )
+        self.bookmark1, self.bookmark2, self.bookmark3 = self.bookmarks
+
+    def query_ids(self, sort, **kwargs):
+        return [
+            b.id for b in Bookmark.objects.query(owner=self.user, sort=sort, **kwargs)
+        ]
+
+    def test_query_with_feed_sort(self):
+        """Test querying bookmarks sorted by feed date, newest first."""
+        expected = [self.bookmark3.id, self.bookmark2.id, self.bookmark1.id]
+        self.assertEqual(self.query_ids(BookmarkSort.FEED), expected)
+        self.assertEqual(self.query_ids(BookmarkSort.FEED_DESC), expected)
+
+    def test_query_with_feed_sort_ascending(self):
+        """Test querying bookmarks sorted by feed date ascending."""
+        self.assertEqual(
+            self.query_ids(BookmarkSort.FEED_ASC),
+            [self.bookmark1.id, self.bookmark2.id, self.bookmark3.id],
         )
-        self.bookmark3 = Bookmark.objects.create(
-            url="http://example3.com",
-            owner=self.user,
-            feed_url="http://example3.com/feed",
-            title="Test Bookmark 3",
+
+    def test_query_with_feed_sort_annotates_date(self):
+        bookmark = Bookmark.objects.query(owner=self.user, sort=BookmarkSort.FEED)[0]
+        self.assertEqual(
+            bookmark.feed_newest_item_date,
+            timezone.make_aware(datetime.datetime(2023, 1, 3, 10, 0, 0)),
         )
 
-        Feed.objects.create(
-            url="http://example1.com/feed",
-            title="Feed 1",
-            disabled=False,
-            newest_item_date=timezone.make_aware(
-                datetime.datetime(2023, 1, 1, 10, 0, 0)
-            ),
+    def test_query_with_feed_sort_and_since(self):
+        since = timezone.make_aware(datetime.datetime(2023, 1, 2, 0, 0, 0))
+        self.assertEqual(
+            self.query_ids(BookmarkSort.FEED, since=since),
+            [self.bookmark3.id, self.bookmark2.id],
         )
-        Feed.objects.create(
-            url="http://example2.com/feed",
-            title="Feed 2",
-            disabled=False,
-            newest_item_date=timezone.make_aware(
-                datetime.datetime(2023, 1, 2, 10, 0, 0)
-            ),
+
+    def test_query_excludes_null_feed_dates(self):
+        """Test that bookmarks without feed activity are excluded."""
+        bookmark_no_feed = Bookmark.objects.create(
+            url="http://example-no-feed.com",
+            owner=self.user,
+            feed_url="http://example-no-feed.com/feed",
+            title="Test Bookmark No Feed",
         )
-        Feed.objects.create(
-            url="http://example3.com/feed",
-            title="Feed 3",
-            disabled=False,
-            newest_item_date=timezone.make_aware(
-                datetime.datetime(2023, 1, 3, 10, 0, 0)
-            ),
+        bookmark_no_feed_url = Bookmark.objects.create(
+            url="http://example-no-feed-url.com",
+            owner=self.user,
+            title="Test Bookmark No Feed URL",
         )
 
-    def test_with_feed_newest_item_date(self):
-        queryset = Bookmark.objects.get_queryset_with_feeds_db()
-        bookmarks = list(queryset.with_feed_newest_item_date())
+        bookmark_ids = self.query_ids(BookmarkSort.FEED)
 
-        self.assertEqual(len(bookmarks), 3)
+        self.assertEqual(len(bookmark_ids), 3)
+        self.assertNotIn(bookmark_no_feed.id, bookmark_ids)
+        self.assertNotIn(bookmark_no_feed_url.id, bookmark_ids)
 
-        bookmark_dict = {bookmark.id: bookmark for bookmark in bookmarks}
+    def test_record_only_advances_dates(self):
+        feed_url = "http://example1.com/feed"
+        older = timezone.make_aware(datetime.datetime(2022, 12, 1, 10, 0, 0))
+        newer = timezone.make_aware(datetime.datetime(2023, 2, 1, 10, 0, 0))
 
-        expected_date1 = datetime.datetime(2023, 1, 1, 10, 0, 0)
-        expected_date2 = datetime.datetime(2023, 1, 2, 10, 0, 0)
-        expected_date3 = datetime.datetime(2023, 1, 3, 10, 0, 0)
+        FeedActivity.objects.record(feed_url, older)
+        self.assertEqual(self.query_ids(BookmarkSort.FEED)[-1], self.bookmark1.id)
 
-        self.assertEqual(
-            bookmark_dict[self.bookmark1.id].feed_newest_item_date.strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
-            expected_date1.strftime("%Y-%m-%d %H:%M:%S"),
-        )
-        self.assertEqual(
-            bookmark_dict[self.bookmark2.id].feed_newest_item_date.strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
-            expected_date2.strftime("%Y-%m-%d %H:%M:%S"),
-        )
-        self.assertEqual(
-            bookmark_dict[self.bookmark3.id].feed_newest_item_date.strftime(
-                "%Y-%m-%d %H:%M:%S"
-            ),
-            expected_date3.strftime("%Y-%m-%d %H:%M:%S"),
-        )
+        FeedActivity.objects.record(feed_url, newer)
+        self.assertEqual(self.query_ids(BookmarkSort.FEED)[0], self.bookmark1.id)
 
-        # Test ordering by the annotated field
-        ordered_bookmarks = list(
-            queryset.with_feed_newest_item_date().order_by("-feed_newest_item_date")
+        FeedActivity.objects.record("http://example4.com/feed", newer)
+        self.assertEqual(
+            FeedActivity.objects.get(
+                feed_url="http://example4.com/feed"
+            ).newest_item_date,
+            newer,
         )
-        self.assertEqual(len(ordered_bookmarks), 3)
-        self.assertEqual(ordered_bookmarks[0].id, self.bookmark3.id)
-        self.assertEqual(ordered_bookmarks[1].id, self.bookmark2.id)
-        self.assertEqual(ordered_bookmarks[2].id, self.bookmark1.id)
 
-    def test_order_by_feed_newest_item_date(self):
-        queryset = Bookmark.objects.get_queryset_with_feeds_db()
-        bookmarks = list(queryset.order_by_feed_newest_item_date())
 
-        self.assertEqual(len(bookmarks), 3)
+class FeedActivityProjectionTestCase(TestCase):
+    """Test that feed polling and syncing maintain the feed activity projection."""
 
-        self.assertEqual(bookmarks[0].id, self.bookmark3.id)
-        self.assertEqual(bookmarks[1].id, self.bookmark2.id)
-        self.assertEqual(bookmarks[2].id, self.bookmark1.id)
-
-    def test_order_by_feed_newest_item_date_asc(self):
-        """Test using the queryset with feeds database."""
-        queryset = Bookmark.objects.get_queryset_with_feeds_db()
-        bookmarks = list(queryset.order_by_feed_newest_item_date(False))
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
 
-        self.assertEqual(len(bookmarks), 3)
-        self.assertEqual(bookmarks[0].id, self.bookmark1.id)
-        self.assertEqual(bookmarks[1].id, self.bookmark2.id)
-        self.assertEqual(bookmarks[2].id, self.bookmark3.id)
+    def setUp(self):
+        from pebbling_apps.feeds.models import Feed
 
-    def test_exclude_null_feed_dates(self):
-        # Create a bookmark without a matching feed in the feeds database
-        bookmark_no_feed = Bookmark.objects.create(
-            url="http://example-no-feed.com",
-            owner=self.user,
-            feed_url="http://example-no-feed.com/feed",
-            title="Test Bookmark No Feed",
+        self.feed = Feed.objects.create(url="http://example.com/feed")
+
+    def parsed_feed(self, published):
+        return FeedParserDict(
+            feed=FeedParserDict(title="Example"),
+            entries=[
+                FeedParserDict(
+                    id="http://example.com/1",
+                    link="http://example.com/1",
+                    title="Item",
+                    published_parsed=published.timetuple(),
+                )
+            ],
         )
 
-        queryset = Bookmark.objects.get_queryset_with_feeds_db()
-        # Get all bookmarks with feed dates
-        all_bookmarks = list(queryset.with_feed_newest_item_date())
-        self.assertEqual(len(all_bookmarks), 4)  # All 4 bookmarks should be present
+    @patch("pebbling_apps.feeds.services.requests.get")
+    @patch("pebbling_apps.feeds.services.feedparser.parse")
+    def test_fetch_feed_records_newest_item_date(self, mock_parse, mock_get):
+        from pebbling_apps.feeds.services import FeedService
 
-        # Only bookmarks with non-null feed dates
-        filtered_bookmarks = list(
-            queryset.with_feed_newest_item_date().exclude_null_feed_dates()
-        )
-        self.assertEqual(
-            len(filtered_bookmarks), 3
-        )  # Only original 3 bookmarks should remain
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.iter_content.return_value = [b""]
+        mock_get.return_value.headers = {}
 
-        # Verify the bookmark with no feed is not in the filtered results
-        filtered_ids = [bookmark.id for bookmark in filtered_bookmarks]
-        self.assertNotIn(bookmark_no_feed.id, filtered_ids)
+        mock_parse.return_value = self.parsed_feed(datetime.datetime(2023, 1, 5, 10))
 
-        # Verify all other bookmarks are in the filtered results
-        self.assertIn(self.bookmark1.id, filtered_ids)
-        self.assertIn(self.bookmark2.id, filtered_ids)
-        self.assertIn(self.bookmark3.id, filtered_ids)
+        with self.settings(INBOX_DELIVERY_ENABLED=False):
+            FeedService().fetch_feed(self.feed)
 
+        activity = FeedActivity.objects.get(feed_url=self.feed.url)
+        self.assertEqual(activity.newest_item_date, self.feed.newest_item_date)
 
-@skipIf(
-    getattr(settings, "SQLITE_MULTIPLE_DB", True),
-    "Single database tests only run when SQLITE_MULTIPLE_DB is disabled",
-)
-class BookmarkManagerSingleDatabaseTestCase(TestCase):
-    """Test bookmark manager when using a single database."""
+    def test_sync_command_copies_feed_dates(self):
+        self.feed.newest_item_date = timezone.make_aware(
+            datetime.datetime(2023, 1, 5, 10, 0, 0)
+        )
+        self.feed.save()
+        FeedActivity.objects.create(feed_url=self.feed.url, newest_item_date=None)
 
-    def setUp(self):
-        from pebbling_apps.feeds.models import Feed
+        out = StringIO()
+        call_command("sync_feed_activity", stdout=out)
 
-        self.user = User.objects.create_user(username="testuser", password="12345")
+        self.assertIn("Synced activity for 1 feeds", out.getvalue())
+        self.assertEqual(
+            FeedActivity.objects.get(feed_url=self.feed.url).newest_item_date,
+            self.feed.newest_item_date,
+        )
 
-        # Create feeds
-        Feed.objects.create(
-            url="http://example1.com/feed",
-            title="Feed 1",
-            disabled=False,
-            newest_item_date=timezone.make_aware(
-                datetime.datetime(2023, 1, 1, 10, 0, 0)
-            ),
+
+class UnfurlRecordTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="12345"
         )
-        Feed.objects.create(
-            url="http://example2.com/feed",
-            title="Feed 2",
-            disabled=False,
-            newest_item_date=timezone.make_aware(
-                datetime.datetime(2023, 1, 2, 10, 0, 0)
-            ),
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="other@example.com", password="12345"
         )
-        Feed.objects.create(
-            url="http://example3.com/feed",
-            title="Feed 3",
-            disabled=False,
-            newest_item_date=timezone.make_aware(
-                datetime.datetime(2023, 1, 3, 10, 0, 0)
-            ),
+        self.metadata = UnfurlMetadata(
+            url="https://example.com/post",
+            metadata={
+                "opengraph": [
+                    {
+                        "properties": [
+                            ["og:image", "/image.jpg"],
+                            ["og:site_name", "Example Site"],
+                        ]
+                    }
+                ]
+            },
+            feeds=["https://example.com/feed"],
         )
 
-        # Create bookmarks
-        self.bookmark1 = Bookmark.objects.create(
-            url="http://example1.com",
+    def test_metadata_is_stored_once_per_normalized_url(self):
+        bookmark = Bookmark.objects.create(
+            url="https://example.com/post",
             owner=self.user,
-            feed_url="http://example1.com/feed",
-            title="Test Bookmark 1",
+            title="Post",
+            unfurl_metadata=self.metadata,
         )
-        self.bookmark2 = Bookmark.objects.create(
-            url="http://example2.com",
-            owner=self.user,
-            feed_url="http://example2.com/feed",
-            title="Test Bookmark 2",
+        other = Bookmark.objects.create(
+            url="https://example.com/post?utm_source=feed",
+            owner=self.other_user,
+            title="Post",
         )
-        self.bookmark3 = Bookmark.objects.create(
-            url="http://example3.com",
-            owner=self.user,
-            feed_url="http://example3.com/feed",
-            title="Test Bookmark 3",
+        item = InboxItem.objects.create(
+            url="https://example.com/post",
+            owner=self.other_user,
+            title="Post",
+            source="test",
         )
 
-    def test_query_with_feed_sort(self):
-        """Test querying bookmarks sorted by feed date in single database mode."""
-        bookmarks = Bookmark.objects.query(owner=self.user, sort=BookmarkSort.FEED)
-        bookmarks_list = list(bookmarks)
-
-        self.assertEqual(len(bookmarks_list), 3)
-        # Should be ordered by newest feed item date descending
-        self.assertEqual(bookmarks_list[0].id, self.bookmark3.id)
-        self.assertEqual(bookmarks_list[1].id, self.bookmark2.id)
-        self.assertEqual(bookmarks_list[2].id, self.bookmark1.id)
-
-    def test_query_with_feed_sort_ascending(self):
-        """Test querying bookmarks sorted by feed date ascending."""
-        bookmarks = Bookmark.objects.query(owner=self.user, sort=BookmarkSort.FEED_ASC)
-        bookmarks_list = list(bookmarks)
+        self.assertEqual(UnfurlRecord.objects.count(), 1)
+        for row in [other, item]:
+            row = type(row).objects.get(pk=row.pk)
+            self.assertEqual(row.unfurl_metadata.feed, "https://example.com/feed")
 
-        self.assertEqual(len(bookmarks_list), 3)
-        # Should be ordered by newest feed item date ascending
-        self.assertEqual(bookmarks_list[0].id, self.bookmark1.id)
-        self.assertEqual(bookmarks_list[1].id, self.bookmark2.id)
-        self.assertEqual(bookmarks_list[2].id, self.bookmark3.id)
+        bookmark = Bookmark.objects.get(pk=bookmark.pk)
+        self.assertEqual(bookmark.image_url, "https://example.com/image.jpg")
+        self.assertEqual(bookmark.site_name, "Example Site")
+        self.assertEqual(bookmark.feed_url, "https://example.com/feed")
 
-    def test_query_excludes_null_feed_dates(self):
-        """Test that bookmarks without matching feeds are excluded."""
-        # Create a bookmark without a matching feed
-        bookmark_no_feed = Bookmark.objects.create(
-            url="http://example-no-feed.com",
-            owner=self.user,
-            feed_url="http://example-no-feed.com/feed",
-            title="Test Bookmark No Feed",
+    def test_missing_record_reads_as_none_once(self):
+        bookmark = Bookmark.objects.create(
+            url="https://example.com/none", owner=self.user, title="None"
         )
+        bookmark = Bookmark.objects.get(pk=bookmark.pk)
 
-        bookmarks = Bookmark.objects.query(owner=self.user, sort=BookmarkSort.FEED)
-        bookmarks_list = list(bookmarks)
-
-        # Should only include bookmarks with matching feeds
-        self.assertEqual(len(bookmarks_list), 3)
-        bookmark_ids = [b.id for b in bookmarks_list]
-        self.assertNotIn(bookmark_no_feed.id, bookmark_ids)
+        with self.assertNumQueries(1):
+            self.assertIsNone(bookmark.unfurl_metadata)
+            self.assertIsNone(bookmark.unfurl_metadata)
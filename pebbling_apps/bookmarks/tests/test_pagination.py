@@ -0,0 +1,121 @@
+import datetime
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from pebbling_apps.bookmarks.models import Bookmark, BookmarkSort
+from pebbling_apps.common.pagination import (
+    InvalidCursor,
+    KeysetPaginator,
+    decode_cursor,
+    encode_cursor,
+)
+
+User = get_user_model()
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="12345")
+        base = timezone.make_aware(datetime.datetime(2025, 1, 1, 12, 0, 0))
+        self.bookmarks = []
+        for i in range(7):
+            self.bookmarks.append(
+                Bookmark.objects.create(
+                    url=f"https://example.com/{i}",
+                    owner=self.user,
+                    title=f"Bookmark {i % 3}",
+                    # Pairs of bookmarks share a timestamp to exercise the id tie-break
+                    created_at=base + datetime.timedelta(minutes=i // 2),
+                )
+            )
+
+    def walk(self, queryset, keyset, per_page):
+        paginator = KeysetPaginator(queryset, keyset, per_page)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(after=pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_pages_cover_every_row_once_in_order(self):
+        queryset = Bookmark.objects.query(owner=self.user, sort=BookmarkSort.DATE_DESC)
+        expected = list(queryset.values_list("id", flat=True))
+
+        _, pages = self.walk(queryset, [("created_at", True), ("id", True)], 3)
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([b.id for page in pages for b in page], expected)
+        self.assertFalse(pages[0].has_previous())
+        self.assertTrue(pages[1].has_previous())
+
+    def test_title_sort_with_duplicate_titles(self):
+        queryset = Bookmark.objects.query(owner=self.user, sort=BookmarkSort.TITLE)
+        expected = list(queryset.order_by("title", "id").values_list("id", flat=True))
+
+        _, pages = self.walk(queryset, [("title", False), ("id", False)], 2)
+
+        self.assertEqual([b.id for page in pages for b in page], expected)
+
+    def test_before_cursor_returns_previous_page(self):
+        queryset = Bookmark.objects.query(owner=self.user, sort=BookmarkSort.DATE_ASC)
+        paginator, pages = self.walk(
+            queryset, [("created_at", False), ("id", False)], 3
+        )
+
+        previous = paginator.get_page(before=pages[2].previous_cursor)
+
+        self.assertEqual([b.id for b in previous], [b.id for b in pages[1]])
+        self.assertTrue(previous.has_next())
+        self.assertTrue(previous.has_previous())
+
+    def test_invalid_cursors_are_rejected(self):
+        paginator = KeysetPaginator(
+            Bookmark.objects.all(), [("created_at", True), ("id", True)], 3
+        )
+        for token in ["not-a-cursor", encode_cursor([1]), encode_cursor(["x", "y"])]:
+            with self.subTest(token=token), self.assertRaises(InvalidCursor):
+                paginator.get_page(after=token)
+
+    def test_cursor_round_trip(self):
+        when = timezone.make_aware(datetime.datetime(2025, 1, 1, 12, 0, 0))
+        self.assertEqual(
+            decode_cursor(encode_cursor([when, 42])), [when.isoformat(), 42]
+        )
+
+
+class BookmarkListCursorViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="12345")
+        for i in range(5):
+            Bookmark.objects.create(
+                url=f"https://example.com/{i}", owner=self.user, title=f"Bookmark {i}"
+            )
+        self.url = reverse("profiles:view", args=[self.user.username])
+
+    def test_list_uses_cursor_pagination_by_default(self):
+        response = self.client.get(self.url, {"limit": 2})
+
+        page = response.context["page_obj"]
+        self.assertTrue(page.is_cursor)
+        self.assertNotContains(response, "Page 1 of")
+        self.assertContains(response, f"after={page.next_cursor}")
+
+        response = self.client.get(self.url, {"limit": 2, "after": page.next_cursor})
+        self.assertEqual(len(response.context["bookmarks"]), 2)
+        self.assertContains(response, "before=")
+
+    def test_page_parameter_keeps_offset_pagination(self):
+        response = self.client.get(self.url, {"limit": 2, "page": 2})
+
+        self.assertFalse(getattr(response.context["page_obj"], "is_cursor", False))
+        self.assertContains(response, "Page 2 of 3")
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(self.url, {"after": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_markdown_response_includes_link_header(self):
+        response = self.client.get(self.url, {"limit": 2, "format": "markdown"})
+
+        self.assertIn('rel="next"', response["Link"])
+        self.assertNotIn('rel="prev"', response["Link"])
@@ -0,0 +1,114 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from pebbling_apps.bookmarks.models import Bookmark, Tag
+from pebbling_apps.bookmarks.search import BookmarkSearchIndex
+from unittest import skipUnless
+
+
+User = get_user_model()
+
+
+@skipUnless(
+    BookmarkSearchIndex().is_supported(),
+    "Full-text search index is only maintained on SQLite and PostgreSQL",
+)
+class BookmarkSearchIndexTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="12345")
+        self.python_title = Bookmark.objects.create(
+            url="http://example.com/one",
+            owner=self.user,
+            title="Python packaging guide",
+            description="All about wheels",
+        )
+        self.python_description = Bookmark.objects.create(
+            url="http://example.com/two",
+            owner=self.user,
+            title="Weekly notes",
+            description="Some thoughts on python and rust",
+        )
+        self.unrelated = Bookmark.objects.create(
+            url="http://example.com/three",
+            owner=self.user,
+            title="Gardening",
+            description="Tomatoes",
+        )
+
+    def search_ids(self, search, **kwargs):
+        return [
+            b.id
+            for b in Bookmark.objects.query(owner=self.user, search=search, **kwargs)
+        ]
+
+    def test_search_matches_title_and_description(self):
+        ids = self.search_ids("python")
+        self.assertEqual(set(ids), {self.python_title.id, self.python_description.id})
+
+    def test_title_matches_rank_before_description_matches(self):
+        ids = self.search_ids("python")
+        self.assertEqual(ids[0], self.python_title.id)
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self.search_ids("pack"), [self.python_title.id])
+
+    def test_search_requires_every_term(self):
+        self.assertEqual(self.search_ids("python rust"), [self.python_description.id])
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(
+            set(self.search_ids('"python" (NEAR*')), set(self.search_ids("python near"))
+        )
+        self.assertEqual(self.search_ids("python*"), self.search_ids("python"))
+
+    def test_updated_title_is_reindexed(self):
+        self.unrelated.title = "Python in the garden"
+        self.unrelated.save()
+        self.assertIn(self.unrelated.id, self.search_ids("garden python"))
+
+    def test_deleted_bookmark_is_removed_from_index(self):
+        self.python_title.delete()
+        self.assertEqual(self.search_ids("packaging"), [])
+
+    def test_tag_changes_are_reindexed(self):
+        tag = Tag.objects.create(name="horticulture", owner=self.user)
+        self.unrelated.tags.add(tag)
+        self.assertEqual(self.search_ids("horticulture"), [self.unrelated.id])
+
+        self.unrelated.tags.remove(tag)
+        self.assertEqual(self.search_ids("horticulture"), [])
+
+        tag.bookmarks.add(self.unrelated)
+        self.assertEqual(self.search_ids("horticulture"), [self.unrelated.id])
+
+        tag.bookmarks.clear()
+        self.assertEqual(self.search_ids("horticulture"), [])
+
+    def test_renamed_and_deleted_tags_are_reindexed(self):
+        tag = Tag.objects.create(name="veg", owner=self.user)
+        self.unrelated.tags.add(tag)
+
+        tag.name = "vegetables"
+        tag.save()
+        self.assertEqual(self.search_ids("vegetables"), [self.unrelated.id])
+
+        tag.delete()
+        self.assertEqual(self.search_ids("vegetables"), [])
+
+    def test_rebuild_command_restores_index(self):
+        BookmarkSearchIndex().clear()
+        self.assertEqual(self.search_ids("python"), [])
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertIn("Rebuilt search index with 3 bookmarks", out.getvalue())
+        self.assertEqual(len(self.search_ids("python")), 2)
+
+    def test_search_does_not_duplicate_rows_with_many_tags(self):
+        for name in ["python-a", "python-b", "python-c"]:
+            self.python_title.tags.add(Tag.objects.create(name=name, owner=self.user))
+
+        ids = self.search_ids("python")
+        self.assertEqual(len(ids), len(set(ids)))
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from pebbling_apps.bookmarks.models import Bookmark, Tag
+from pebbling_apps.bookmarks.tag_filter import TagFilter
+
+User = get_user_model()
+
+
+class TagFilterTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="12345"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="12345"
+        )
+
+        def tags(owner, *names):
+            return [Tag.objects.get_or_create(name=n, owner=owner)[0] for n in names]
+
+        def bookmark(owner, name, tag_names):
+            b = Bookmark.objects.create(
+                url=f"https://example.com/{owner.username}/{name}",
+                owner=owner,
+                title=name,
+            )
+            b.tags.add(*tags(owner, *tag_names))
+            return b
+
+        self.python_django = bookmark(self.user, "pd", ["python", "django"])
+        self.python = bookmark(self.user, "p", ["python"])
+        self.rust = bookmark(self.user, "r", ["rust"])
+        self.other_python = bookmark(self.other, "op", ["python", "django"])
+
+    def ids(self, tag_filter, owner=None):
+        return set(
+            Bookmark.objects.query(owner=owner, tags=tag_filter).values_list(
+                "id", flat=True
+            )
+        )
+
+    def test_all_of(self):
+        self.assertEqual(
+            self.ids(TagFilter(all_of=("python", "django")), self.user),
+            {self.python_django.id},
+        )
+
+    def test_any_of(self):
+        self.assertEqual(
+            self.ids(TagFilter(any_of=("django", "rust")), self.user),
+            {self.python_django.id, self.rust.id},
+        )
+
+    def test_none_of(self):
+        self.assertEqual(
+            self.ids(TagFilter(all_of=("python",), none_of=("django",)), self.user),
+            {self.python.id},
+        )
+
+    def test_list_of_tags_matches_any_without_duplicates(self):
+        bookmarks = list(
+            Bookmark.objects.query(owner=self.user, tags=["python", "django"])
+        )
+        self.assertEqual(len(bookmarks), 2)
+
+    def test_other_owners_tags_are_ignored(self):
+        # A bookmark tagged with another user's tag of the same name never matches
+        self.rust.tags.add(Tag.objects.get(name="django", owner=self.other))
+        self.assertEqual(
+            self.ids(TagFilter(any_of=("django",)), self.user),
+            {self.python_django.id},
+        )
+        self.assertEqual(
+            self.ids(TagFilter(any_of=("django",))),
+            {self.python_django.id, self.other_python.id},
+        )
+
+    def test_filter_uses_semi_joins(self):
+        with CaptureQueriesContext(connection) as context:
+            list(Bookmark.objects.query(owner=self.user, tags=["python", "django"]))
+        sql = context.captured_queries[-1]["sql"]
+        self.assertNotIn("DISTINCT", sql)
+        self.assertIn('"bookmarks_bookmark"."id" IN (SELECT', sql)
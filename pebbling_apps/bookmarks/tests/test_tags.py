@@ -0,0 +1,113 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from pebbling_apps.bookmarks.models import Bookmark, Tag
+from pebbling_apps.inbox.models import InboxItem
+
+User = get_user_model()
+
+
+class TagUsageCountTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="12345"
+        )
+        self.python = Tag.objects.create(name="python", owner=self.user)
+        self.bookmarks = [
+            Bookmark.objects.create(
+                url=f"https://example.com/{i}", owner=self.user, title=f"Bookmark {i}"
+            )
+            for i in range(3)
+        ]
+
+    def counts(self):
+        self.python.refresh_from_db()
+        return self.python.bookmark_count, self.python.inbox_item_count
+
+    def test_bookmark_tag_changes_update_usage(self):
+        self.bookmarks[0].tags.add(self.python)
+        self.bookmarks[0].tags.add(self.python)
+        self.python.bookmarks.add(self.bookmarks[1], self.bookmarks[2])
+        self.assertEqual(self.counts(), (3, 0))
+        self.assertIsNotNone(self.python.last_used_at)
+
+        self.bookmarks[0].tags.remove(self.python)
+        self.python.bookmarks.remove(self.bookmarks[0], self.bookmarks[1])
+        self.assertEqual(self.counts(), (1, 0))
+
+        self.bookmarks[2].delete()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_inbox_tag_changes_update_usage(self):
+        item = InboxItem.objects.create(
+            url="https://example.com/inbox", owner=self.user, title="Item", source="t"
+        )
+        item.tags.add(self.python)
+        self.python.inbox_items.add(item)
+        self.bookmarks[0].tags.add(self.python)
+        self.assertEqual(self.counts(), (1, 1))
+        self.assertEqual(self.python.usage_count, 2)
+
+        item.tags.clear()
+        self.assertEqual(self.counts(), (1, 0))
+
+        item.tags.add(self.python)
+        item.delete()
+        self.assertEqual(self.counts(), (1, 0))
+
+    def test_reconcile_recounts_usage(self):
+        self.bookmarks[0].tags.add(self.python)
+        Tag.objects.filter(pk=self.python.pk).update(bookmark_count=7)
+
+        out = StringIO()
+        call_command("reconcile_bookmark_counts", stdout=out)
+
+        self.assertIn("Repaired usage counts for 1 tags", out.getvalue())
+        self.assertEqual(self.counts(), (1, 0))
+
+
+class TagListViewTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="12345"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="12345"
+        )
+        self.client.login(username="testuser", password="12345")
+
+        for i, name in enumerate(["python", "pytest", "rust"]):
+            tag = Tag.objects.create(name=name, owner=self.user)
+            for j in range(i + 1):
+                Bookmark.objects.create(
+                    url=f"https://example.com/{name}/{j}", owner=self.user, title=name
+                ).tags.add(tag)
+        Tag.objects.create(name="pyramid", owner=self.other)
+
+    def tag_names(self, **params):
+        response = self.client.get(reverse("bookmarks:tag_list"), params)
+        return [tag.name for tag in response.context["tags"]]
+
+    def test_lists_only_own_tags_by_name(self):
+        self.assertEqual(self.tag_names(), ["pytest", "python", "rust"])
+
+    def test_sort_by_count_and_recency(self):
+        self.assertEqual(self.tag_names(sort="count"), ["rust", "pytest", "python"])
+        self.assertEqual(self.tag_names(sort="recent"), ["rust", "pytest", "python"])
+
+    def test_prefix_filter(self):
+        self.assertEqual(self.tag_names(prefix="py"), ["pytest", "python"])
+
+    def test_suggest_tags(self):
+        response = self.client.get(reverse("bookmarks:suggest_tags"), {"q": "py"})
+        self.assertEqual(
+            response.json(),
+            {
+                "tags": [
+                    {"name": "pytest", "count": 2},
+                    {"name": "python", "count": 1},
+                ]
+            },
+        )
@@ -14,6 +14,7 @@ from .views import (
     BookmarkImportRetryView,
     BookmarkImportCancelView,
     fetch_unfurl_metadata,
+    suggest_tags,
 )
 
 app_name = "bookmarks"
@@ -22,6 +23,7 @@ urlpatterns = [
     path("bookmarks/", BookmarkListView.as_view(), name="list"),
     path("bookmarks/new", BookmarkCreateView.as_view(), name="add"),
     path("bookmarks/unfurl", fetch_unfurl_metadata, name="unfurl"),
+    path("bookmarks/tags/suggest", suggest_tags, name="suggest_tags"),
     path(
         "bookmarks/export/netscape.html",
         BookmarkExportNetscapeView.as_view(),
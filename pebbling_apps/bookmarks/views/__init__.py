@@ -30,7 +30,7 @@ from .import_views import (
     BookmarkImportRetryView,
     BookmarkImportCancelView,
 )
-from .api import fetch_unfurl_metadata
+from .api import fetch_unfurl_metadata, suggest_tags
 
 __all__ = [
     # Base classes
@@ -55,4 +55,5 @@ __all__ = [
     "BookmarkImportCancelView",
     # API
     "fetch_unfurl_metadata",
+    "suggest_tags",
 ]
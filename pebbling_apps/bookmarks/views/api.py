@@ -4,7 +4,10 @@ from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
 
-from pebbling_apps.unfurl.unfurl import UnfurlMetadata
+from pebbling_apps.unfurl.services import UnfurlService
+from ..models import Tag
+
+TAG_SUGGESTION_LIMIT = 10
 
 
 @login_required
@@ -12,16 +15,42 @@ from pebbling_apps.unfurl.unfurl import UnfurlMetadata
 def fetch_unfurl_metadata(request):
     """Fetch and return UnfurlMetadata for a given URL.
     Primarily in support of pc-bookmark-form
+
+    With ?cached=1 this never fetches in the request: a miss queues the
+    unfurl and answers 202, and the caller polls until it gets a 200.
     """
     url = request.GET.get("href")
     if not url:
         return JsonResponse({"error": "Missing href parameter"}, status=400)
+    fetch = request.GET.get("cached") != "1"
     try:
-        metadata = UnfurlMetadata(url=url)
-        metadata.unfurl()
+        metadata = UnfurlService().get_metadata(url, fetch=fetch)
+        if metadata is None:
+            return JsonResponse({"pending": True}, status=202)
         out = metadata.to_dict(omit_html=True)
         out["title"] = metadata.title
         out["description"] = metadata.description
         return JsonResponse(out)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+@login_required
+@require_GET
+def suggest_tags(request):
+    """Suggest the user's tags starting with ?q=, for tag typeahead.
+    Primarily in support of pc-bookmark-form
+    """
+    prefix = request.GET.get("q", "").strip()
+    if not prefix:
+        return JsonResponse({"tags": []})
+
+    tags = (
+        Tag.objects.with_prefix(prefix)
+        .filter(owner=request.user, is_system=False)
+        .order_by("name")
+        .values("name", "bookmark_count")[:TAG_SUGGESTION_LIMIT]
+    )
+    return JsonResponse(
+        {"tags": [{"name": t["name"], "count": t["bookmark_count"]} for t in tags]}
+    )
@@ -1,9 +1,16 @@
 """Base classes and mixins for bookmark views."""
 
+from django.db.models import Prefetch
 from django.views.generic import ListView
-from django.http import HttpResponse, StreamingHttpResponse
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from pebbling_apps.common.pagination import (
+    CountedPaginator,
+    InvalidCursor,
+    KeysetPaginator,
+)
 from pebbling_apps.common.utils import django_enum, parse_since
-from ..models import Bookmark, BookmarkSort
+from pebbling_apps.unfurl.models import UnfurlRecord
+from ..models import BOOKMARK_SORT_KEYSETS, Bookmark, BookmarkCount, BookmarkSort, Tag
 from ..serializers import MarkdownBookmarkSerializer
 from enum import StrEnum, auto
 
@@ -18,6 +25,8 @@ class BookmarkAttachmentNames(StrEnum):
 class BookmarkQueryListView(ListView):
     """Base class for bookmark list views with query support."""
 
+    paginator_class = CountedPaginator
+
     def get_paginate_by(self, queryset=None):
         limit = self.request.GET.get("limit", 10)
         return int(limit) if str(limit).isdigit() else 10
@@ -34,14 +43,112 @@ class BookmarkQueryListView(ListView):
 
         return kwargs
 
+    # Columns read by bookmarks/_bookmark.html and by the sort keysets
+    list_columns = [
+        "url",
+        "title",
+        "description",
+        "created_at",
+        "owner__username",
+        "unique_hash",
+        "image_url",
+        "feed_url",
+    ]
+
     def get_queryset(self):
-        return Bookmark.objects.query(**self.get_query_kwargs())
+        self.query_kwargs = self.get_query_kwargs()
+        return self.prepare_list_queryset(Bookmark.objects.query(**self.query_kwargs))
+
+    def prepare_list_queryset(self, queryset):
+        """
+        Load everything a rendered page needs in a fixed number of queries:
+        owners by join, tags by one prefetch, and only the displayed columns.
+        Full unfurl metadata is fetched in one more query, and only when the
+        unfurl attachment is shown.
+        """
+        from ..context_processors import get_show_attachments
+
+        queryset = (
+            queryset.select_related("owner")
+            .prefetch_related(Prefetch("tags", queryset=Tag.objects.only("id", "name")))
+            .only(*self.list_columns)
+        )
+        if BookmarkAttachmentNames.UNFURL.value in get_show_attachments(self.request):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "unfurl_record",
+                    queryset=UnfurlRecord.objects.only("url_hash", "metadata"),
+                )
+            )
+        return queryset
+
+    def get_cached_count(self):
+        """
+        Return the total for the current query from the denormalized count
+        store, or None when the query is filtered in a way it does not cover.
+        """
+        query_kwargs = getattr(self, "query_kwargs", None) or self.get_query_kwargs()
+        return BookmarkCount.objects.for_query(**query_kwargs)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, count=self.get_cached_count(), **kwargs
+        )
+
+    def get_pagination_keyset(self):
+        """
+        Return the keyset used for cursor pagination, or None to fall back to
+        numbered pages. Search results are ordered by rank and an explicit
+        ?page= asks for offsets, so both keep using the offset paginator.
+        """
+        if self.request.GET.get("q") or self.page_kwarg in self.request.GET:
+            return None
+        sort = self.request.GET.get("sort", BookmarkSort.DATE_DESC)
+        return BOOKMARK_SORT_KEYSETS.get(sort)
+
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate by ?after= / ?before= cursors whenever the sort allows it."""
+        keyset = self.get_pagination_keyset()
+        if keyset is None:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, keyset, page_size)
+        try:
+            page = paginator.get_page(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        except InvalidCursor as e:
+            raise Http404(str(e)) from e
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_cursor_links(self, page):
+        """
+        Build a Link header value pointing at the next and previous pages of
+        a cursor-paginated response.
+        """
+        links = []
+        for rel, param, cursor in (
+            ("next", "after", page.next_cursor),
+            ("prev", "before", page.previous_cursor),
+        ):
+            if not cursor:
+                continue
+            params = self.request.GET.copy()
+            params.pop("after", None)
+            params.pop("before", None)
+            params[param] = cursor
+            url = self.request.build_absolute_uri(
+                f"{self.request.path}?{params.urlencode()}"
+            )
+            links.append(f'<{url}>; rel="{rel}"')
+        return ", ".join(links)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         # Copy all the bookmark query kwargs to the template context with a prefix
-        query_kwargs = self.get_query_kwargs()
+        query_kwargs = getattr(self, "query_kwargs", None) or self.get_query_kwargs()
         for key, value in query_kwargs.items():
             context[f"bookmark_query_{key}"] = value
 
@@ -80,7 +187,10 @@ class BookmarkQueryListView(ListView):
         # Use streaming for large result sets (>1000 bookmarks)
         # and when not paginated (limit parameter not set or very high)
         limit = self.get_paginate_by(queryset)
-        return limit >= 1000 and queryset.count() > 1000
+        if limit < 1000:
+            return False
+        count = self.get_cached_count()
+        return (count if count is not None else queryset.count()) > 1000
 
     def render_markdown_response(self):
         """
@@ -94,16 +204,24 @@ class BookmarkQueryListView(ListView):
 
         # Optimize queryset for markdown rendering
         # We only need basic bookmark fields, not tags or complex relations
-        queryset = queryset.only("url", "title", "description", "created_at")
+        queryset = (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .only("url", "title", "description", "created_at")
+        )
 
         # Check if we should use streaming response for large datasets
         if self.should_use_streaming_response(queryset):
             return self.render_streaming_markdown_response(queryset)
 
         # Apply pagination to match HTML view behavior
-        paginator = self.get_paginator(queryset, self.get_paginate_by(queryset))
-        page_number = self.request.GET.get(self.page_kwarg, 1)
-        page = paginator.get_page(page_number)
+        page_size = self.get_paginate_by(queryset)
+        if self.get_pagination_keyset() is None:
+            paginator = self.get_paginator(queryset, page_size)
+            page_number = self.request.GET.get(self.page_kwarg, 1)
+            page = paginator.get_page(page_number)
+        else:
+            _, page, _, _ = self.paginate_queryset(queryset, page_size)
 
         # Serialize the bookmarks to markdown
         serializer = MarkdownBookmarkSerializer()
@@ -113,6 +231,10 @@ class BookmarkQueryListView(ListView):
         response = HttpResponse(
             markdown_content, content_type="text/plain; charset=utf-8"
         )
+        if getattr(page, "is_cursor", False):
+            links = self.get_cursor_links(page)
+            if links:
+                response["Link"] = links
         return response
 
     def render_streaming_markdown_response(self, queryset):
@@ -5,10 +5,11 @@ from django.urls import reverse_lazy
 from django.shortcuts import render, redirect
 from django.views.generic import CreateView, UpdateView, DeleteView
 from django.core.exceptions import PermissionDenied
-from pebbling_apps.unfurl.unfurl import UnfurlMetadata
+from pebbling_apps.unfurl.services import UnfurlFailed, UnfurlService
 
 from ..models import Bookmark
 from ..forms import BookmarkForm
+from ..tasks import unfurl_bookmark_metadata
 from .base import BookmarkQueryListView
 
 
@@ -53,11 +54,17 @@ class BookmarkCreateView(LoginRequiredMixin, CreateView):
                 )
                 return initial
 
-            # No existing bookmark - try to fetch metadata
+            # No existing bookmark - use cached metadata if there is any. On a
+            # miss the unfurl is queued and the form polls for the result, so
+            # a slow site never holds up this request
             try:
-                unfurl_metadata = UnfurlMetadata(url=url)
-                unfurl_metadata.unfurl()  # Fetch and parse metadata
+                unfurl_metadata = UnfurlService().get_metadata(url, fetch=False)
+            except UnfurlFailed:
+                unfurl_metadata = None
+            else:
+                self.unfurl_pending = unfurl_metadata is None
 
+            if unfurl_metadata:
                 initial.update(
                     {
                         "url": url,
@@ -70,8 +77,8 @@ class BookmarkCreateView(LoginRequiredMixin, CreateView):
                         "unfurl_metadata": unfurl_metadata,
                     }
                 )
-            except Exception as e:
-                # If metadata fetch fails, just use query parameters
+            else:
+                # Without metadata yet, just use query parameters
                 initial.update(
                     {
                         "url": url,
@@ -88,6 +95,7 @@ class BookmarkCreateView(LoginRequiredMixin, CreateView):
         context = super().get_context_data(**kwargs)
         if hasattr(self, "existing_bookmark"):
             context["existing_bookmark"] = self.existing_bookmark
+        context["unfurl_pending"] = getattr(self, "unfurl_pending", False)
         # Add minimal_layout flag if popup parameter is present
         context["minimal_layout"] = "popup" in self.request.GET
         return context
@@ -103,6 +111,10 @@ class BookmarkCreateView(LoginRequiredMixin, CreateView):
         form.instance.owner = self.request.user
         self.object = form.save()
 
+        # Submitted before the unfurl finished, so finish it in the background
+        if not form.cleaned_data.get("unfurl_metadata"):
+            unfurl_bookmark_metadata.apply_async(args=[self.object.id], priority=9)
+
         # Check for next parameter
         next_param = self.request.GET.get("next")
         if next_param == "close":
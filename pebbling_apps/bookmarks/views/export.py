@@ -4,6 +4,7 @@ import datetime
 import json
 import logging
 import time
+from dataclasses import replace
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import StreamingHttpResponse, HttpResponseBadRequest
@@ -14,6 +15,7 @@ from pebbling_apps.common.utils import parse_since
 from ..models import Bookmark, Tag
 from ..exporters import NetscapeBookmarkExporter, OPMLBookmarkExporter
 from ..serializers import ActivityStreamSerializer
+from ..tag_filter import TagFilter
 from ..streaming import StreamingJSONResponse, stream_bookmark_collection
 
 logger = logging.getLogger("pebbling_apps.bookmarks")
@@ -26,17 +28,34 @@ class ExportParameterValidationMixin:
         """
         Validate tag parameters from request.
 
+        Bookmarks must carry every ?tag=, at least one ?any_tag= and none of
+        the ?exclude_tag= values, all matched against the user's own tags.
+        Excluding a tag the user does not have excludes nothing.
+
         Returns:
-            Tuple of (tags_list, error_response) where error_response is None on success
+            Tuple of (tag_filter, error_response) where error_response is None on success
         """
-        tags = request.GET.getlist("tag")
-        if tags:
-            for tag_name in tags:
-                if not Tag.objects.filter(name=tag_name).exists():
+        tag_filter = TagFilter(
+            all_of=tuple(request.GET.getlist("tag")),
+            any_of=tuple(request.GET.getlist("any_tag")),
+            none_of=tuple(request.GET.getlist("exclude_tag")),
+        )
+        if tag_filter:
+            existing = set(
+                Tag.objects.filter(
+                    owner=request.user, name__in=tag_filter.names()
+                ).values_list("name", flat=True)
+            )
+            for tag_name in tag_filter.all_of + tag_filter.any_of:
+                if tag_name not in existing:
                     return None, HttpResponseBadRequest(
                         f"Tag '{tag_name}' does not exist"
                     )
-        return tags, None
+            tag_filter = replace(
+                tag_filter,
+                none_of=tuple(name for name in tag_filter.none_of if name in existing),
+            )
+        return tag_filter, None
 
     def validate_since(self, request):
         """
@@ -104,17 +123,10 @@ class BookmarkExportNetscapeView(
             try:
                 yield exporter.generate_header()
 
-                # Get user's bookmarks with prefetched tags
-                bookmarks = Bookmark.objects.query(owner=request.user).prefetch_related(
-                    "tags"
-                )
-
-                # Apply tag filtering if requested
-                if tags:
-                    # Filter bookmarks that have ALL specified tags
-                    for tag_name in tags:
-                        bookmarks = bookmarks.filter(tags__name=tag_name)
-                    bookmarks = bookmarks.distinct()
+                # Get user's bookmarks, filtered by tag, with prefetched tags
+                bookmarks = Bookmark.objects.query(
+                    owner=request.user, tags=tags
+                ).prefetch_related("tags")
 
                 # Apply date filtering if requested
                 if since_date:
@@ -150,7 +162,7 @@ class BookmarkExportNetscapeView(
             f"User {request.user.username} exported bookmarks",
             extra={
                 "user": request.user.username,
-                "tags": tags,
+                "tags": list(tags.names()),
                 "since": request.GET.get("since"),
                 "limit": limit_value,
                 "timestamp": datetime.datetime.now().isoformat(),
@@ -187,18 +199,11 @@ class BookmarkExportActivityStreamView(
             try:
                 # Get user's bookmarks with optimized prefetching
                 bookmarks = (
-                    Bookmark.objects.query(owner=request.user)
-                    .prefetch_related("tags")
+                    Bookmark.objects.query(owner=request.user, tags=tags)
+                    .prefetch_related("tags", "unfurl_record")
                     .select_related("owner")  # Optimize owner queries
                 )
 
-                # Apply tag filtering if requested
-                if tags:
-                    # Filter bookmarks that have ALL specified tags
-                    for tag_name in tags:
-                        bookmarks = bookmarks.filter(tags__name=tag_name)
-                    bookmarks = bookmarks.distinct()
-
                 # Apply date filtering if requested
                 if since_date:
                     bookmarks = bookmarks.filter(created_at__gte=since_date)
@@ -276,7 +281,7 @@ class BookmarkExportActivityStreamView(
             extra={
                 "user": request.user.username,
                 "format": "activitystream",
-                "tags": tags,
+                "tags": list(tags.names()),
                 "since": request.GET.get("since"),
                 "limit": limit_value,
                 "timestamp": datetime.datetime.now().isoformat(),
@@ -310,17 +315,10 @@ class BookmarkExportOPMLView(LoginRequiredMixin, ExportParameterValidationMixin,
             try:
                 yield exporter.generate_header(user=request.user)
 
-                # Get user's bookmarks with prefetched tags
-                bookmarks = Bookmark.objects.query(owner=request.user).prefetch_related(
-                    "tags"
-                )
-
-                # Apply tag filtering if requested
-                if tags:
-                    # Filter bookmarks that have ALL specified tags
-                    for tag_name in tags:
-                        bookmarks = bookmarks.filter(tags__name=tag_name)
-                    bookmarks = bookmarks.distinct()
+                # Get user's bookmarks, filtered by tag, with prefetched tags
+                bookmarks = Bookmark.objects.query(
+                    owner=request.user, tags=tags
+                ).prefetch_related("tags")
 
                 # Apply date filtering if requested
                 if since_date:
@@ -359,7 +357,7 @@ class BookmarkExportOPMLView(LoginRequiredMixin, ExportParameterValidationMixin,
             extra={
                 "user": request.user.username,
                 "format": "opml",
-                "tags": tags,
+                "tags": list(tags.names()),
                 "since": request.GET.get("since"),
                 "limit": limit_value,
                 "timestamp": datetime.datetime.now().isoformat(),
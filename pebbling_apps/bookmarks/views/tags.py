@@ -1,11 +1,20 @@
 """Tag-related views."""
 
+from django.db.models import F
 from django.views.generic import ListView
 from urllib.parse import unquote
 
 from ..models import Bookmark, Tag
 from .base import BookmarkQueryListView
 
+# Tag list orderings, served by the (owner, name), (owner, bookmark_count)
+# and (owner, last_used_at) indexes
+TAG_SORT_COLUMNS = {
+    "name": ["name"],
+    "count": ["-bookmark_count", "name"],
+    "recent": [F("last_used_at").desc(nulls_last=True), "name"],
+}
+
 
 class TagListView(ListView):
     """View to show all tags belonging to the user."""
@@ -19,9 +28,22 @@ class TagListView(ListView):
         limit = self.request.GET.get("limit", default_limit)
         return int(limit) if str(limit).isdigit() else default_limit
 
+    def get_sort(self):
+        sort = self.request.GET.get("sort", "name")
+        return sort if sort in TAG_SORT_COLUMNS else "name"
+
     def get_queryset(self):
         """Return tags only for the logged-in user."""
-        return Tag.objects.order_by("name")
+        queryset = Tag.objects.with_prefix(self.request.GET.get("prefix", ""))
+        if self.request.user.is_authenticated:
+            queryset = queryset.filter(owner=self.request.user)
+        return queryset.order_by(*TAG_SORT_COLUMNS[self.get_sort()])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["tag_sort"] = self.get_sort()
+        context["tag_prefix"] = self.request.GET.get("prefix", "")
+        return context
 
 
 class TagDetailView(BookmarkQueryListView):
@@ -0,0 +1,42 @@
+"""
+Lightweight counters kept in the default cache, so that web and worker
+processes all add to the same totals.
+
+Metrics are best effort: a cache outage is logged and otherwise ignored, so
+recording a metric never fails the code being measured.
+"""
+
+import logging
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics:"
+
+
+def increment(name: str, amount: int = 1) -> None:
+    """Add amount to the named counter."""
+    key = KEY_PREFIX + name
+    try:
+        if not cache.add(key, amount, timeout=None):
+            cache.incr(key, amount)
+    except Exception as e:
+        logger.debug(f"Could not record metric {name}: {e}")
+
+
+def get_counts(names: Iterable[str]) -> Dict[str, int]:
+    """Current values of the named counters, zero for any never recorded."""
+    names = list(names)
+    try:
+        values = cache.get_many([KEY_PREFIX + name for name in names])
+    except Exception as e:
+        logger.warning(f"Could not read metrics: {e}")
+        values = {}
+    return {name: values.get(KEY_PREFIX + name, 0) for name in names}
+
+
+def reset(names: Iterable[str]) -> None:
+    """Set the named counters back to zero."""
+    cache.delete_many([KEY_PREFIX + name for name in names])
@@ -0,0 +1,190 @@
+import base64
+import datetime
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+# A keyset is a list of (field name, descending) pairs that totally orders a
+# queryset; the last pair should be a unique column such as the primary key.
+Keyset = Sequence[Tuple[str, bool]]
+
+
+class InvalidCursor(ValueError):
+    """Raised when an opaque pagination cursor cannot be decoded."""
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode keyset values as an opaque, URL-safe token."""
+    serializable = [
+        value.isoformat() if isinstance(value, datetime.datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(serializable, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> List[Any]:
+    """Decode a token produced by encode_cursor back into raw JSON values."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token}") from e
+    if not isinstance(values, list):
+        raise InvalidCursor(f"Invalid cursor: {token}")
+    return values
+
+
+class KeysetPage:
+    """A page of results located by cursor rather than by page number."""
+
+    is_cursor = True
+
+    def __init__(
+        self,
+        object_list,
+        paginator,
+        has_next: bool,
+        has_previous: bool,
+        next_cursor: Optional[str],
+        previous_cursor: Optional[str],
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<KeysetPage next={self.next_cursor} previous={self.previous_cursor}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking past the last row seen, instead of using
+    OFFSET. Every page costs one indexed range scan of per_page + 1 rows and
+    no COUNT(*), no matter how deep it is.
+    """
+
+    def __init__(self, queryset, keyset: Keyset, per_page: int):
+        self.queryset = queryset
+        self.keyset = list(keyset)
+        self.per_page = int(per_page)
+
+    def get_page(
+        self, after: Optional[str] = None, before: Optional[str] = None
+    ) -> KeysetPage:
+        """
+        Return the page following the `after` cursor, or preceding the
+        `before` cursor, or the first page when neither is given.
+
+        Raises:
+            InvalidCursor: If a cursor is malformed
+        """
+        backwards = bool(before) and not after
+        queryset = self.queryset.order_by(*self._ordering(reverse=backwards))
+
+        cursor = after or before
+        if cursor:
+            queryset = queryset.filter(self._seek(self._parse(cursor), backwards))
+
+        rows = list(queryset[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if backwards:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+
+        return KeysetPage(
+            rows,
+            self,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=self.cursor_for(rows[-1]) if rows and has_next else None,
+            previous_cursor=self.cursor_for(rows[0]) if rows and has_previous else None,
+        )
+
+    def cursor_for(self, obj) -> str:
+        """Build the cursor pointing at the given row."""
+        return encode_cursor([getattr(obj, name) for name, _ in self.keyset])
+
+    def _ordering(self, reverse: bool = False) -> List[str]:
+        return [
+            f"{'-' if descending != reverse else ''}{name}"
+            for name, descending in self.keyset
+        ]
+
+    def _parse(self, token: str) -> List[Any]:
+        values = decode_cursor(token)
+        if len(values) != len(self.keyset):
+            raise InvalidCursor(f"Invalid cursor: {token}")
+        try:
+            return [
+                self._field_for(name).to_python(value)
+                for (name, _), value in zip(self.keyset, values)
+            ]
+        except (ValidationError, FieldDoesNotExist) as e:
+            raise InvalidCursor(f"Invalid cursor: {token}") from e
+
+    def _field_for(self, name: str):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def _seek(self, values: List[Any], backwards: bool) -> Q:
+        """
+        Build the row-value comparison (k1, k2, ...) > (v1, v2, ...) as a
+        disjunction, led by an inclusive range on the first key so that the
+        database can seek straight to the cursor in a composite index.
+        """
+        condition = Q()
+        for position, (name, descending) in enumerate(self.keyset):
+            lookup = "lt" if descending != backwards else "gt"
+            term = Q(**{f"{name}__{lookup}": values[position]})
+            for earlier, (earlier_name, _) in enumerate(self.keyset[:position]):
+                term &= Q(**{earlier_name: values[earlier]})
+            condition |= term
+
+        first_name, first_descending = self.keyset[0]
+        first_lookup = "lte" if first_descending != backwards else "gte"
+        return Q(**{f"{first_name}__{first_lookup}": values[0]}) & condition
+
+
+class CountedPaginator(Paginator):
+    """
+    Offset paginator that trusts a precomputed total, when one is given,
+    instead of running COUNT(*) over the object list.
+    """
+
+    def __init__(self, object_list, per_page, count: Optional[int] = None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            # Prime the cached_property so Paginator.count never queries
+            self.__dict__["count"] = count
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from .models import Feed, FeedItem
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.html import format_html
 from .tasks import poll_feed, poll_all_feeds
 
@@ -13,10 +14,26 @@ class FeedAdmin(admin.ModelAdmin):
         "url",
         "updated_at",
         "newest_item_date",
+        "fetch_count",
+        "not_modified_percent",
+        "bytes_saved",
+        "disabled",
+        "consecutive_failures",
+        "last_status_code",
+        "failed_fetch_seconds",
         "view_feeditems_link",
     )
+    list_filter = ("disabled", "last_status_code")
     search_fields = ("title", "url")
-    actions = ["poll_selected_feeds", "poll_all_feeds_action"]
+    actions = [
+        "poll_selected_feeds",
+        "enable_selected_feeds",
+        "poll_all_feeds_action",
+    ]
+
+    @admin.display(description="304 rate")
+    def not_modified_percent(self, obj):
+        return f"{obj.not_modified_rate:.0%}"
 
     @admin.display(description="FeedItems")
     def view_feeditems_link(self, obj):
@@ -33,6 +50,15 @@ class FeedAdmin(admin.ModelAdmin):
             request, f"Queued {count} feed{'s' if count != 1 else ''} for polling"
         )
 
+    @admin.action(description="Re-enable selected feeds")
+    def enable_selected_feeds(self, request, queryset):
+        count = queryset.update(
+            disabled=False, consecutive_failures=0, next_poll_at=timezone.now()
+        )
+        self.message_user(
+            request, f"Re-enabled {count} feed{'s' if count != 1 else ''}"
+        )
+
     @admin.action(description="Poll ALL feeds (ignore selection)")
     def poll_all_feeds_action(self, request, queryset):
         poll_all_feeds.delay()
@@ -0,0 +1,111 @@
+"""
+A local HTTP server serving synthetic feeds, for exercising the poller
+without touching the network. Used by the tests and benchmark_feed_poller.
+
+Each server serves /feeds/<n>.xml for any number n, as an RSS feed with a
+fixed number of items, and answers 304 to a matching If-None-Match.
+"""
+
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FEED_PATH = re.compile(r"^/feeds/(\d+)\.xml$")
+
+
+def synthetic_feed(n: int, items: int) -> bytes:
+    """An RSS document for feed number n with the given number of items."""
+    entries = "".join(
+        f"""
+    <item>
+        <guid>urn:fixture:{n}:{i}</guid>
+        <link>http://fixture.invalid/{n}/{i}</link>
+        <title>Feed {n} item {i}</title>
+        <description>Item {i} of synthetic feed {n}.</description>
+        <pubDate>{formatdate(1_700_000_000 + n * 3600 + i * 60, usegmt=True)}</pubDate>
+    </item>"""
+        for i in range(items)
+    )
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0">
+<channel>
+    <title>Synthetic feed {n}</title>
+    <link>http://fixture.invalid/{n}</link>{entries}
+</channel>
+</rss>
+""".encode(
+        "utf-8"
+    )
+
+
+class FixtureFeedHTTPServer(ThreadingHTTPServer):
+    """A threading server carrying the settings its handlers read."""
+
+    daemon_threads = True
+    items: int = 10
+    delay: float = 0
+
+
+class FixtureFeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like real feed servers
+
+    def do_GET(self):
+        match = FEED_PATH.match(self.path)
+        if not match:
+            self.send_error(404)
+            return
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        n = int(match.group(1))
+        etag = f'"{n}-{self.server.items}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = synthetic_feed(n, self.server.items)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark and test output quiet
+
+
+class FixtureFeedServer:
+    """
+    Serve synthetic feeds on 127.0.0.1 from a background thread while in
+    use as a context manager. delay adds seconds of latency per response.
+    """
+
+    def __init__(self, items: int = 10, delay: float = 0):
+        self.httpd = FixtureFeedHTTPServer(("127.0.0.1", 0), FixtureFeedHandler)
+        self.httpd.items = items
+        self.httpd.delay = delay
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode("ascii")
+        return f"http://{host}:{port}"
+
+    def feed_url(self, n: int) -> str:
+        return f"{self.base_url}/feeds/{n}.xml"
+
+    def __enter__(self) -> "FixtureFeedServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
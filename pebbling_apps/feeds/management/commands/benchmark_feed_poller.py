@@ -0,0 +1,105 @@
+import contextlib
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from pebbling_apps.feeds.fixture_server import FixtureFeedServer
+from pebbling_apps.feeds.models import Feed
+from pebbling_apps.feeds.poller import (
+    FEEDS_POLL_BATCH_SIZE,
+    FEEDS_POLL_CONCURRENCY,
+    FEEDS_POLL_PARSE_PROCESSES,
+    FEEDS_POLL_PER_HOST,
+    BatchPoller,
+)
+from pebbling_apps.feeds.services import FeedService
+
+
+class BenchmarkFeedService(FeedService):
+    """Keep synthetic feeds out of the inbox and the bookmarks' projections."""
+
+    def _is_inbox_delivery_enabled(self) -> bool:
+        return False
+
+    def _record_feed_activity(self, feed: Feed) -> None:
+        pass
+
+
+class Command(BaseCommand):
+    help = """Benchmark the batch feed poller against local synthetic feeds.
+
+    Starts fixture HTTP servers on 127.0.0.1, creates a Feed for each
+    synthetic feed, and polls them all in batches. The first round downloads
+    and stores every feed; later rounds exercise the 304 path. The feeds are
+    deleted afterwards unless --keep is given.
+
+    Examples:
+        python manage.py benchmark_feed_poller
+        python manage.py benchmark_feed_poller --feeds 1000 --delay 0.05
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--feeds", type=int, default=10000)
+        parser.add_argument("--items", type=int, default=10, help="Items per feed")
+        parser.add_argument(
+            "--hosts", type=int, default=20, help="Fixture servers to spread over"
+        )
+        parser.add_argument(
+            "--delay", type=float, default=0, help="Seconds of latency per response"
+        )
+        parser.add_argument("--rounds", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=FEEDS_POLL_BATCH_SIZE)
+        parser.add_argument("--concurrency", type=int, default=FEEDS_POLL_CONCURRENCY)
+        parser.add_argument("--per-host", type=int, default=FEEDS_POLL_PER_HOST)
+        parser.add_argument(
+            "--parse-processes", type=int, default=FEEDS_POLL_PARSE_PROCESSES
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the synthetic feeds"
+        )
+
+    def handle(self, *args, **options):
+        with contextlib.ExitStack() as stack:
+            servers = [
+                stack.enter_context(
+                    FixtureFeedServer(items=options["items"], delay=options["delay"])
+                )
+                for _ in range(options["hosts"])
+            ]
+            urls = [
+                servers[n % len(servers)].feed_url(n) for n in range(options["feeds"])
+            ]
+            Feed.objects.bulk_create([Feed(url=url) for url in urls], batch_size=1000)
+            if not options["keep"]:
+                stack.callback(Feed.objects.filter(url__in=urls).delete)
+
+            feed_ids = list(
+                Feed.objects.filter(url__in=urls).values_list("id", flat=True)
+            )
+            self.stdout.write(
+                f"Polling {len(feed_ids)} feeds of {options['items']} items "
+                f"from {len(servers)} hosts"
+            )
+            for round_number in range(1, options["rounds"] + 1):
+                self._run_round(round_number, feed_ids, options)
+
+    def _run_round(self, round_number, feed_ids, options):
+        batch_size = options["batch_size"]
+        start = time.monotonic()
+        totals = Counter()
+        with BatchPoller(
+            concurrency=options["concurrency"],
+            per_host=options["per_host"],
+            parse_processes=options["parse_processes"],
+            service=BenchmarkFeedService(),
+        ) as poller:
+            for i in range(0, len(feed_ids), batch_size):
+                batch = Feed.objects.filter(id__in=feed_ids[i : i + batch_size])
+                totals.update(poller.poll(batch))
+
+        elapsed = time.monotonic() - start
+        rate = len(feed_ids) / elapsed if elapsed else 0
+        summary = ", ".join(f"{k}={v}" for k, v in sorted(totals.items()))
+        self.stdout.write(
+            f"Round {round_number}: {elapsed:.1f}s, {rate:.0f} feeds/s ({summary})"
+        )
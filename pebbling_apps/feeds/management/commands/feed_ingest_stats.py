@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from pebbling_apps.common import metrics
+from ...models import (
+    METRIC_BODIES_UNCHANGED,
+    METRIC_ITEMS_UNCHANGED,
+    METRIC_ITEMS_WRITTEN,
+    METRICS,
+)
+
+
+class Command(BaseCommand):
+    help = """Show how many feed item writes were avoided by content hashing.
+
+    Counts accumulate across worker processes until reset.
+
+    Examples:
+        python manage.py feed_ingest_stats
+        python manage.py feed_ingest_stats --reset
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters to zero after showing them",
+        )
+
+    def handle(self, *args, **options):
+        counts = metrics.get_counts(METRICS)
+        for name, value in counts.items():
+            self.stdout.write(f"{name}: {value}")
+
+        seen = counts[METRIC_ITEMS_WRITTEN] + counts[METRIC_ITEMS_UNCHANGED]
+        if seen:
+            avoided = counts[METRIC_ITEMS_UNCHANGED] / seen
+            self.stdout.write(
+                f"Item writes avoided: {avoided:.1%} of {seen} items seen, "
+                f"plus {counts[METRIC_BODIES_UNCHANGED]} unchanged feed bodies"
+            )
+
+        if options["reset"]:
+            metrics.reset(METRICS)
+            self.stdout.write(self.style.SUCCESS("Counters reset"))
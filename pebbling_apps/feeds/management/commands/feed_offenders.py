@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from ...models import Feed
+
+
+class Command(BaseCommand):
+    help = """List the feeds that have wasted the most fetch time on failed polls.
+
+    Feeds are disabled automatically after FEEDS_MAX_CONSECUTIVE_FAILURES
+    failures in a row; they can be re-enabled from the admin.
+
+    Examples:
+        python manage.py feed_offenders
+        python manage.py feed_offenders --limit 50 --active
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Number of feeds to list"
+        )
+        parser.add_argument(
+            "--active", action="store_true", help="Only list feeds not disabled"
+        )
+
+    def handle(self, *args, **options):
+        feeds = Feed.objects.filter(failure_count__gt=0)
+        if options["active"]:
+            feeds = feeds.filter(disabled=False)
+        feeds = feeds.order_by("-failed_fetch_seconds", "-failure_count")
+
+        for feed in feeds[: options["limit"]]:
+            status = "disabled" if feed.disabled else "active"
+            self.stdout.write(
+                f"{feed.failed_fetch_seconds:8.1f}s  {feed.failure_count:5} failures "
+                f"({feed.consecutive_failures} in a row, HTTP "
+                f"{feed.last_status_code or '-'}, {status})  {feed.url}"
+            )
+            if feed.last_error:
+                self.stdout.write(f"          {feed.last_error}")
@@ -20,7 +20,7 @@ class Command(BaseCommand):
             service = FeedService()
             feed, created = service.get_or_create_feed(url)
 
-            if service.fetch_feed(feed):
+            if service.fetch_feed_once(feed):
                 message = f"Successfully fetched feed: {feed}"
                 logger.info(message)
             else:
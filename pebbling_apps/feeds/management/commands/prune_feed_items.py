@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...retention import (
+    FEEDS_PRUNE_BATCH_SIZE,
+    FEEDS_RETAIN_DAYS,
+    FEEDS_RETAIN_ITEMS,
+    FEEDS_VACUUM_PAGES,
+    compact_feeds_database,
+    prune_feed_items,
+)
+
+
+class Command(BaseCommand):
+    help = """Delete old feed items and return the freed space to the filesystem.
+
+    Each feed keeps its newest --keep-items items and every item from the
+    last --keep-days days, whichever is more. The feeds database is then
+    compacted with an incremental vacuum; --full-vacuum switches an existing
+    SQLite database to incremental auto_vacuum, which needs a full VACUUM.
+
+    Examples:
+        python manage.py prune_feed_items
+        python manage.py prune_feed_items --keep-items 50 --keep-days 30
+        python manage.py prune_feed_items --no-prune --full-vacuum
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--keep-items", type=int, default=FEEDS_RETAIN_ITEMS)
+        parser.add_argument("--keep-days", type=int, default=FEEDS_RETAIN_DAYS)
+        parser.add_argument("--batch-size", type=int, default=FEEDS_PRUNE_BATCH_SIZE)
+        parser.add_argument(
+            "--vacuum-pages",
+            type=int,
+            default=FEEDS_VACUUM_PAGES,
+            help="Free pages to reclaim, 0 for all",
+        )
+        parser.add_argument(
+            "--no-prune", action="store_true", help="Only compact the database"
+        )
+        parser.add_argument(
+            "--full-vacuum",
+            action="store_true",
+            help="Switch to incremental auto_vacuum and VACUUM the whole database",
+        )
+
+    def handle(self, *args, **options):
+        if options["keep_items"] < 1:
+            raise CommandError("--keep-items must be at least 1")
+
+        if not options["no_prune"]:
+            deleted = prune_feed_items(
+                keep_items=options["keep_items"],
+                keep_days=options["keep_days"],
+                batch_size=options["batch_size"],
+            )
+            self.stdout.write(f"Deleted {deleted} feed items")
+
+        result = compact_feeds_database(
+            pages=options["vacuum_pages"], full=options["full_vacuum"]
+        )
+        self.stdout.write(
+            f"Reclaimed {result.reclaimed_bytes} bytes "
+            f"({result.free_pages_before - result.free_pages_after} pages)"
+        )
+        if not result.incremental:
+            self.stdout.write(
+                self.style.WARNING(
+                    "Incremental vacuum is off; run with --full-vacuum to enable it"
+                )
+            )
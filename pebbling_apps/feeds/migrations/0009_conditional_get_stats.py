@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0008_fix_poll_feeds_priority"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="bytes_fetched",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="bytes_saved",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="fetch_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="last_response_bytes",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="not_modified_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="feed",
+            name="modified",
+            field=models.CharField(blank=True, max_length=256, null=True),
+        ),
+    ]
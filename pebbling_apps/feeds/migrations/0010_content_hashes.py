@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0009_conditional_get_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="body_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="feeditem",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
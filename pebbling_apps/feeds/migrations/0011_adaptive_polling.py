@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0010_content_hashes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="last_polled_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="next_poll_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="poll_interval",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="feed",
+            index=models.Index(
+                fields=["disabled", "next_poll_at"],
+                name="feeds_feed_disable_28cd5e_idx",
+            ),
+        ),
+    ]
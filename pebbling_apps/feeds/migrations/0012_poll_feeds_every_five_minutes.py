@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def poll_feeds_every_five_minutes(apps, schema_editor):
+    """Tick often now that each run only defers the feeds that are due."""
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+
+    schedule, _ = IntervalSchedule.objects.get_or_create(every=5, period="minutes")
+    PeriodicTask.objects.filter(name="Poll All Feeds").update(interval=schedule)
+
+
+def poll_feeds_every_thirty_minutes(apps, schema_editor):
+    """Revert to the previous schedule (for rollback)."""
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+
+    schedule, _ = IntervalSchedule.objects.get_or_create(every=30, period="minutes")
+    PeriodicTask.objects.filter(name="Poll All Feeds").update(interval=schedule)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0011_adaptive_polling"),
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            poll_feeds_every_five_minutes,
+            poll_feeds_every_thirty_minutes,
+        ),
+    ]
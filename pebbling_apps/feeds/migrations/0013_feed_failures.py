@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0012_poll_feeds_every_five_minutes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="consecutive_failures",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="failed_fetch_seconds",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="failure_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="last_error",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="last_error_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="last_status_code",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
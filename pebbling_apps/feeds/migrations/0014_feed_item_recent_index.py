@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0013_feed_failures"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="feeditem",
+            index=models.Index(
+                fields=["feed", "-date"], name="feeds_feedi_feed_id_c747bf_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def create_prune_feed_items_schedule(apps, schema_editor):
+    """Create a daily periodic task pruning old feed items."""
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+
+    schedule, _ = IntervalSchedule.objects.get_or_create(every=1, period="days")
+
+    PeriodicTask.objects.get_or_create(
+        name="Prune Feed Items",
+        defaults={
+            "task": "prune_feed_items",
+            "interval": schedule,
+            "enabled": True,
+            "description": "Deletes feed items outside the retention window",
+        },
+    )
+
+
+def remove_prune_feed_items_schedule(apps, schema_editor):
+    """Remove the prune feed items periodic task."""
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(name="Prune Feed Items").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0014_feed_item_recent_index"),
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_prune_feed_items_schedule,
+            remove_prune_feed_items_schedule,
+        ),
+    ]
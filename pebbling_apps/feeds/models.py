@@ -1,23 +1,47 @@
 import contextlib
+from collections import defaultdict
 from django.db import models
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 import datetime
+import hashlib
+import json
 import logging
 import time
+from typing import Optional
 from feedparser import FeedParserDict
 from django.conf import settings
 from django.db import connections
+from pebbling_apps.common import metrics
 from pebbling_apps.common.models import TimestampedModel
 import sqlite3
 
 logger = logging.getLogger(__name__)
 
+# Counters for write amplification avoided, see pebbling_apps.common.metrics
+METRIC_ITEMS_WRITTEN = "feeds.items_written"
+METRIC_ITEMS_UNCHANGED = "feeds.items_unchanged"
+METRIC_BODIES_UNCHANGED = "feeds.bodies_unchanged"
+METRICS = [METRIC_ITEMS_WRITTEN, METRIC_ITEMS_UNCHANGED, METRIC_BODIES_UNCHANGED]
+
+
+def content_digest(value) -> str:
+    """SHA-256 of raw bytes, or of a parsed value in canonical JSON form."""
+    if not isinstance(value, bytes):
+        value = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
 
 class FeedManager(models.Manager):
     def active_feeds(self) -> models.QuerySet:
         """Return all active feeds (not disabled)."""
         return self.filter(disabled=False)
 
+    def due_feeds(self, now: datetime.datetime) -> models.QuerySet:
+        """Return active feeds whose next poll is due."""
+        return self.active_feeds().filter(next_poll_at__lte=now)
+
     def recent_feeds(self) -> models.QuerySet:
         """Return feeds ordered by newest item date."""
         return self.order_by("-newest_item_date")
@@ -32,21 +56,139 @@ class FeedItemManager(models.Manager):
         """Return all items for a specific feed."""
         return self.filter(feed=feed)
 
+    def recent_items_by_feed(
+        self,
+        feed_ids: list,
+        since: Optional[datetime.datetime] = None,
+        per_feed_limit: Optional[int] = None,
+        include_json: bool = False,
+    ) -> dict:
+        """
+        Return lists of the most recent items for each feed, keyed by feed
+        id, fetched in a single query. Each feed's items are ranked with
+        ROW_NUMBER() over its partition, so per_feed_limit applies per feed.
+        The json blob is only loaded when include_json is set.
+        """
+        items = self.filter(feed_id__in=feed_ids)
+        if since:
+            items = items.filter(date__gte=since)
+        if not include_json:
+            items = items.defer("json")
+        if per_feed_limit is not None:
+            items = items.annotate(
+                feed_rank=Window(
+                    RowNumber(),
+                    partition_by=F("feed_id"),
+                    order_by=F("date").desc(),
+                )
+            ).filter(feed_rank__lte=per_feed_limit)
+
+        items_by_feed = defaultdict(list)
+        for item in items.order_by("feed_id", "-date"):
+            items_by_feed[item.feed_id].append(item)
+        return items_by_feed
+
+    def parse_published(self, entry: dict):
+        """Return the entry's published date as an aware datetime, or None."""
+        published_parsed = entry.get("published_parsed")
+        if published_parsed is None:
+            return None
+        try:
+            published = datetime.datetime.fromtimestamp(time.mktime(published_parsed))
+            return timezone.make_aware(published)
+        except Exception as e:
+            logger.warning(
+                f"Failed to parse date for entry: {entry.get('id', 'unknown')}: {e}"
+            )
+            return None
+
+    def bulk_ingest_parsed(self, feed: "Feed", entries: list) -> list:
+        """
+        Insert or update FeedItems for all parsed entries of one poll in a
+        constant number of queries, and return the entries that were new.
+        Items whose content digest matches the stored one only have
+        last_seen_at touched.
+        """
+        now = timezone.now()
+        entries_by_guid: dict[str, dict] = {}
+        for entry in entries:
+            guid = entry.get("id", entry.get("link"))
+            if guid:
+                entries_by_guid.setdefault(guid, entry)
+        if not entries_by_guid:
+            return []
+
+        # Existing items keep the date they were first stored with
+        existing = {
+            guid: (date, content_hash)
+            for guid, date, content_hash in self.filter(
+                feed=feed, guid__in=list(entries_by_guid)
+            )
+            .order_by()
+            .values_list("guid", "date", "content_hash")
+        }
+
+        items = []
+        unchanged_guids = []
+        new_entries = []
+        newest_item_date = feed.newest_item_date
+        for guid, entry in entries_by_guid.items():
+            existing_date, existing_hash = existing.get(guid, (None, None))
+            content_hash = content_digest(entry)
+            if content_hash == existing_hash:
+                unchanged_guids.append(guid)
+                continue
+            published = existing_date or self.parse_published(entry)
+            if guid not in existing:
+                new_entries.append(entry)
+            if published and (not newest_item_date or published > newest_item_date):
+                newest_item_date = published
+            items.append(
+                self.model(
+                    feed=feed,
+                    guid=guid,
+                    last_seen_at=now,
+                    title=entry.get("title", ""),
+                    link=entry.get("link", ""),
+                    description=entry.get("description", ""),
+                    summary=entry.get("summary", ""),
+                    date=published or now,
+                    json=entry,
+                    content_hash=content_hash,
+                    updated_at=now,
+                )
+            )
+
+        if unchanged_guids:
+            self.filter(feed=feed, guid__in=unchanged_guids).update(last_seen_at=now)
+        if items:
+            self.bulk_create(
+                items,
+                update_conflicts=True,
+                unique_fields=["feed", "guid"],
+                update_fields=[
+                    "last_seen_at",
+                    "title",
+                    "link",
+                    "description",
+                    "summary",
+                    "json",
+                    "content_hash",
+                    "updated_at",
+                ],
+            )
+        metrics.increment(METRIC_ITEMS_WRITTEN, len(items))
+        metrics.increment(METRIC_ITEMS_UNCHANGED, len(unchanged_guids))
+
+        if newest_item_date != feed.newest_item_date:
+            feed.newest_item_date = newest_item_date
+            feed.save(update_fields=["newest_item_date"])
+
+        return new_entries
+
     def update_or_create_from_parsed(self, feed: "Feed", entry: dict) -> tuple:
         """Update or create a FeedItem from a parsed entry."""
-        published = None
-        if "published_parsed" in entry:
-            try:
-                published_parsed = entry.get("published_parsed")
-                if published_parsed is not None:
-                    published = datetime.datetime.fromtimestamp(
-                        time.mktime(published_parsed)
-                    )
-                    published = timezone.make_aware(published)
-            except Exception as e:
-                logger.warning(
-                    f"Failed to parse date for entry: {entry.get('id', 'unknown')}: {e}"
-                )
+        published = self.parse_published(entry)
 
         # Attempt to fetch an existing FeedItem
         feed_item = self.filter(
@@ -69,6 +211,7 @@ class FeedItemManager(models.Manager):
                 "summary": entry.get("summary", ""),
                 "date": published or timezone.now(),
                 "json": entry,
+                "content_hash": content_digest(entry),
             },
         )
 
@@ -88,14 +231,43 @@ class Feed(TimestampedModel):
     newest_item_date = models.DateTimeField(null=True, blank=True)
     disabled = models.BooleanField(default=False)
     etag = models.CharField(max_length=256, blank=True, null=True)
-    modified = models.CharField(max_length=256, unique=True, blank=True, null=True)
+    modified = models.CharField(max_length=256, blank=True, null=True)
     json = models.JSONField(blank=True, null=True)
+    # Digest of the last feed body parsed, to skip parsing an identical one
+    body_hash = models.CharField(max_length=64, blank=True, default="")
+
+    # Conditional GET statistics, see FeedService.fetch_feed()
+    fetch_count = models.PositiveIntegerField(default=0)
+    not_modified_count = models.PositiveIntegerField(default=0)
+    bytes_fetched = models.PositiveBigIntegerField(default=0)
+    bytes_saved = models.PositiveBigIntegerField(default=0)
+    last_response_bytes = models.PositiveIntegerField(default=0)
+
+    # Adaptive polling schedule, see pebbling_apps.feeds.scheduling
+    last_polled_at = models.DateTimeField(null=True, blank=True)
+    next_poll_at = models.DateTimeField(default=timezone.now)
+    poll_interval = models.PositiveIntegerField(null=True, blank=True)
+
+    # Failed polls, see FeedService.record_failure()
+    consecutive_failures = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+    failed_fetch_seconds = models.FloatField(default=0)
+    last_status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    last_error_at = models.DateTimeField(null=True, blank=True)
 
     objects = FeedManager()  # Assign the custom manager
 
     def __str__(self) -> str:
         return self.title or self.url
 
+    @property
+    def not_modified_rate(self) -> float:
+        """Fraction of polls answered with 304 Not Modified."""
+        if not self.fetch_count:
+            return 0.0
+        return self.not_modified_count / self.fetch_count
+
     @classmethod
     def get_active_feed_urls_by_date(cls):
         """Returns a list of feed URLs ordered by newest_item_date."""
@@ -113,12 +285,27 @@ class Feed(TimestampedModel):
         )
 
     def update_from_parsed(self, parsed_feed: FeedParserDict) -> None:
-        """Update the feed's JSON data and title from the parsed feed."""
+        """
+        Update the feed's JSON data and title from the parsed feed, saving
+        them with the validators and body hash. Only these columns are
+        written, so counters and flags changed since the feed was loaded
+        are left alone.
+        """
         self.json = {
             key: value for key, value in parsed_feed.items() if key != "entries"
         }
         self.title = parsed_feed.get("title", "")
-        self.save()
+        self.updated_at = timezone.now()
+        self.save(
+            update_fields=[
+                "json",
+                "title",
+                "etag",
+                "modified",
+                "body_hash",
+                "updated_at",
+            ]
+        )
 
     def to_dict(self) -> dict:
         """Convert Feed instance to a dictionary for JSON serialization."""
@@ -142,6 +329,7 @@ class Feed(TimestampedModel):
         indexes = [
             models.Index(fields=["newest_item_date"]),
             models.Index(fields=["disabled"]),
+            models.Index(fields=["disabled", "next_poll_at"]),
         ]
 
 
@@ -157,15 +345,20 @@ class FeedItem(TimestampedModel):
     last_seen_at = models.DateTimeField(default=timezone.now)
     first_seen_at = models.DateTimeField(auto_now_add=True)
     json = models.JSONField(blank=True, null=True)
+    # Digest of the parsed entry, to skip rewriting an unchanged item
+    content_hash = models.CharField(max_length=64, blank=True, default="")
 
     objects = FeedItemManager()
 
     def __str__(self) -> str:
         return self.title
 
-    def to_dict(self) -> dict:
-        """Convert FeedItem instance to a dictionary for JSON serialization."""
-        return {
+    def to_dict(self, include_json: bool = True) -> dict:
+        """
+        Convert FeedItem instance to a dictionary for JSON serialization,
+        leaving out the json blob unless include_json is set.
+        """
+        data = {
             "id": self.id,
             "feed_id": self.feed_id,
             "guid": self.guid,
@@ -176,16 +369,19 @@ class FeedItem(TimestampedModel):
             "description": self.description,
             "last_seen_at": self.last_seen_at.isoformat(),
             "first_seen_at": self.first_seen_at.isoformat(),
-            "json": self.json,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
+        if include_json:
+            data["json"] = self.json
+        return data
 
     class Meta:
         ordering = ["-date"]
         indexes = [
             models.Index(fields=["guid"]),
             models.Index(fields=["date"]),
+            models.Index(fields=["feed", "-date"]),
             models.Index(fields=["last_seen_at"]),
         ]
         constraints = [
@@ -0,0 +1,22 @@
+"""
+Feed parsing kept free of Django imports, so that it can run in worker
+processes that never set Django up.
+"""
+
+from typing import Optional
+
+import feedparser
+from feedparser import FeedParserDict
+
+
+def parse_feed_body(
+    content: bytes, url: str, content_type: Optional[str] = None
+) -> FeedParserDict:
+    """Parse a downloaded feed body, resolving relative links against url."""
+    return feedparser.parse(
+        content,
+        response_headers={
+            "content-location": url,
+            "content-type": content_type or "",
+        },
+    )
@@ -0,0 +1,161 @@
+"""
+Poll a batch of feeds from one worker process.
+
+Downloads run concurrently on a thread pool sharing one keep-alive
+connection pool, with at most FEEDS_POLL_PER_HOST requests in flight to any
+one host. Bodies that need parsing go to a process pool, since feedparser is
+CPU bound. Everything that touches the database stays on the calling thread.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Iterable, Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .models import Feed
+from .parsing import parse_feed_body
+from .services import FeedResponse, FeedService
+from .single_flight import acquire_poll_lock, mark_polled, release_poll_lock
+
+logger = logging.getLogger(__name__)
+
+# Downloads in flight at once, in total and per host
+FEEDS_POLL_CONCURRENCY = getattr(settings, "FEEDS_POLL_CONCURRENCY", 32)
+FEEDS_POLL_PER_HOST = getattr(settings, "FEEDS_POLL_PER_HOST", 4)
+# Processes parsing feed bodies; 0 parses on the calling thread instead
+FEEDS_POLL_PARSE_PROCESSES = getattr(
+    settings, "FEEDS_POLL_PARSE_PROCESSES", os.cpu_count() or 1
+)
+# Feeds handed to each batch by poll_all_feeds
+FEEDS_POLL_BATCH_SIZE = getattr(settings, "FEEDS_POLL_BATCH_SIZE", 500)
+
+# Outcomes counted by BatchPoller.poll()
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+# Already being polled elsewhere
+SKIPPED = "skipped"
+
+
+class BatchPoller:
+    def __init__(
+        self,
+        concurrency: int = FEEDS_POLL_CONCURRENCY,
+        per_host: int = FEEDS_POLL_PER_HOST,
+        parse_processes: int = FEEDS_POLL_PARSE_PROCESSES,
+        service: Optional[FeedService] = None,
+    ):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.parse_processes = parse_processes
+        self.service = service or FeedService()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=per_host)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_limits: dict = {}
+        self._host_limits_lock = threading.Lock()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "BatchPoller":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def poll(self, feeds: Iterable[Feed]) -> Counter:
+        """
+        Poll every feed not already being polled elsewhere, returning a count
+        of outcomes by kind.
+        """
+        outcomes: Counter = Counter()
+        lock_tokens = {}
+        # Spawn rather than fork, since the download threads may be running
+        parse_pool = (
+            ProcessPoolExecutor(
+                max_workers=self.parse_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if self.parse_processes
+            else None
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as fetch_pool:
+                downloads = {}
+                for feed in feeds:
+                    token = acquire_poll_lock(feed.id)
+                    if token is None:
+                        outcomes[SKIPPED] += 1
+                        continue
+                    lock_tokens[feed.id] = token
+                    downloads[fetch_pool.submit(self._download, feed)] = feed
+
+                parses = {}
+                for future in as_completed(downloads):
+                    feed = downloads[future]
+                    try:
+                        response = future.result()
+                        if self.service.record_unparsed(feed, response):
+                            mark_polled(feed.id)
+                            outcomes[UNCHANGED] += 1
+                            continue
+                        args = (
+                            response.content,
+                            response.url,
+                            response.headers.get("content-type"),
+                        )
+                        if parse_pool is None:
+                            parsed = parse_feed_body(*args)
+                            self.service.store_parsed(feed, response, parsed)
+                            mark_polled(feed.id)
+                            outcomes[UPDATED] += 1
+                        else:
+                            parses[parse_pool.submit(parse_feed_body, *args)] = (
+                                feed,
+                                response,
+                            )
+                    except Exception as e:
+                        logger.error(f"Error polling feed {feed.url}: {e}")
+                        self.service.record_failure(feed, e)
+                        outcomes[FAILED] += 1
+
+            for future in as_completed(parses):
+                feed, response = parses[future]
+                try:
+                    self.service.store_parsed(feed, response, future.result())
+                    mark_polled(feed.id)
+                    outcomes[UPDATED] += 1
+                except Exception as e:
+                    logger.error(f"Error storing feed {feed.url}: {e}")
+                    self.service.record_failure(feed, e)
+                    outcomes[FAILED] += 1
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown(cancel_futures=True)
+            for feed_id, token in lock_tokens.items():
+                release_poll_lock(feed_id, token)
+
+        return outcomes
+
+    def _download(self, feed: Feed) -> FeedResponse:
+        with self._host_limit(feed.url):
+            return self.service.download(feed, self.session)
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
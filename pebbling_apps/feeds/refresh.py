@@ -0,0 +1,64 @@
+"""
+Asynchronous feed refreshes for /feeds/fetch. A refresh queues a poll for
+each feed and hands back a token; the client polls /feeds/refresh/<token>
+until every feed's poll has finished. A feed already being refreshed for
+someone else is not queued again, so concurrent refreshes share one poll.
+"""
+
+import secrets
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+# How long a queued poll blocks another refresh of the same feed
+FEEDS_REFRESH_TIMEOUT = getattr(settings, "FEEDS_REFRESH_TIMEOUT", 60)
+# How long a refresh token can be checked on
+FEEDS_REFRESH_TOKEN_TIMEOUT = getattr(settings, "FEEDS_REFRESH_TOKEN_TIMEOUT", 5 * 60)
+
+IN_FLIGHT_KEY_PREFIX = "feeds_refresh:feed:"
+TOKEN_KEY_PREFIX = "feeds_refresh:token:"
+
+
+def in_flight_key(feed_id: int) -> str:
+    return f"{IN_FLIGHT_KEY_PREFIX}{feed_id}"
+
+
+def start_refresh(feed_ids: Iterable[int]) -> str:
+    """Queue a poll for each feed not already being refreshed, returning a token."""
+    from .tasks import poll_feed
+
+    feed_ids = list(feed_ids)
+    token = secrets.token_urlsafe(16)
+    for feed_id in feed_ids:
+        # Only the first refresh to claim a feed queues its poll
+        if cache.add(in_flight_key(feed_id), token, FEEDS_REFRESH_TIMEOUT):
+            poll_feed.apply_async(
+                args=[feed_id], kwargs={"refresh_token": token}, priority=3
+            )
+    cache.set(TOKEN_KEY_PREFIX + token, feed_ids, FEEDS_REFRESH_TOKEN_TIMEOUT)
+    return token
+
+
+def finish_refresh(feed_id: int, token: str) -> None:
+    """
+    Mark the poll queued for the feed by the refresh with this token as
+    done, whether or not it succeeded. Other polls of the feed, like those
+    from the scheduler, leave a refresh's claim in place.
+    """
+    key = in_flight_key(feed_id)
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def refresh_status(token: str) -> Optional[tuple]:
+    """
+    Return (feed_ids, pending_feed_ids) for a refresh token, or None if the
+    token is unknown or expired.
+    """
+    feed_ids = cache.get(TOKEN_KEY_PREFIX + token)
+    if feed_ids is None:
+        return None
+    in_flight = cache.get_many([in_flight_key(feed_id) for feed_id in feed_ids])
+    pending = [feed_id for feed_id in feed_ids if in_flight_key(feed_id) in in_flight]
+    return feed_ids, pending
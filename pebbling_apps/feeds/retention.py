@@ -0,0 +1,146 @@
+"""
+Feed item retention. Each feed keeps its newest FEEDS_RETAIN_ITEMS items,
+every item from the last FEEDS_RETAIN_DAYS days, whichever is more, and
+every item the feed still publishes; older items that have left the feed
+are deleted in batches of FEEDS_PRUNE_BATCH_SIZE, each committed on
+its own so that no single write holds the database for long.
+"""
+
+import datetime
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Feed, FeedItem
+
+logger = logging.getLogger(__name__)
+
+FEEDS_RETAIN_ITEMS = getattr(settings, "FEEDS_RETAIN_ITEMS", 100)
+FEEDS_RETAIN_DAYS = getattr(settings, "FEEDS_RETAIN_DAYS", 90)
+FEEDS_PRUNE_BATCH_SIZE = getattr(settings, "FEEDS_PRUNE_BATCH_SIZE", 500)
+# Seconds to pause between batches, letting other writers and checkpoints in
+FEEDS_PRUNE_BATCH_PAUSE = getattr(settings, "FEEDS_PRUNE_BATCH_PAUSE", 0.1)
+# Free pages returned to the filesystem per compaction; 0 returns them all
+FEEDS_VACUUM_PAGES = getattr(settings, "FEEDS_VACUUM_PAGES", 0)
+
+# SQLite's PRAGMA auto_vacuum value for incremental mode
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class CompactionResult:
+    """Free pages before and after a compaction, and bytes per page."""
+
+    page_size: int = 0
+    free_pages_before: int = 0
+    free_pages_after: int = 0
+    incremental: bool = False
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return (self.free_pages_before - self.free_pages_after) * self.page_size
+
+
+def prune_feed_items(
+    keep_items: int = FEEDS_RETAIN_ITEMS,
+    keep_days: int = FEEDS_RETAIN_DAYS,
+    batch_size: int = FEEDS_PRUNE_BATCH_SIZE,
+    pause: float = FEEDS_PRUNE_BATCH_PAUSE,
+    now: Optional[datetime.datetime] = None,
+) -> int:
+    """Delete feed items outside the retention window, returning how many."""
+    if keep_items < 1:
+        raise ValueError("keep_items must be at least 1")
+    cutoff = (now or timezone.now()) - datetime.timedelta(days=keep_days)
+
+    feed_ids = list(
+        FeedItem.objects.filter(date__lt=cutoff)
+        .order_by()
+        .values_list("feed_id", flat=True)
+        .distinct()
+    )
+    deleted = 0
+    for feed_id in feed_ids:
+        # The date of the newest item beyond those kept regardless of age
+        boundary = list(
+            FeedItem.objects.filter(feed_id=feed_id)
+            .order_by("-date")
+            .values_list("date", flat=True)[keep_items - 1 : keep_items]
+        )
+        if not boundary:
+            continue
+        # Every item in the feed's last parsed body shares the newest
+        # last_seen_at, so anything seen since then is still being published
+        last_parsed = FeedItem.objects.filter(feed_id=feed_id).aggregate(
+            latest=Max("last_seen_at")
+        )["latest"]
+        stale = FeedItem.objects.filter(
+            feed_id=feed_id,
+            date__lt=min(boundary[0], cutoff),
+            last_seen_at__lt=min(last_parsed, cutoff),
+        ).order_by()
+
+        feed_deleted = 0
+        while True:
+            ids = list(stale.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            count, _ = FeedItem.objects.filter(id__in=ids).delete()
+            feed_deleted += count
+            if pause:
+                time.sleep(pause)
+
+        if feed_deleted:
+            # Cached /feeds/get responses for this feed are now out of date
+            Feed.objects.filter(id=feed_id).update(updated_at=timezone.now())
+            deleted += feed_deleted
+
+    logger.info(f"Pruned {deleted} feed items from {len(feed_ids)} feeds")
+    return deleted
+
+
+def compact_feeds_database(
+    pages: int = FEEDS_VACUUM_PAGES, full: bool = False
+) -> CompactionResult:
+    """
+    Return free pages in the feeds database to the filesystem with
+    PRAGMA incremental_vacuum. That needs auto_vacuum=INCREMENTAL, which
+    only takes effect on an existing database after a full VACUUM; pass
+    full to switch modes and vacuum. Does nothing on databases other than
+    SQLite.
+    """
+    connection = connections[router.db_for_write(FeedItem)]
+    result = CompactionResult()
+    if connection.vendor != "sqlite":
+        return result
+
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA page_size")
+        result.page_size = cursor.fetchone()[0]
+        cursor.execute("PRAGMA freelist_count")
+        result.free_pages_before = cursor.fetchone()[0]
+
+        if full:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+        cursor.execute("PRAGMA auto_vacuum")
+        result.incremental = cursor.fetchone()[0] == SQLITE_AUTO_VACUUM_INCREMENTAL
+        if result.incremental and not full:
+            cursor.execute(f"PRAGMA incremental_vacuum({int(pages)})")
+            cursor.fetchall()
+
+        cursor.execute("PRAGMA freelist_count")
+        result.free_pages_after = cursor.fetchone()[0]
+
+    if not result.incremental:
+        logger.warning(
+            "Feeds database is not in incremental auto_vacuum mode; run "
+            "prune_feed_items --full-vacuum once to switch it"
+        )
+    return result
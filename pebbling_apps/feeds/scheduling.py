@@ -0,0 +1,117 @@
+"""
+Adaptive polling schedule. Each feed is polled about as often as it has
+published lately, backs off while polls turn up nothing new or fail, and is
+never polled sooner than the server asks via ttl, Cache-Control or
+Retry-After.
+"""
+
+import datetime
+import random
+import re
+import statistics
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Mapping, Optional
+
+from django.conf import settings
+
+FEEDS_MIN_POLL_INTERVAL = datetime.timedelta(
+    seconds=getattr(settings, "FEEDS_MIN_POLL_INTERVAL", 15 * 60)
+)
+FEEDS_MAX_POLL_INTERVAL = datetime.timedelta(
+    seconds=getattr(settings, "FEEDS_MAX_POLL_INTERVAL", 24 * 60 * 60)
+)
+FEEDS_DEFAULT_POLL_INTERVAL = datetime.timedelta(
+    seconds=getattr(settings, "FEEDS_DEFAULT_POLL_INTERVAL", 60 * 60)
+)
+# Interval growth per poll that found nothing new, and per failed poll
+FEEDS_UNCHANGED_BACKOFF = getattr(settings, "FEEDS_UNCHANGED_BACKOFF", 1.5)
+FEEDS_ERROR_BACKOFF = getattr(settings, "FEEDS_ERROR_BACKOFF", 2.0)
+# Fraction of the interval added or taken at random, to spread polls out
+FEEDS_POLL_JITTER = getattr(settings, "FEEDS_POLL_JITTER", 0.1)
+# Longest wait a server hint can impose
+FEEDS_MAX_SERVER_HINT = datetime.timedelta(days=7)
+
+# Recent item dates used to estimate how often a feed publishes
+CADENCE_SAMPLE_SIZE = 20
+
+MAX_AGE = re.compile(r"(?:^|[,\s])max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+def publish_cadence(
+    item_dates: Iterable[datetime.datetime],
+) -> Optional[datetime.timedelta]:
+    """Median gap between consecutive item dates, or None if unknown."""
+    dates = sorted(set(item_dates))
+    gaps = [
+        (later - earlier).total_seconds() for earlier, later in zip(dates, dates[1:])
+    ]
+    if not gaps:
+        return None
+    return datetime.timedelta(seconds=statistics.median(gaps))
+
+
+def server_hint(
+    headers: Optional[Mapping[str, str]] = None,
+    ttl: Optional[str] = None,
+    now: Optional[datetime.datetime] = None,
+) -> Optional[datetime.timedelta]:
+    """
+    The longest wait asked for by the feed's <ttl> (minutes), a
+    Cache-Control max-age or a Retry-After header, or None.
+    """
+    hints = []
+    if ttl and str(ttl).strip().isdigit():
+        hints.append(datetime.timedelta(minutes=int(ttl)))
+
+    headers = headers or {}
+    match = MAX_AGE.search(headers.get("cache-control") or "")
+    if match:
+        hints.append(datetime.timedelta(seconds=int(match.group(1))))
+
+    retry_after = (headers.get("retry-after") or "").strip()
+    if retry_after.isdigit():
+        hints.append(datetime.timedelta(seconds=int(retry_after)))
+    elif retry_after and now is not None:
+        try:
+            hints.append(parsedate_to_datetime(retry_after) - now)
+        except (TypeError, ValueError):
+            pass
+
+    if not hints:
+        return None
+    return min(max(hints), FEEDS_MAX_SERVER_HINT)
+
+
+def next_poll(
+    previous_interval: Optional[int],
+    now: datetime.datetime,
+    changed: bool = False,
+    failed: bool = False,
+    cadence: Optional[datetime.timedelta] = None,
+    hint: Optional[datetime.timedelta] = None,
+) -> dict:
+    """
+    Feed field values scheduling the next poll, given the previous interval
+    in seconds and the outcome of the poll just made.
+    """
+    previous = (
+        datetime.timedelta(seconds=previous_interval)
+        if previous_interval
+        else FEEDS_DEFAULT_POLL_INTERVAL
+    )
+    if failed:
+        interval = previous * FEEDS_ERROR_BACKOFF
+    elif changed:
+        interval = FEEDS_DEFAULT_POLL_INTERVAL if cadence is None else cadence
+    else:
+        interval = previous * FEEDS_UNCHANGED_BACKOFF
+    interval = max(FEEDS_MIN_POLL_INTERVAL, min(interval, FEEDS_MAX_POLL_INTERVAL))
+    if hint is not None:
+        interval = max(interval, hint)
+
+    jitter = random.uniform(1 - FEEDS_POLL_JITTER, 1 + FEEDS_POLL_JITTER)
+    return {
+        "poll_interval": int(interval.total_seconds()),
+        "next_poll_at": now + interval * jitter,
+        "last_polled_at": now,
+    }
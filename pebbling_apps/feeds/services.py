@@ -1,13 +1,68 @@
 import logging
+from django.conf import settings
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
-from typing import Tuple
+from django.db import router, transaction
+from django.db.models import F
+from django.utils import timezone
+from dataclasses import dataclass
+from feedparser import FeedParserDict
+from typing import Mapping, Optional, Tuple
 import feedparser
+import requests
 import time
-from .models import Feed, FeedItem
+from pebbling_apps.common import metrics
+from .models import METRIC_BODIES_UNCHANGED, Feed, FeedItem, content_digest
+from .parsing import parse_feed_body
+from .scheduling import CADENCE_SAMPLE_SIZE, next_poll, publish_cadence, server_hint
+from .single_flight import (
+    FEEDS_POLL_LOCK_WAIT,
+    mark_polled,
+    poll_lock,
+    recently_polled,
+)
 
 logger = logging.getLogger(__name__)
 
+# Hard limits on downloading a feed: seconds to connect and between chunks,
+# seconds for the whole body, and bytes of body accepted
+FEED_FETCH_TIMEOUT = getattr(settings, "FEEDS_FETCH_TIMEOUT", (5, 30))
+FEED_FETCH_TOTAL_TIMEOUT = getattr(settings, "FEEDS_FETCH_TOTAL_TIMEOUT", 60)
+FEED_FETCH_MAX_BYTES = getattr(settings, "FEEDS_FETCH_MAX_BYTES", 10 * 1024 * 1024)
+FEED_FETCH_CHUNK_SIZE = 64 * 1024
+# Consecutive failed polls after which a feed is disabled; 0 never disables
+FEEDS_MAX_CONSECUTIVE_FAILURES = getattr(settings, "FEEDS_MAX_CONSECUTIVE_FAILURES", 10)
+# Longest error message kept in Feed.last_error
+LAST_ERROR_MAX_LENGTH = 1000
+
+
+class FeedFetchError(Exception):
+    """The feed could not be downloaded, after elapsed seconds of trying."""
+
+    def __init__(
+        self,
+        message: str,
+        response: Optional["FeedResponse"] = None,
+        elapsed: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.response = response
+        if elapsed is None:
+            elapsed = response.elapsed if response is not None else 0.0
+        self.elapsed = elapsed
+
+
+@dataclass
+class FeedResponse:
+    """A downloaded feed body, read in full and detached from the connection."""
+
+    status_code: int
+    url: str
+    headers: Mapping[str, str]
+    content: bytes
+    # Seconds spent downloading
+    elapsed: float = 0.0
+
 
 class FeedService:
     def get_or_create_feed(self, url: str) -> Tuple[Feed, bool]:
@@ -32,45 +87,265 @@ class FeedService:
 
         return feed, created
 
-    def fetch_feed(self, feed: Feed) -> bool:
-        start_time = time.time()
-        try:
-            parsed = feedparser.parse(feed.url, etag=feed.etag, modified=feed.modified)
-            feed.update_from_parsed(parsed.feed)
-
-            # Track new items discovered and collect them for inbox delivery
-            new_items_count = 0
-            new_feed_items = []
-
-            for entry in parsed.entries:
-                _, created = FeedItem.objects.update_or_create_from_parsed(feed, entry)
-                if created:
-                    new_items_count += 1
-                    # Collect new items for inbox delivery
-                    new_feed_items.append(
-                        {
-                            "url": entry.get("link", ""),
-                            "title": entry.get("title", ""),
-                            "description": entry.get("description", ""),
-                            "summary": entry.get("summary", ""),
-                        }
-                    )
-
-            # Trigger inbox delivery for new items (if any)
-            if new_feed_items and self._is_inbox_delivery_enabled():
-                try:
-                    self._trigger_inbox_delivery(feed.url, new_feed_items)
-                except Exception as e:
-                    # Don't let inbox delivery errors break feed polling
-                    logger.error(
-                        f"Error triggering inbox delivery for feed {feed.url}: {e}"
-                    )
+    def fetch_feed_once(self, feed: Feed, wait: float = FEEDS_POLL_LOCK_WAIT) -> bool:
+        """
+        Fetch the feed unless it was fetched within FEEDS_POLL_FRESH_WINDOW.
+        If another caller is already fetching it, wait up to wait seconds
+        and reuse their result instead. Returns whether the feed is fresh.
+        """
+        if recently_polled(feed.id):
+            return True
+        with poll_lock(feed.id, wait) as acquired:
+            if not acquired or recently_polled(feed.id):
+                return recently_polled(feed.id)
+            result = self.fetch_feed(feed)
+            mark_polled(feed.id)
+            return result
 
+    def fetch_feed(
+        self, feed: Feed, session: Optional[requests.Session] = None
+    ) -> bool:
+        try:
+            response = self.download(feed, session)
+            if self.record_unparsed(feed, response):
+                return True
+            parsed = parse_feed_body(
+                response.content, response.url, response.headers.get("content-type")
+            )
+            self.store_parsed(feed, response, parsed)
             return True
         except Exception as e:
-            # Error handling for feed fetch failures
+            # Back off before trying this feed again, then let the caller know
+            self.record_failure(feed, e)
             raise e
 
+    def download(
+        self, feed: Feed, session: Optional[requests.Session] = None
+    ) -> FeedResponse:
+        """
+        GET the feed, sending the validators saved from the last poll. The
+        whole download must finish within FEED_FETCH_TOTAL_TIMEOUT and fit in
+        FEED_FETCH_MAX_BYTES, or FeedFetchError is raised.
+        """
+        headers = {"User-Agent": feedparser.USER_AGENT}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.modified:
+            headers["If-Modified-Since"] = feed.modified
+
+        start = time.monotonic()
+        deadline = start + FEED_FETCH_TOTAL_TIMEOUT
+        chunks = []
+        size = 0
+        try:
+            response = (session or requests).get(
+                feed.url, headers=headers, timeout=FEED_FETCH_TIMEOUT, stream=True
+            )
+            try:
+                for chunk in response.iter_content(chunk_size=FEED_FETCH_CHUNK_SIZE):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > FEED_FETCH_MAX_BYTES:
+                        raise FeedFetchError(
+                            f"{feed.url} is larger than {FEED_FETCH_MAX_BYTES} bytes",
+                            elapsed=time.monotonic() - start,
+                        )
+                    if time.monotonic() > deadline:
+                        raise FeedFetchError(
+                            f"Fetching {feed.url} took over {FEED_FETCH_TOTAL_TIMEOUT}s",
+                            elapsed=time.monotonic() - start,
+                        )
+            finally:
+                response.close()
+        except requests.RequestException as e:
+            raise FeedFetchError(
+                f"Fetching {feed.url} failed: {e}", elapsed=time.monotonic() - start
+            ) from e
+
+        return FeedResponse(
+            status_code=response.status_code,
+            url=response.url,
+            headers=response.headers,
+            content=b"".join(chunks),
+            elapsed=time.monotonic() - start,
+        )
+
+    def record_unparsed(self, feed: Feed, response: FeedResponse) -> bool:
+        """
+        Record a poll whose response needs no parsing - a 304, or the same
+        body as last time - and return True, or return False if the body
+        must be parsed and passed to store_parsed(). Raises FeedFetchError
+        for HTTP errors.
+        """
+        if response.status_code >= 400:
+            raise FeedFetchError(
+                f"{feed.url} returned HTTP {response.status_code}", response
+            )
+        if response.status_code == 304:
+            # Nothing changed since the last poll, so leave the items be
+            self._record_not_modified(feed, response, **self._schedule(feed, response))
+            return True
+
+        if content_digest(response.content) == feed.body_hash:
+            # Same bytes as the last poll, though the validators may differ
+            validators = {
+                "etag": response.headers.get("etag"),
+                "modified": response.headers.get("last-modified"),
+            }
+            if validators != {"etag": feed.etag, "modified": feed.modified}:
+                # Feed.to_dict() includes the validators, so mark it updated
+                validators["updated_at"] = timezone.now()
+            self._record_fetched(
+                feed, response, **validators, **self._schedule(feed, response)
+            )
+            metrics.increment(METRIC_BODIES_UNCHANGED)
+            return True
+
+        return False
+
+    def store_parsed(
+        self, feed: Feed, response: FeedResponse, parsed: FeedParserDict
+    ) -> None:
+        """Store a parsed feed body and deliver any new items."""
+        # One transaction per feed keeps this to a single commit
+        with transaction.atomic(using=router.db_for_write(Feed)):
+            feed.etag = response.headers.get("etag")
+            feed.modified = response.headers.get("last-modified")
+            feed.body_hash = content_digest(response.content)
+            feed.update_from_parsed(parsed.feed)
+            previous_newest_item_date = feed.newest_item_date
+
+            # Store every entry in one batch, collecting new ones for the inbox
+            new_entries = FeedItem.objects.bulk_ingest_parsed(feed, parsed.entries)
+            self._record_fetched(
+                feed,
+                response,
+                **self._schedule(
+                    feed,
+                    response,
+                    changed=bool(new_entries),
+                    ttl=parsed.feed.get("ttl"),
+                ),
+            )
+
+        new_feed_items = [
+            {
+                "url": entry.get("link", ""),
+                "title": entry.get("title", ""),
+                "description": entry.get("description", ""),
+                "summary": entry.get("summary", ""),
+            }
+            for entry in new_entries
+        ]
+
+        if feed.newest_item_date != previous_newest_item_date:
+            self._record_feed_activity(feed)
+
+        # Trigger inbox delivery for new items (if any)
+        if new_feed_items and self._is_inbox_delivery_enabled():
+            try:
+                self._trigger_inbox_delivery(feed.url, new_feed_items)
+            except Exception as e:
+                # Don't let inbox delivery errors break feed polling
+                logger.error(
+                    f"Error triggering inbox delivery for feed {feed.url}: {e}"
+                )
+
+    def record_failure(self, feed: Feed, error: Exception) -> None:
+        """
+        Record a failed poll and the time it wasted, backing off before the
+        next one. The feed is disabled after FEEDS_MAX_CONSECUTIVE_FAILURES
+        failures in a row.
+        """
+        response = getattr(error, "response", None)
+        changes = self._schedule(feed, response, failed=True)
+        changes.update(
+            consecutive_failures=feed.consecutive_failures + 1,
+            last_status_code=getattr(response, "status_code", None),
+            last_error=str(error)[:LAST_ERROR_MAX_LENGTH],
+            last_error_at=changes["last_polled_at"],
+        )
+        if (
+            FEEDS_MAX_CONSECUTIVE_FAILURES
+            and changes["consecutive_failures"] >= FEEDS_MAX_CONSECUTIVE_FAILURES
+        ):
+            logger.warning(
+                f"Disabling feed {feed.url} after "
+                f"{changes['consecutive_failures']} consecutive failures"
+            )
+            changes["disabled"] = True
+
+        for name, value in changes.items():
+            setattr(feed, name, value)
+        Feed.objects.filter(pk=feed.pk).update(
+            failure_count=F("failure_count") + 1,
+            failed_fetch_seconds=F("failed_fetch_seconds")
+            + getattr(error, "elapsed", 0.0),
+            **changes,
+        )
+
+    def _schedule(
+        self,
+        feed: Feed,
+        response: Optional[FeedResponse],
+        changed: bool = False,
+        failed: bool = False,
+        ttl: Optional[str] = None,
+    ) -> dict:
+        """Feed field values scheduling the next poll after this one."""
+        now = timezone.now()
+        cadence = None
+        if changed:
+            cadence = publish_cadence(
+                FeedItem.objects.filter(feed=feed)
+                .order_by("-date")
+                .values_list("date", flat=True)[:CADENCE_SAMPLE_SIZE]
+            )
+        changes = next_poll(
+            feed.poll_interval,
+            now,
+            changed=changed,
+            failed=failed,
+            cadence=cadence,
+            hint=server_hint(response.headers if response else None, ttl, now),
+        )
+        for name, value in changes.items():
+            setattr(feed, name, value)
+        return changes
+
+    def _record_not_modified(
+        self, feed: Feed, response: FeedResponse, **changes
+    ) -> None:
+        """Count a 304, saving as many bytes as the last full response."""
+        feed.consecutive_failures = 0
+        Feed.objects.filter(pk=feed.pk).update(
+            fetch_count=F("fetch_count") + 1,
+            not_modified_count=F("not_modified_count") + 1,
+            bytes_saved=F("bytes_saved") + F("last_response_bytes"),
+            consecutive_failures=0,
+            last_status_code=response.status_code,
+            **changes,
+        )
+
+    def _record_fetched(self, feed: Feed, response: FeedResponse, **changes) -> None:
+        """Count a full download, saving any other changes."""
+        size = len(response.content)
+        feed.consecutive_failures = 0
+        Feed.objects.filter(pk=feed.pk).update(
+            fetch_count=F("fetch_count") + 1,
+            bytes_fetched=F("bytes_fetched") + size,
+            last_response_bytes=size,
+            consecutive_failures=0,
+            last_status_code=response.status_code,
+            **changes,
+        )
+
+    def _record_feed_activity(self, feed: Feed) -> None:
+        """Advance the bookmarks' feed activity projection for this feed."""
+        from pebbling_apps.bookmarks.models import FeedActivity
+
+        FeedActivity.objects.record(feed.url, feed.newest_item_date)
+
     def _is_inbox_delivery_enabled(self) -> bool:
         """Check if inbox delivery is enabled."""
         from django.conf import settings
@@ -0,0 +1,76 @@
+"""
+Single-flight polling: at most one poll of a feed runs at a time across
+every worker and web process, using a lock in the configured cache. Callers
+that find a poll in flight can wait for it and reuse its result, and a poll
+that finished within FEEDS_POLL_FRESH_WINDOW is reused rather than repeated.
+"""
+
+import contextlib
+import secrets
+import time
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+# How long a poll lock is held at most, should its holder die mid-poll
+FEEDS_POLL_LOCK_TIMEOUT = getattr(settings, "FEEDS_POLL_LOCK_TIMEOUT", 2 * 60)
+# How long a caller waits for another caller's poll of the same feed
+FEEDS_POLL_LOCK_WAIT = getattr(settings, "FEEDS_POLL_LOCK_WAIT", 30)
+# How recent a finished poll must be to be reused
+FEEDS_POLL_FRESH_WINDOW = getattr(settings, "FEEDS_POLL_FRESH_WINDOW", 60)
+
+# Seconds between checks on a lock held by someone else
+LOCK_CHECK_INTERVAL = 0.5
+
+LOCK_KEY_PREFIX = "feeds_poll:lock:"
+POLLED_KEY_PREFIX = "feeds_poll:polled:"
+
+
+def acquire_poll_lock(feed_id: int) -> Optional[str]:
+    """Take the feed's poll lock, returning a token to release it with, or None."""
+    token = secrets.token_urlsafe(16)
+    if cache.add(LOCK_KEY_PREFIX + str(feed_id), token, FEEDS_POLL_LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def release_poll_lock(feed_id: int, token: str) -> None:
+    """Release the feed's poll lock, unless it expired and was taken since."""
+    key = LOCK_KEY_PREFIX + str(feed_id)
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def mark_polled(feed_id: int) -> None:
+    """Note that the feed was just polled, for FEEDS_POLL_FRESH_WINDOW seconds."""
+    cache.set(POLLED_KEY_PREFIX + str(feed_id), time.time(), FEEDS_POLL_FRESH_WINDOW)
+
+
+def recently_polled(feed_id: int) -> bool:
+    """Whether a poll of the feed finished within FEEDS_POLL_FRESH_WINDOW."""
+    return cache.get(POLLED_KEY_PREFIX + str(feed_id)) is not None
+
+
+@contextlib.contextmanager
+def poll_lock(feed_id: int, wait: float = 0) -> Iterator[bool]:
+    """
+    Hold the feed's poll lock for the duration of the block, yielding True.
+    If another caller holds it, wait up to wait seconds for them to finish
+    and yield False, in which case the block should not poll.
+    """
+    token = acquire_poll_lock(feed_id)
+    if token is not None:
+        try:
+            yield True
+        finally:
+            release_poll_lock(feed_id, token)
+        return
+
+    deadline = time.monotonic() + wait
+    while (
+        time.monotonic() < deadline
+        and cache.get(LOCK_KEY_PREFIX + str(feed_id)) is not None
+    ):
+        time.sleep(LOCK_CHECK_INTERVAL)
+    yield False
@@ -1,38 +1,96 @@
+import datetime
+from typing import Optional
 from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from .refresh import finish_refresh
+from .retention import compact_feeds_database, prune_feed_items
 from .services import FeedService
 from .models import Feed
+from .poller import FEEDS_POLL_BATCH_SIZE, BatchPoller
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How long a deferred feed is left alone while its poll waits in the queue
+FEEDS_POLL_CLAIM_TIMEOUT = datetime.timedelta(
+    seconds=getattr(settings, "FEEDS_POLL_CLAIM_TIMEOUT", 60 * 60)
+)
+
 
 @shared_task(name="poll_feed")
-def poll_feed(feed_id: int) -> None:
-    """Fetch a feed in the background."""
+def poll_feed(feed_id: int, refresh_token: Optional[str] = None) -> None:
+    """
+    Fetch a feed in the background. A poll queued by a refresh carries its
+    token, and marks the refresh's claim on the feed done when it finishes.
+    """
     try:
         feed = Feed.objects.get(id=feed_id)
         service = FeedService()
-        service.fetch_feed(feed)
-        logger.info(f"Successfully polled feed {feed_id}")
+        if service.fetch_feed_once(feed):
+            logger.info(f"Successfully polled feed {feed_id}")
+        else:
+            logger.info(f"Feed {feed_id} is already being polled")
     except Feed.DoesNotExist:
         logger.warning(f"Feed with id {feed_id} does not exist.")
     except Exception as e:
         logger.error(f"Error fetching feed with id {feed_id}: {e}")
+    finally:
+        if refresh_token is not None:
+            # Let the refresh waiting on this feed know its poll is over
+            finish_refresh(feed_id, refresh_token)
+
+
+@shared_task(name="poll_feed_batch")
+def poll_feed_batch(feed_ids: list) -> None:
+    """Poll a batch of feeds concurrently within this worker."""
+    with BatchPoller() as poller:
+        outcomes = poller.poll(Feed.objects.filter(id__in=feed_ids))
+    logger.info(f"Polled batch of {len(feed_ids)} feeds: {dict(outcomes)}")
 
 
 @shared_task(name="poll_all_feeds")
 def poll_all_feeds() -> None:
-    """Defer poll_feed tasks for every existing Feed model object."""
+    """
+    Defer poll_feed tasks for every active feed whose next poll is due, or
+    with FEEDS_POLLER set to "batch", poll_feed_batch tasks for batches of
+    them. Deferred feeds are pushed FEEDS_POLL_CLAIM_TIMEOUT into the future,
+    so that a backed up queue does not get them deferred again.
+    """
     try:
-        # Use iterator to avoid loading all feeds into memory at once
-        active_count = 0
-        for feed in Feed.objects.all().iterator():
-            # Call the poll_feed task for each feed with high priority
-            poll_feed.apply_async(args=[feed.id], priority=3)
-            logger.info(f"Deferred poll_feed task for feed_id {feed.id}.")
-            if not feed.disabled:
-                active_count += 1
-
-        logger.info(f"Polled {active_count} active feeds")
+        now = timezone.now()
+        feed_ids = list(
+            Feed.objects.due_feeds(now)
+            .order_by("next_poll_at")
+            .values_list("id", flat=True)
+        )
+        batched = getattr(settings, "FEEDS_POLLER", "tasks") == "batch"
+
+        for i in range(0, len(feed_ids), FEEDS_POLL_BATCH_SIZE):
+            batch = feed_ids[i : i + FEEDS_POLL_BATCH_SIZE]
+            Feed.objects.filter(id__in=batch).update(
+                next_poll_at=now + FEEDS_POLL_CLAIM_TIMEOUT
+            )
+            if batched:
+                poll_feed_batch.apply_async(args=[batch], priority=3)
+            else:
+                for feed_id in batch:
+                    # Call the poll_feed task for each feed with high priority
+                    poll_feed.apply_async(args=[feed_id], priority=3)
+
+        logger.info(f"Polled {len(feed_ids)} due feeds")
     except Exception as e:
         logger.error(f"Error deferring poll_feed tasks: {e}")
+
+
+@shared_task(name="prune_feed_items")
+def prune_feed_items_task() -> None:
+    """Delete feed items outside the retention window and compact the database."""
+    try:
+        deleted = prune_feed_items()
+        result = compact_feeds_database()
+        logger.info(
+            f"Pruned {deleted} feed items, reclaimed {result.reclaimed_bytes} bytes"
+        )
+    except Exception as e:
+        logger.error(f"Error pruning feed items: {e}")
@@ -1,10 +1,19 @@
 import datetime
 import time
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from django.conf import settings
+from django.db import router
 from unittest import skipIf
-from pebbling_apps.feeds.models import Feed, FeedItem
+from pebbling_apps.common import metrics
+from pebbling_apps.feeds.models import (
+    METRIC_ITEMS_UNCHANGED,
+    METRIC_ITEMS_WRITTEN,
+    METRICS,
+    Feed,
+    FeedItem,
+)
 
 
 @skipIf(
@@ -154,3 +163,100 @@ class FeedItemManagerTest(TestCase):
         FeedItem.objects.update_or_create_from_parsed(self.feed, entry)
         self.feed.refresh_from_db()
         self.assertEqual(self.feed.newest_item_date, initial_date)
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class FeedItemBulkIngestTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.feed = Feed.objects.create(
+            url="http://example.com/feed.xml", title="Test Feed"
+        )
+
+    def entry(self, i, published=None, **kwargs):
+        published = published or timezone.now() - datetime.timedelta(days=i)
+        return {
+            "id": f"guid-{i}",
+            "link": f"http://example.com/{i}",
+            "title": f"Entry {i}",
+            "published_parsed": published.timetuple(),
+            **kwargs,
+        }
+
+    def test_ingest_uses_constant_queries(self):
+        entries = [self.entry(i) for i in range(50)]
+        db = router.db_for_write(FeedItem)
+
+        # Look up existing guids, upsert the items, update the feed
+        with self.assertNumQueries(3, using=db):
+            new_entries = FeedItem.objects.bulk_ingest_parsed(self.feed, entries)
+
+        self.assertEqual(len(new_entries), 50)
+        self.assertEqual(FeedItem.objects.filter(feed=self.feed).count(), 50)
+
+    def test_ingest_updates_existing_items_and_keeps_dates(self):
+        existing_date = (timezone.now() - datetime.timedelta(days=10)).replace(
+            microsecond=0
+        )
+        FeedItem.objects.create(
+            feed=self.feed,
+            guid="guid-1",
+            date=existing_date,
+            link="http://example.com/1",
+            title="Old Title",
+        )
+
+        new_entries = FeedItem.objects.bulk_ingest_parsed(
+            self.feed, [self.entry(1), self.entry(2), self.entry(2)]
+        )
+
+        self.assertEqual([entry["id"] for entry in new_entries], ["guid-2"])
+        updated = FeedItem.objects.get(guid="guid-1")
+        self.assertEqual(updated.title, "Entry 1")
+        self.assertEqual(updated.date, existing_date)
+        self.assertEqual(FeedItem.objects.count(), 2)
+
+    def test_ingest_sets_newest_item_date_once(self):
+        newest = (timezone.now() - datetime.timedelta(hours=1)).replace(microsecond=0)
+        entries = [self.entry(i) for i in range(1, 5)] + [self.entry(0, newest)]
+
+        FeedItem.objects.bulk_ingest_parsed(self.feed, entries)
+
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.newest_item_date, newest)
+
+    def test_unchanged_items_are_only_touched(self):
+        published = timezone.now() - datetime.timedelta(days=1)
+        entries = [self.entry(1, published), self.entry(2, published)]
+        FeedItem.objects.bulk_ingest_parsed(self.feed, entries)
+        before = {item.guid: item for item in FeedItem.objects.all()}
+
+        entries[1]["title"] = "Entry 2, revised"
+        db = router.db_for_write(FeedItem)
+        # Look up existing items, touch the unchanged one, upsert the other
+        with self.assertNumQueries(3, using=db):
+            new_entries = FeedItem.objects.bulk_ingest_parsed(self.feed, entries)
+
+        self.assertEqual(new_entries, [])
+        unchanged = FeedItem.objects.get(guid="guid-1")
+        self.assertEqual(unchanged.updated_at, before["guid-1"].updated_at)
+        self.assertGreater(unchanged.last_seen_at, before["guid-1"].last_seen_at)
+        changed = FeedItem.objects.get(guid="guid-2")
+        self.assertEqual(changed.title, "Entry 2, revised")
+        self.assertNotEqual(changed.content_hash, before["guid-2"].content_hash)
+
+        counts = metrics.get_counts(METRICS)
+        self.assertEqual(counts[METRIC_ITEMS_WRITTEN], 3)
+        self.assertEqual(counts[METRIC_ITEMS_UNCHANGED], 1)
@@ -0,0 +1,127 @@
+import threading
+import time
+from unittest import skipIf
+
+import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from pebbling_apps.feeds.fixture_server import FixtureFeedServer
+from pebbling_apps.feeds.models import Feed, FeedItem
+from pebbling_apps.feeds.poller import (
+    FAILED,
+    SKIPPED,
+    UNCHANGED,
+    UPDATED,
+    BatchPoller,
+)
+from pebbling_apps.feeds.services import FeedService
+from pebbling_apps.feeds.single_flight import acquire_poll_lock, recently_polled
+from pebbling_apps.feeds.tasks import poll_all_feeds
+
+
+class ConcurrencyTrackingService(FeedService):
+    """Record the most downloads ever in flight at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def download(self, feed, session=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.05)
+            return super().download(feed, session)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+@override_settings(
+    INBOX_DELIVERY_ENABLED=False,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class BatchPollerTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.server = FixtureFeedServer(items=3)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+
+    def create_feeds(self, count):
+        return [Feed.objects.create(url=self.server.feed_url(n)) for n in range(count)]
+
+    def test_poll_stores_feeds_then_short_circuits(self):
+        feeds = self.create_feeds(5)
+        feeds.append(Feed.objects.create(url=f"{self.server.base_url}/missing"))
+
+        with BatchPoller(parse_processes=0) as poller:
+            outcomes = poller.poll(Feed.objects.all())
+            self.assertEqual(outcomes, {UPDATED: 5, FAILED: 1})
+            self.assertEqual(FeedItem.objects.count(), 15)
+            self.assertEqual(Feed.objects.get(id=feeds[0].id).title, "Synthetic feed 0")
+
+            outcomes = poller.poll(Feed.objects.exclude(id=feeds[-1].id))
+            self.assertEqual(outcomes, {UNCHANGED: 5})
+
+        self.assertEqual(Feed.objects.filter(not_modified_count=1).count(), 5)
+
+    def test_parsing_in_worker_processes(self):
+        self.create_feeds(2)
+
+        with BatchPoller(parse_processes=1) as poller:
+            outcomes = poller.poll(Feed.objects.all())
+
+        self.assertEqual(outcomes, {UPDATED: 2})
+        self.assertEqual(FeedItem.objects.count(), 6)
+
+    def test_downloads_per_host_are_limited(self):
+        self.create_feeds(8)
+        service = ConcurrencyTrackingService()
+
+        with BatchPoller(
+            concurrency=8, per_host=2, parse_processes=0, service=service
+        ) as poller:
+            outcomes = poller.poll(Feed.objects.all())
+
+        self.assertEqual(outcomes, {UPDATED: 8})
+        self.assertEqual(service.max_active, 2)
+
+    def test_feeds_being_polled_elsewhere_are_skipped(self):
+        feeds = self.create_feeds(3)
+        acquire_poll_lock(feeds[0].id)
+
+        with BatchPoller(parse_processes=0) as poller:
+            outcomes = poller.poll(Feed.objects.all())
+
+        self.assertEqual(outcomes, {UPDATED: 2, SKIPPED: 1})
+        self.assertFalse(recently_polled(feeds[0].id))
+        self.assertTrue(recently_polled(feeds[1].id))
+        self.assertIsNotNone(acquire_poll_lock(feeds[1].id))
+
+    @override_settings(FEEDS_POLLER="batch")
+    @mock.patch("pebbling_apps.feeds.tasks.FEEDS_POLL_BATCH_SIZE", 2)
+    @mock.patch("pebbling_apps.feeds.tasks.poll_feed_batch.apply_async")
+    def test_poll_all_feeds_in_batches(self, mock_apply_async):
+        feeds = self.create_feeds(5)
+
+        poll_all_feeds()
+
+        batches = [call.kwargs["args"][0] for call in mock_apply_async.call_args_list]
+        self.assertEqual(
+            batches, [[feed.id for feed in feeds[i : i + 2]] for i in (0, 2, 4)]
+        )
@@ -0,0 +1,115 @@
+import datetime
+import time
+from io import StringIO
+from unittest import skipIf
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from pebbling_apps.feeds.models import Feed, FeedItem
+from pebbling_apps.feeds.retention import compact_feeds_database, prune_feed_items
+
+NOW = timezone.now()
+DAY = datetime.timedelta(days=1)
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+class PruneFeedItemsTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    def create_items(self, url, ages_in_days):
+        feed = Feed.objects.create(url=url)
+        FeedItem.objects.bulk_create(
+            FeedItem(
+                feed=feed,
+                guid=f"{url}#{age}",
+                link=f"{url}#{age}",
+                title=f"{age} days old",
+                date=NOW - age * DAY,
+                last_seen_at=NOW - age * DAY,
+            )
+            for age in ages_in_days
+        )
+        return feed
+
+    def titles(self, feed):
+        return list(FeedItem.objects.filter(feed=feed).values_list("title", flat=True))
+
+    def test_keeps_newest_items_or_recent_days_whichever_is_more(self):
+        # Quiet feed: everything is old, so only the newest items survive
+        quiet = self.create_items("https://example.com/quiet", [100, 200, 300, 400])
+        # Busy feed: more recent items than the count limit, all kept
+        busy = self.create_items("https://example.com/busy", [1, 2, 3, 4, 100])
+
+        deleted = prune_feed_items(keep_items=2, keep_days=30, batch_size=1, pause=0)
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(self.titles(quiet), ["100 days old", "200 days old"])
+        self.assertEqual(len(self.titles(busy)), 4)
+        self.assertNotIn("100 days old", self.titles(busy))
+
+    def entries(self, url, ages_in_days, title="Item"):
+        return [
+            {
+                "id": f"{url}#{age}",
+                "link": f"{url}#{age}",
+                "title": f"{title} {age}",
+                "published_parsed": time.localtime((NOW - age * DAY).timestamp()),
+            }
+            for age in ages_in_days
+        ]
+
+    def test_items_still_in_the_feed_survive(self):
+        url = "https://example.com/long"
+        feed = Feed.objects.create(url=url)
+        FeedItem.objects.bulk_ingest_parsed(feed, self.entries(url, [1, 2, 300, 400]))
+        # The 300 day old item drops out of the feed on a later poll
+        FeedItem.objects.bulk_ingest_parsed(
+            feed, self.entries(url, [1, 2, 400], title="Edited")
+        )
+
+        deleted = prune_feed_items(
+            keep_items=2, keep_days=30, pause=0, now=NOW + 60 * DAY
+        )
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(len(self.titles(feed)), 3)
+        self.assertNotIn("Item 300", self.titles(feed))
+        new_entries = FeedItem.objects.bulk_ingest_parsed(
+            feed, self.entries(url, [1, 2, 400], title="Re-edited")
+        )
+        self.assertEqual(new_entries, [])
+
+    def test_feeds_with_few_items_are_left_alone(self):
+        feed = self.create_items("https://example.com/small", [400, 500])
+
+        self.assertEqual(prune_feed_items(keep_items=5, keep_days=30, pause=0), 0)
+        self.assertEqual(len(self.titles(feed)), 2)
+
+    def test_pruned_feeds_are_marked_updated(self):
+        feed = self.create_items("https://example.com/old", [100, 200])
+        Feed.objects.filter(pk=feed.pk).update(updated_at=NOW - 365 * DAY)
+
+        prune_feed_items(keep_items=1, keep_days=30, pause=0)
+
+        feed.refresh_from_db()
+        self.assertGreater(feed.updated_at, NOW - DAY)
+
+    def test_command_reports_deletions_and_reclaimed_space(self):
+        self.create_items("https://example.com/old", [100, 200, 300])
+
+        out = StringIO()
+        call_command("prune_feed_items", "--keep-items", "1", stdout=out)
+
+        self.assertIn("Deleted 2 feed items", out.getvalue())
+        self.assertIn("Reclaimed", out.getvalue())
+        self.assertGreaterEqual(compact_feeds_database().reclaimed_bytes, 0)
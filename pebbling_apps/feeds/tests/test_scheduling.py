@@ -0,0 +1,140 @@
+import datetime
+from unittest import skipIf
+
+import mock
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from pebbling_apps.feeds.models import Feed
+from pebbling_apps.feeds.scheduling import (
+    FEEDS_DEFAULT_POLL_INTERVAL,
+    FEEDS_MAX_POLL_INTERVAL,
+    FEEDS_MIN_POLL_INTERVAL,
+    FEEDS_POLL_JITTER,
+    FEEDS_UNCHANGED_BACKOFF,
+    next_poll,
+    publish_cadence,
+    server_hint,
+)
+from pebbling_apps.feeds.services import FeedService
+from pebbling_apps.feeds.tasks import FEEDS_POLL_CLAIM_TIMEOUT, poll_all_feeds
+from .test_services import RSS, mock_response
+
+NOW = timezone.make_aware(datetime.datetime(2025, 1, 5, 12, 0, 0))
+HOUR = datetime.timedelta(hours=1)
+
+
+@mock.patch("random.uniform", lambda a, b: 1.0)
+class ScheduleTest(SimpleTestCase):
+    def test_cadence_is_median_gap(self):
+        dates = [NOW, NOW - 2 * HOUR, NOW - 4 * HOUR, NOW - 30 * HOUR]
+        self.assertEqual(publish_cadence(dates), 2 * HOUR)
+        self.assertIsNone(publish_cadence([NOW]))
+
+    def test_new_items_poll_at_publish_cadence(self):
+        changes = next_poll(None, NOW, changed=True, cadence=3 * HOUR)
+        self.assertEqual(changes["next_poll_at"], NOW + 3 * HOUR)
+        self.assertEqual(changes["poll_interval"], 3 * 3600)
+        self.assertEqual(changes["last_polled_at"], NOW)
+
+    def test_interval_is_clamped(self):
+        busy = next_poll(None, NOW, changed=True, cadence=datetime.timedelta(0))
+        self.assertEqual(busy["next_poll_at"], NOW + FEEDS_MIN_POLL_INTERVAL)
+        dormant = next_poll(None, NOW, changed=True, cadence=90 * 24 * HOUR)
+        self.assertEqual(dormant["next_poll_at"], NOW + FEEDS_MAX_POLL_INTERVAL)
+
+    def test_unchanged_and_failed_polls_back_off(self):
+        unchanged = next_poll(3600, NOW)
+        self.assertEqual(unchanged["poll_interval"], 3600 * FEEDS_UNCHANGED_BACKOFF)
+        failed = next_poll(unchanged["poll_interval"], NOW, failed=True)
+        self.assertGreater(failed["poll_interval"], unchanged["poll_interval"])
+        self.assertEqual(
+            next_poll(None, NOW)["poll_interval"],
+            FEEDS_DEFAULT_POLL_INTERVAL.total_seconds() * FEEDS_UNCHANGED_BACKOFF,
+        )
+
+    def test_server_hints(self):
+        self.assertEqual(server_hint(ttl="120"), 2 * HOUR)
+        self.assertEqual(
+            server_hint({"cache-control": "public, max-age=7200"}), 2 * HOUR
+        )
+        self.assertEqual(server_hint({"retry-after": "10800"}), 3 * HOUR)
+        self.assertEqual(
+            server_hint({"retry-after": "Sun, 05 Jan 2025 16:00:00 GMT"}, now=NOW),
+            4 * HOUR,
+        )
+        self.assertIsNone(server_hint({"cache-control": "no-cache"}, ttl="soon"))
+
+    def test_server_hint_outranks_cadence(self):
+        changes = next_poll(None, NOW, changed=True, cadence=HOUR, hint=6 * HOUR)
+        self.assertEqual(changes["next_poll_at"], NOW + 6 * HOUR)
+
+
+class JitterTest(SimpleTestCase):
+    def test_jitter_spreads_polls(self):
+        times = {next_poll(3600, NOW)["next_poll_at"] for _ in range(20)}
+        self.assertGreater(len(times), 1)
+        spread = 3600 * FEEDS_UNCHANGED_BACKOFF * FEEDS_POLL_JITTER
+        for poll_at in times:
+            delta = (poll_at - NOW).total_seconds() - 3600 * FEEDS_UNCHANGED_BACKOFF
+            self.assertLessEqual(abs(delta), spread)
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+@override_settings(
+    INBOX_DELIVERY_ENABLED=False,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class FeedSchedulingTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    @mock.patch("pebbling_apps.feeds.services.requests.get")
+    def test_polls_schedule_the_next_one(self, mock_get):
+        feed = Feed.objects.create(url="https://example.com/feed.xml")
+        service = FeedService()
+
+        mock_get.return_value = mock_response(content=RSS)
+        service.fetch_feed(feed)
+        feed.refresh_from_db()
+        first_interval = feed.poll_interval
+        self.assertGreater(feed.next_poll_at, timezone.now())
+
+        mock_get.return_value = mock_response(
+            status_code=304, headers={"cache-control": "max-age=604800"}
+        )
+        service.fetch_feed(feed)
+        feed.refresh_from_db()
+        self.assertEqual(feed.poll_interval, 7 * 24 * 3600)
+        self.assertGreater(feed.poll_interval, first_interval)
+
+        mock_get.return_value = mock_response(
+            status_code=503, headers={"retry-after": "86400"}
+        )
+        with self.assertRaises(Exception):
+            service.fetch_feed(feed)
+        feed.refresh_from_db()
+        self.assertGreaterEqual(feed.poll_interval, 24 * 3600)
+
+    @mock.patch("pebbling_apps.feeds.tasks.poll_feed.apply_async")
+    def test_only_due_feeds_are_deferred_once(self, mock_apply_async):
+        now = timezone.now()
+        due = Feed.objects.create(url="https://example.com/due.xml")
+        Feed.objects.create(
+            url="https://example.com/later.xml", next_poll_at=now + HOUR
+        )
+        Feed.objects.create(url="https://example.com/off.xml", disabled=True)
+
+        poll_all_feeds()
+        poll_all_feeds()
+
+        mock_apply_async.assert_called_once_with(args=[due.id], priority=3)
+        due.refresh_from_db()
+        self.assertGreater(due.next_poll_at, now + FEEDS_POLL_CLAIM_TIMEOUT / 2)
@@ -0,0 +1,303 @@
+from io import StringIO
+from unittest import skipIf
+
+import mock
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from pebbling_apps.common import metrics
+from pebbling_apps.feeds.models import METRIC_BODIES_UNCHANGED, Feed, FeedItem
+from pebbling_apps.feeds.services import FeedFetchError, FeedService
+from pebbling_apps.feeds.single_flight import acquire_poll_lock, release_poll_lock
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0">
+<channel>
+    <title>Example Feed</title>
+    <item>
+        <guid>https://example.com/1</guid>
+        <link>https://example.com/1</link>
+        <title>First</title>
+        <pubDate>Sun, 05 Jan 2025 10:00:00 GMT</pubDate>
+    </item>
+</channel>
+</rss>
+"""
+
+LAST_MODIFIED = "Sun, 05 Jan 2025 10:00:00 GMT"
+
+
+def mock_response(status_code=200, content=b"", headers=None):
+    response = mock.Mock(
+        status_code=status_code,
+        content=content,
+        headers=headers or {},
+        url="https://example.com/feed.xml",
+    )
+    response.iter_content.return_value = [content]
+    return response
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+@mock.patch("pebbling_apps.feeds.services.requests.get")
+@mock.patch.object(FeedService, "_is_inbox_delivery_enabled", return_value=False)
+class ConditionalGetTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.feed = Feed.objects.create(url="https://example.com/feed.xml")
+        self.service = FeedService()
+
+    def test_validators_are_persisted(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(
+            content=RSS, headers={"etag": '"v1"', "last-modified": LAST_MODIFIED}
+        )
+
+        self.service.fetch_feed(self.feed)
+
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.etag, '"v1"')
+        self.assertEqual(self.feed.modified, LAST_MODIFIED)
+        self.assertEqual(self.feed.title, "Example Feed")
+        self.assertEqual(self.feed.bytes_fetched, len(RSS))
+        self.assertEqual(FeedItem.objects.count(), 1)
+
+    def test_not_modified_skips_processing(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(
+            content=RSS, headers={"etag": '"v1"', "last-modified": LAST_MODIFIED}
+        )
+        self.service.fetch_feed(self.feed)
+        item = FeedItem.objects.get()
+        self.feed.refresh_from_db()
+
+        mock_get.return_value = mock_response(status_code=304)
+        with mock.patch.object(
+            FeedItem.objects, "update_or_create_from_parsed"
+        ) as mock_update:
+            self.assertTrue(self.service.fetch_feed(self.feed))
+        mock_update.assert_not_called()
+
+        headers = mock_get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], LAST_MODIFIED)
+
+        self.feed.refresh_from_db()
+        self.assertEqual(FeedItem.objects.get().updated_at, item.updated_at)
+        self.assertEqual(self.feed.fetch_count, 2)
+        self.assertEqual(self.feed.not_modified_count, 1)
+        self.assertEqual(self.feed.bytes_saved, len(RSS))
+        self.assertEqual(self.feed.not_modified_rate, 0.5)
+
+    def test_unchanged_body_is_not_parsed(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(content=RSS, headers={"etag": '"v1"'})
+        self.service.fetch_feed(self.feed)
+        self.feed.refresh_from_db()
+
+        # A server without working validators sends the same body again
+        mock_get.return_value = mock_response(content=RSS, headers={"etag": '"v2"'})
+        with mock.patch("pebbling_apps.feeds.services.feedparser.parse") as mock_parse:
+            self.assertTrue(self.service.fetch_feed(self.feed))
+        mock_parse.assert_not_called()
+
+        self.feed.refresh_from_db()
+        self.assertEqual(self.feed.etag, '"v2"')
+        self.assertEqual(self.feed.fetch_count, 2)
+        self.assertEqual(
+            metrics.get_counts([METRIC_BODIES_UNCHANGED])[METRIC_BODIES_UNCHANGED], 1
+        )
+
+    def test_storing_leaves_columns_changed_during_the_poll(
+        self, mock_delivery, mock_get
+    ):
+        self.feed.disabled = True
+        # Re-enabled in the admin while the poll was underway
+        Feed.objects.filter(pk=self.feed.pk).update(disabled=False, failure_count=5)
+        mock_get.return_value = mock_response(content=RSS, headers={"etag": '"v1"'})
+
+        self.service.fetch_feed(self.feed)
+
+        self.feed.refresh_from_db()
+        self.assertFalse(self.feed.disabled)
+        self.assertEqual(self.feed.failure_count, 5)
+        self.assertEqual(self.feed.fetch_count, 1)
+        self.assertEqual(self.feed.etag, '"v1"')
+        self.assertEqual(self.feed.title, "Example Feed")
+
+    @mock.patch("pebbling_apps.feeds.services.FEED_FETCH_MAX_BYTES", 100)
+    def test_oversized_feeds_are_rejected(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(content=RSS)
+
+        with self.assertRaises(FeedFetchError):
+            self.service.fetch_feed(self.feed)
+        mock_get.return_value.close.assert_called_once()
+
+    def test_feeds_may_share_last_modified(self, mock_delivery, mock_get):
+        other = Feed.objects.create(url="https://example.org/feed.xml")
+        mock_get.return_value = mock_response(
+            content=RSS, headers={"last-modified": LAST_MODIFIED}
+        )
+
+        self.service.fetch_feed(self.feed)
+        self.service.fetch_feed(other)
+
+        self.assertEqual(Feed.objects.filter(modified=LAST_MODIFIED).count(), 2)
+
+    def test_http_errors_are_raised(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(status_code=500)
+
+        with self.assertRaises(FeedFetchError):
+            self.service.fetch_feed(self.feed)
+        self.assertEqual(FeedItem.objects.count(), 0)
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+@mock.patch("pebbling_apps.feeds.services.requests.get")
+@mock.patch.object(FeedService, "_is_inbox_delivery_enabled", return_value=False)
+class FeedFailureTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.feed = Feed.objects.create(url="https://example.com/feed.xml")
+        self.service = FeedService()
+
+    def poll(self):
+        try:
+            self.service.fetch_feed(self.feed)
+        except FeedFetchError:
+            pass
+        self.feed.refresh_from_db()
+
+    def test_failures_are_recorded(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(status_code=410)
+        self.poll()
+
+        self.assertEqual(self.feed.consecutive_failures, 1)
+        self.assertEqual(self.feed.failure_count, 1)
+        self.assertEqual(self.feed.last_status_code, 410)
+        self.assertIn("HTTP 410", self.feed.last_error)
+        self.assertIsNotNone(self.feed.last_error_at)
+
+        mock_get.side_effect = requests.ConnectionError("Connection refused")
+        self.poll()
+
+        self.assertEqual(self.feed.consecutive_failures, 2)
+        self.assertIsNone(self.feed.last_status_code)
+        self.assertIn("Connection refused", self.feed.last_error)
+
+    def test_success_resets_consecutive_failures(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(status_code=503)
+        self.poll()
+        self.poll()
+
+        mock_get.return_value = mock_response(content=RSS)
+        self.poll()
+
+        self.assertEqual(self.feed.consecutive_failures, 0)
+        self.assertEqual(self.feed.failure_count, 2)
+        self.assertEqual(self.feed.last_status_code, 200)
+        self.assertFalse(self.feed.disabled)
+
+    @mock.patch("pebbling_apps.feeds.services.FEEDS_MAX_CONSECUTIVE_FAILURES", 3)
+    def test_feed_is_disabled_after_consecutive_failures(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(status_code=404)
+        self.poll()
+        self.poll()
+        self.assertFalse(self.feed.disabled)
+
+        self.poll()
+        self.assertTrue(self.feed.disabled)
+        self.assertNotIn(self.feed, Feed.objects.active_feeds())
+
+    def test_offenders_are_listed_by_wasted_time(self, mock_delivery, mock_get):
+        quick = Feed.objects.create(url="https://example.org/quick.xml")
+        Feed.objects.filter(pk=self.feed.pk).update(
+            failure_count=2, failed_fetch_seconds=60.0, last_error="Timed out"
+        )
+        Feed.objects.filter(pk=quick.pk).update(
+            failure_count=5, failed_fetch_seconds=1.5, last_status_code=404
+        )
+        Feed.objects.create(url="https://example.net/healthy.xml")
+
+        out = StringIO()
+        call_command("feed_offenders", stdout=out)
+
+        lines = [line for line in out.getvalue().splitlines() if "://" in line]
+        self.assertEqual(len(lines), 2)
+        self.assertIn(self.feed.url, lines[0])
+        self.assertIn(quick.url, lines[1])
+        self.assertIn("Timed out", out.getvalue())
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+@mock.patch("pebbling_apps.feeds.services.requests.get")
+@mock.patch.object(FeedService, "_is_inbox_delivery_enabled", return_value=False)
+class SingleFlightTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.feed = Feed.objects.create(url="https://example.com/feed.xml")
+        self.service = FeedService()
+
+    def test_fresh_polls_are_reused(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(content=RSS)
+
+        self.assertTrue(self.service.fetch_feed_once(self.feed))
+        self.assertTrue(self.service.fetch_feed_once(self.feed))
+
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_in_flight_polls_are_not_repeated(self, mock_delivery, mock_get):
+        token = acquire_poll_lock(self.feed.id)
+
+        self.assertFalse(self.service.fetch_feed_once(self.feed, wait=0))
+        mock_get.assert_not_called()
+
+        release_poll_lock(self.feed.id, token)
+        mock_get.return_value = mock_response(content=RSS)
+        self.assertTrue(self.service.fetch_feed_once(self.feed, wait=0))
+        mock_get.assert_called_once()
+
+    def test_lock_is_released_after_failure(self, mock_delivery, mock_get):
+        mock_get.return_value = mock_response(status_code=500)
+
+        with self.assertRaises(FeedFetchError):
+            self.service.fetch_feed_once(self.feed)
+
+        token = acquire_poll_lock(self.feed.id)
+        self.assertIsNotNone(token)
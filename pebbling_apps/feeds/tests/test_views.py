@@ -0,0 +1,221 @@
+import datetime
+import json
+from unittest import skipIf
+
+import mock
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from pebbling_apps.feeds.models import Feed, FeedItem
+from pebbling_apps.feeds.refresh import finish_refresh
+from pebbling_apps.feeds.services import FeedService
+from pebbling_apps.feeds.tasks import poll_feed
+
+User = get_user_model()
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class FeedsFetchGetTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.feeds = []
+        for n in range(3):
+            feed = Feed.objects.create(
+                url=f"https://example.com/{n}.xml",
+                title=f"Feed {n}",
+                newest_item_date=now,
+            )
+            FeedItem.objects.bulk_create(
+                FeedItem(
+                    feed=feed,
+                    guid=f"{n}-{i}",
+                    link=f"https://example.com/{n}/{i}",
+                    title=f"Item {n}-{i}",
+                    date=now - datetime.timedelta(hours=i),
+                    json={"id": f"{n}-{i}"},
+                )
+                for i in range(5)
+            )
+            self.feeds.append(feed)
+
+    def get(self, headers=None, **params):
+        params.setdefault("urls", [feed.url for feed in self.feeds])
+        return self.client.get(reverse("feeds:fetch_get"), params, headers=headers)
+
+    def fetch(self, **params):
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_items_for_all_feeds_in_one_query(self):
+        with self.assertNumQueries(1, using=router.db_for_read(FeedItem)):
+            items_by_feed = FeedItem.objects.recent_items_by_feed(
+                [feed.id for feed in self.feeds], per_feed_limit=2
+            )
+
+        for n, feed in enumerate(self.feeds):
+            self.assertEqual(
+                [item.title for item in items_by_feed[feed.id]],
+                [f"Item {n}-0", f"Item {n}-1"],
+            )
+
+    def test_per_feed_limit_and_since(self):
+        results = self.fetch(per_feed_limit=3)
+        for feed in self.feeds:
+            self.assertEqual(len(results[feed.url]["fetched"]["items"]), 3)
+
+        results = self.fetch(since="150m")
+        for feed in self.feeds:
+            self.assertEqual(len(results[feed.url]["fetched"]["items"]), 3)
+
+    def test_json_is_omitted_unless_requested(self):
+        item = self.fetch(per_feed_limit=1)[self.feeds[0].url]["fetched"]["items"][0]
+        self.assertNotIn("json", item)
+        self.assertEqual(item["title"], "Item 0-0")
+
+        item = self.fetch(per_feed_limit=1, include_json="1")[self.feeds[0].url][
+            "fetched"
+        ]["items"][0]
+        self.assertEqual(item["json"], {"id": "0-0"})
+
+    def test_conditional_requests_get_304(self):
+        response = self.get(per_feed_limit=2)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.get(
+            per_feed_limit=2, headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_responses_are_cached_until_a_feed_changes(self):
+        urls = [feed.url for feed in self.feeds]
+        first = self.get(per_feed_limit=2)
+
+        # URL order and duplicates do not matter, and the items come from cache
+        with self.assertNumQueries(1, using=router.db_for_read(FeedItem)):
+            second = self.get(urls=list(reversed(urls)) + urls[:1], per_feed_limit=2)
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.content, first.content)
+
+        FeedItem.objects.create(
+            feed=self.feeds[0],
+            guid="0-new",
+            link="https://example.com/0/new",
+            title="Newer item",
+            date=timezone.now(),
+        )
+        Feed.objects.filter(pk=self.feeds[0].pk).update(newest_item_date=timezone.now())
+
+        third = self.get(per_feed_limit=2, headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third["ETag"], first["ETag"])
+        items = third.json()[self.feeds[0].url]["fetched"]["items"]
+        self.assertEqual(items[0]["title"], "Newer item")
+
+
+@skipIf(
+    not getattr(settings, "SQLITE_MULTIPLE_DB", True),
+    "Feed tests only run when SQLITE_MULTIPLE_DB is enabled",
+)
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+@mock.patch("pebbling_apps.feeds.tasks.poll_feed.apply_async")
+class FeedsRefreshTest(TestCase):
+    databases = (
+        {"default", "feeds_db"}
+        if getattr(settings, "SQLITE_MULTIPLE_DB", True)
+        else {"default"}
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.client.force_login(self.user)
+        self.urls = ["https://example.com/a.xml", "https://example.com/b.xml"]
+
+    def post(self, urls):
+        return self.client.post(
+            reverse("feeds:fetch_post"),
+            json.dumps({"urls": urls}),
+            content_type="application/json",
+        )
+
+    def check(self, token):
+        return self.client.get(reverse("feeds:refresh_get", args=[token]))
+
+    def finish_queued_polls(self, mock_apply_async, feed_ids=None):
+        """Finish the queued polls, as poll_feed does once each has run."""
+        for call in mock_apply_async.call_args_list:
+            feed_id = call.kwargs["args"][0]
+            if feed_ids is None or feed_id in feed_ids:
+                finish_refresh(feed_id, call.kwargs["kwargs"]["refresh_token"])
+
+    def test_fetch_returns_without_waiting_for_polls(self, mock_apply_async):
+        response = self.post(self.urls)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), set(self.urls))
+        self.assertEqual(mock_apply_async.call_count, 2)
+
+        token = response["X-Refresh-Token"]
+        response = self.check(token)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(set(response.json()["pending"]), set(self.urls))
+
+        self.finish_queued_polls(mock_apply_async)
+        response = self.check(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()[self.urls[0]]["success"])
+
+    def test_concurrent_refreshes_share_one_poll(self, mock_apply_async):
+        first = self.post(self.urls[:1])
+        second = self.post(self.urls)
+
+        polled = [call.kwargs["args"][0] for call in mock_apply_async.call_args_list]
+        self.assertEqual(len(polled), len(set(polled)))
+        self.assertEqual(len(polled), 2)
+
+        # Finishing the shared poll completes both refreshes
+        feed = Feed.objects.get(url=self.urls[0])
+        self.finish_queued_polls(mock_apply_async, [feed.id])
+        self.assertEqual(self.check(first["X-Refresh-Token"]).status_code, 200)
+        self.assertEqual(
+            self.check(second["X-Refresh-Token"]).json(), {"pending": self.urls[1:]}
+        )
+
+    def test_other_polls_leave_the_refresh_pending(self, mock_apply_async):
+        token = self.post(self.urls[:1])["X-Refresh-Token"]
+        feed = Feed.objects.get(url=self.urls[0])
+
+        # A scheduled poll finishing first does not complete the refresh
+        with mock.patch.object(FeedService, "fetch_feed_once", return_value=True):
+            poll_feed(feed.id)
+        finish_refresh(feed.id, "another-token")
+        self.assertEqual(self.check(token).status_code, 202)
+
+        with mock.patch.object(FeedService, "fetch_feed_once", return_value=True):
+            poll_feed(feed.id, refresh_token=token)
+        self.assertEqual(self.check(token).status_code, 200)
+
+    def test_unknown_tokens_are_not_found(self, mock_apply_async):
+        self.assertEqual(self.check("nope").status_code, 404)
@@ -1,10 +1,11 @@
 from django.urls import path
 
-from .views import feeds_fetch_get, feeds_fetch_post
+from .views import feeds_fetch_get, feeds_fetch_post, feeds_refresh_get
 
 app_name = "feeds"
 
 urlpatterns = [
     path("get", feeds_fetch_get, name="fetch_get"),
     path("fetch", feeds_fetch_post, name="fetch_post"),
+    path("refresh/<str:token>", feeds_refresh_get, name="refresh_get"),
 ]
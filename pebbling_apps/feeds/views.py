@@ -1,39 +1,101 @@
-from celery import group
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Q
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from durations_nlp.helpers import valid_duration
 from pebbling_apps.common.utils import parse_since
-from pebbling_apps.feeds.tasks import poll_feed
+from pebbling_apps.feeds.refresh import refresh_status, start_refresh
 from pebbling_apps.feeds.services import FeedService
-from pebbling_apps.feeds.models import Feed
+from pebbling_apps.feeds.models import Feed, FeedItem, content_digest
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
+# How long a /feeds/get response body is kept in the cache
+FEEDS_GET_CACHE_TIMEOUT = getattr(settings, "FEEDS_GET_CACHE_TIMEOUT", 10 * 60)
+# How long browsers and proxies may reuse a /feeds/get response unchecked
+FEEDS_GET_MAX_AGE = getattr(settings, "FEEDS_GET_MAX_AGE", 60)
+
+CACHE_KEY_PREFIX = "feeds_get:"
+
 
 @require_GET
 def feeds_fetch_get(request):
-    since = parse_since(request.GET.get("since"))
-    urls = request.GET.getlist("urls")
+    """
+    Serve feeds and their items for a set of URLs. Responses carry an ETag
+    derived from the normalized parameters and the feeds' timestamps, so
+    conditional requests get a 304 and repeated ones are served from the
+    cache until one of the feeds changes.
+    """
+    raw_since = request.GET.get("since")
+    since = parse_since(raw_since)
+    if since and valid_duration(raw_since):
+        # Round relative times down so that responses can be reused a while
+        since = since.replace(second=0, microsecond=0)
+    urls = sorted(set(request.GET.getlist("urls")))
     per_feed_limit = None
     if request.GET.get("per_feed_limit"):
         try:
             per_feed_limit = int(request.GET.get("per_feed_limit"))
         except (ValueError, TypeError):
             pass
+    include_json = request.GET.get("include_json") in ("1", "true")
 
     feeds = Feed.objects.filter(url__in=urls)
-    feeds_by_url = get_feed_items_by_url(feeds, since, per_feed_limit=per_feed_limit)
-    return JsonResponse(feeds_by_url)
+    version = feeds.aggregate(
+        count=Count("id"),
+        disabled=Count("id", filter=Q(disabled=True)),
+        updated_at=Max("updated_at"),
+        newest_item_date=Max("newest_item_date"),
+    )
+    digest = content_digest(
+        [urls, since, per_feed_limit, include_json, sorted(version.items())]
+    )
+    etag = quote_etag(digest)
+    last_modified = max(
+        (
+            value.timestamp()
+            for value in (version["updated_at"], version["newest_item_date"])
+            if value
+        ),
+        default=None,
+    )
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        body = cache.get(CACHE_KEY_PREFIX + digest)
+        if body is None:
+            feeds_by_url = get_feed_items_by_url(
+                feeds, since, per_feed_limit=per_feed_limit, include_json=include_json
+            )
+            body = json.dumps(feeds_by_url, cls=DjangoJSONEncoder)
+            cache.set(CACHE_KEY_PREFIX + digest, body, FEEDS_GET_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type="application/json")
+
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=FEEDS_GET_MAX_AGE)
+    return response
 
 
 @csrf_exempt
 @login_required
 @require_POST
 def feeds_fetch_post(request):
+    """
+    Queue polls of the given feeds and return their current items at once,
+    with an X-Refresh-Token header to check on the polls with
+    feeds_refresh_get.
+    """
     # TODO: switch to Django Rest Framework for request parsing
     body = json.loads(request.body)
     since = parse_since(body.get("since"))
@@ -44,69 +106,99 @@ def feeds_fetch_post(request):
             per_feed_limit = int(body.get("per_feed_limit"))
         except (ValueError, TypeError):
             pass
+    include_json = bool(body.get("include_json"))
 
     service = FeedService()
 
     feed_ids = []
-    tasks = []
 
-    # First create all feeds and collect task signatures
+    # First create all feeds
     for url in urls:
         try:
             feed, created = service.get_or_create_feed(url)
             feed_ids.append(feed.id)
-            tasks.append(poll_feed.s(feed.id).set(priority=3))
         except Exception as e:
             continue
 
-    # Create a group of tasks and execute them
-    if tasks:
-        job = group(tasks)
-        result = job.apply_async(priority=3)
-        # Wait for all tasks to complete with timeout
-        try:
-            result.get(timeout=30)  # Wait up to 30 seconds
-        except Exception as e:
-            # Log error but continue - we'll still return the feeds
-            logger.error(f"Error waiting for feed poll tasks: {e}")
+    # Poll in the background rather than holding this worker until done
+    token = start_refresh(feed_ids)
 
     feeds = Feed.objects.filter(id__in=feed_ids)
-    feeds_by_url = get_feed_items_by_url(feeds, since, per_feed_limit=per_feed_limit)
+    feeds_by_url = get_feed_items_by_url(
+        feeds, since, per_feed_limit=per_feed_limit, include_json=include_json
+    )
+
+    response = JsonResponse(feeds_by_url)
+    response["X-Refresh-Token"] = token
+    return response
 
+
+@login_required
+@require_GET
+def feeds_refresh_get(request, token):
+    """
+    Check on a refresh started by feeds_fetch_post. While any of its polls
+    is still pending, answers 202 with the pending URLs; once all are done,
+    answers 200 with the feeds' items, as feeds_fetch_get does.
+    """
+    status = refresh_status(token)
+    if status is None:
+        return JsonResponse({"error": "Unknown or expired refresh"}, status=404)
+    feed_ids, pending = status
+
+    if pending:
+        pending_urls = Feed.objects.filter(id__in=pending).values_list("url", flat=True)
+        return JsonResponse({"pending": list(pending_urls)}, status=202)
+
+    per_feed_limit = None
+    if request.GET.get("per_feed_limit"):
+        try:
+            per_feed_limit = int(request.GET.get("per_feed_limit"))
+        except (ValueError, TypeError):
+            pass
+    feeds_by_url = get_feed_items_by_url(
+        Feed.objects.filter(id__in=feed_ids),
+        parse_since(request.GET.get("since")),
+        per_feed_limit=per_feed_limit,
+        include_json=request.GET.get("include_json") in ("1", "true"),
+    )
     return JsonResponse(feeds_by_url)
 
 
-def get_feed_items_by_url(feeds, since=None, per_feed_limit=100):
+def get_feed_items_by_url(feeds, since=None, per_feed_limit=100, include_json=False):
     """
     Returns feeds by URL with their items, filtered by date if since is provided.
 
     Args:
-        urls (list): List of feed URLs to fetch
+        feeds (QuerySet): Feeds to include
         since (datetime, optional): Only include items newer than this date
-        limit (int, optional): Maximum number of items to include per feed
-        feed_ids (list, optional): List of feed IDs to filter by instead of URLs
+        per_feed_limit (int, optional): Maximum number of items to include per feed
+        include_json (bool, optional): Include each item's full parsed json
 
     Returns:
         dict: Dictionary mapping feed URLs to their data
     """
     if since:
         feeds = feeds.filter(newest_item_date__gte=since)
+    feeds = list(feeds)
+
+    # Fetch every feed's most recent items in one query
+    items_by_feed = FeedItem.objects.recent_items_by_feed(
+        [feed.id for feed in feeds],
+        since=since,
+        per_feed_limit=per_feed_limit,
+        include_json=include_json,
+    )
 
     feeds_by_url = {}
     for feed in feeds:
-        # First determine which items to include
-        items_query = feed.items
-        if since:
-            items_query = items_query.filter(date__gte=since)
-
-        # Get the most recent items (limited by the limit parameter)
-        items = items_query.order_by("-date")[:per_feed_limit]
+        items = items_by_feed.get(feed.id, [])
 
         # Build the response dictionary
         feeds_by_url[feed.url] = {
             "success": True,
             "fetched": {
-                "items": [item.to_dict() for item in items],
+                "items": [item.to_dict(include_json=include_json) for item in items],
                 **feed.to_dict(),
             },
         }
@@ -8,7 +8,7 @@ from .models import InboxItem
 @admin.register(InboxItem)
 class InboxItemAdmin(admin.ModelAdmin):
     list_display = ["title", "owner_link", "source_link", "created_at", "updated_at"]
-    list_filter = ["created_at"]
+    list_filter = ["state", "created_at"]
     search_fields = [
         "title",
         "url",
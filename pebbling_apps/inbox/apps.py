@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class InboxConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "pebbling_apps.inbox"
+
+    def ready(self):
+        import pebbling_apps.inbox.signals
@@ -19,6 +19,19 @@ class SourceType(str, Enum):
         return [(item.value, item.value.title()) for item in cls]
 
 
+class InboxState(str, Enum):
+    """Where an inbox item lives; read or unread is tracked separately."""
+
+    INBOX = "inbox"
+    ARCHIVED = "archived"
+    TRASHED = "trashed"
+
+    @classmethod
+    def choices(cls):
+        """Return choices for Django model field."""
+        return [(item.value, item.value.title()) for item in cls]
+
+
 # Legacy string constants for backwards compatibility
 MASTODON_SOURCE_TYPE = SourceType.MASTODON.value
 FEED_SOURCE_TYPE = SourceType.FEED.value
@@ -143,10 +143,6 @@ class Command(BaseCommand):
             "Future trends and what they mean for developers.",
         ]
 
-        # Create system tags
-        read_tag = Tag.objects.get_or_create_system_tag("inbox:read", user)
-        archived_tag = Tag.objects.get_or_create_system_tag("inbox:archived", user)
-
         created_items = []
 
         for i in range(count):
@@ -191,14 +187,13 @@ class Command(BaseCommand):
             item.created_at = created_at
             item.save()
 
-            # Randomly add tags
-            # 30% chance of being read (only if we have the tag)
-            if read_tag and random.random() < 0.3:
-                item.tags.add(read_tag)
+            # 30% chance of being read
+            if random.random() < 0.3:
+                item.mark_read()
 
-            # 10% chance of being archived (only if we have the tag)
-            if archived_tag and random.random() < 0.1:
-                item.tags.add(archived_tag)
+            # 10% chance of being archived
+            if random.random() < 0.1:
+                item.mark_archived()
 
             # 20% chance of having user tags
             if random.random() < 0.2:
@@ -226,9 +221,7 @@ class Command(BaseCommand):
         total_items = InboxItem.objects.filter(owner=user).count()
         unread_items = InboxItem.objects.unread_for_user(user).count()
         archived_items = InboxItem.objects.archived_for_user(user).count()
-        read_items = InboxItem.objects.filter(
-            owner=user, tags__name="inbox:read", tags__is_system=True
-        ).count()
+        read_items = InboxItem.objects.filter(owner=user, read_at__isnull=False).count()
 
         self.stdout.write("\nInbox stats for user:")
         self.stdout.write(f"  Total items: {total_items}")
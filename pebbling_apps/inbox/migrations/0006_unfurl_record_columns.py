@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from pebbling_apps.unfurl.migration_helpers import (
+    move_unfurl_metadata,
+    restore_unfurl_metadata,
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inbox", "0005_populate_source_type_improved"),
+        ("unfurl", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inboxitem",
+            name="image_url",
+            field=models.URLField(
+                blank=True, max_length=10240, null=True, verbose_name="Image URL"
+            ),
+        ),
+        migrations.AddField(
+            model_name="inboxitem",
+            name="site_name",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        # A ForeignObject has no column, and the schema editor cannot remove
+        # one on rollback, so it is only added to the model state
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name="inboxitem",
+                    name="unfurl_record",
+                    field=models.ForeignObject(
+                        from_fields=["unique_hash"],
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="unfurl.unfurlrecord",
+                        to_fields=["url_hash"],
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(
+            move_unfurl_metadata("inbox", "InboxItem"),
+            restore_unfurl_metadata("inbox", "InboxItem"),
+        ),
+        migrations.RemoveField(
+            model_name="inboxitem",
+            name="unfurl_metadata",
+        ),
+    ]
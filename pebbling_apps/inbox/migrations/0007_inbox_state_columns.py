@@ -0,0 +1,59 @@
+# Generated by Django 5.1.6 on 2026-10-17 00:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookmarks", "0020_unfurl_record_columns"),
+        ("inbox", "0006_unfurl_record_columns"),
+        ("unfurl", "0002_unfurl_cache"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inboxitem",
+            name="archived_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="inboxitem",
+            name="read_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="inboxitem",
+            name="state",
+            field=models.CharField(
+                choices=[
+                    ("inbox", "Inbox"),
+                    ("archived", "Archived"),
+                    ("trashed", "Trashed"),
+                ],
+                default="inbox",
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="inboxitem",
+            name="trashed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="inboxitem",
+            index=models.Index(
+                fields=["owner", "state", "-created_at"],
+                name="inbox_inbox_owner_i_aef93b_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inboxitem",
+            index=models.Index(
+                fields=["owner", "state", "read_at"],
+                name="inbox_inbox_owner_i_fd9a28_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+from django.db import migrations
+from django.db.models import Count, F
+
+# System tags that recorded inbox state, and the columns that replace them.
+# Trashed comes last so that it wins over archived.
+STATE_TAGS = [
+    ("inbox:read", {"read_at": F("updated_at")}),
+    ("inbox:archived", {"state": "archived", "archived_at": F("updated_at")}),
+    ("inbox:trashed", {"state": "trashed", "trashed_at": F("updated_at")}),
+]
+
+# Columns set for items that should carry each tag again, on rollback
+STATE_FILTERS = {
+    "inbox:read": {"read_at__isnull": False},
+    "inbox:archived": {"archived_at__isnull": False},
+    "inbox:trashed": {"state": "trashed"},
+}
+
+
+def move_system_tags_to_state(apps, schema_editor):
+    """
+    Copy inbox state from system tags into the state columns, then delete
+    the tags. Each tag is one set-based UPDATE; the exact time an item was
+    tagged was never recorded, so its updated_at stands in.
+    """
+    InboxItem = apps.get_model("inbox", "InboxItem")
+    Tag = apps.get_model("bookmarks", "Tag")
+    Through = InboxItem.tags.through
+    db = schema_editor.connection.alias
+
+    for name, changes in STATE_TAGS:
+        tagged_ids = Through.objects.using(db).filter(
+            tag__name=name, tag__is_system=True
+        )
+        InboxItem.objects.using(db).filter(
+            id__in=tagged_ids.values("inboxitem_id")
+        ).update(**changes)
+
+    Tag.objects.using(db).filter(
+        name__in=[name for name, _ in STATE_TAGS], is_system=True
+    ).delete()
+
+
+def move_state_to_system_tags(apps, schema_editor):
+    """Recreate the system tags from the state columns (for rollback)."""
+    InboxItem = apps.get_model("inbox", "InboxItem")
+    Tag = apps.get_model("bookmarks", "Tag")
+    Through = InboxItem.tags.through
+    db = schema_editor.connection.alias
+
+    for name, filters in STATE_FILTERS.items():
+        items = InboxItem.objects.using(db).filter(**filters)
+        counts = items.values("owner_id").annotate(total=Count("id")).order_by()
+        tag_ids = {}
+        for row in counts:
+            tag, _ = Tag.objects.using(db).get_or_create(
+                name=name, owner_id=row["owner_id"], defaults={"is_system": True}
+            )
+            Tag.objects.using(db).filter(pk=tag.pk).update(
+                inbox_item_count=row["total"]
+            )
+            tag_ids[row["owner_id"]] = tag.pk
+
+        Through.objects.using(db).bulk_create(
+            [
+                Through(inboxitem_id=item_id, tag_id=tag_ids[owner_id])
+                for item_id, owner_id in items.values_list("id", "owner_id")
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inbox", "0007_inbox_state_columns"),
+        ("bookmarks", "0020_unfurl_record_columns"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            move_system_tags_to_state,
+            move_state_to_system_tags,
+        ),
+    ]
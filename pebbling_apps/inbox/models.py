@@ -1,10 +1,13 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from pebbling_apps.common.models import TimestampedModel
-from pebbling_apps.unfurl.models import UnfurlMetadataField
+from pebbling_apps.unfurl.models import UnfurledModel
 from urllib.parse import urlparse
-from .constants import SourceType
+from .constants import InboxState, SourceType
 
 
 class InboxItemManager(models.Manager):
@@ -16,15 +19,63 @@ class InboxItemManager(models.Manager):
         return normalizer.generate_hash(url)
 
     def unread_for_user(self, user):
-        """Return items without inbox:read tag for the user."""
-        return self.filter(owner=user).exclude(
-            tags__name="inbox:read", tags__is_system=True
-        )
+        """Return the user's items not yet marked read."""
+        return self.filter(owner=user, read_at__isnull=True)
 
     def archived_for_user(self, user):
-        """Return items with inbox:archived tag for the user."""
+        """Return the user's archived items."""
+        return self.filter(owner=user, state=InboxState.ARCHIVED.value)
+
+    def visible_states(self, show_archived=False, show_trashed=False):
+        """Return the states to list: the inbox, plus archive or trash if asked."""
+        states = [InboxState.INBOX.value]
+        if show_archived:
+            states.append(InboxState.ARCHIVED.value)
+        if show_trashed:
+            states.append(InboxState.TRASHED.value)
+        return states
+
+    def in_states(self, user, show_archived=False, show_trashed=False):
+        """
+        Return the user's items in the visible states, as a range scan of
+        the (owner, state, created_at) index.
+        """
+        return self.filter(
+            owner=user,
+            state__in=self.visible_states(show_archived, show_trashed),
+        )
+
+    def unread_count(self, user):
+        """Count the user's unread items still in the inbox."""
         return self.filter(
-            owner=user, tags__name="inbox:archived", tags__is_system=True
+            owner=user, state=InboxState.INBOX.value, read_at__isnull=True
+        ).count()
+
+    def bulk_mark_read(self, user, item_ids):
+        """
+        Mark the user's items read in one UPDATE, keeping the time each was
+        first read. Returns how many of the items were found.
+        """
+        read_at = Coalesce(
+            F("read_at"), Value(timezone.now(), output_field=models.DateTimeField())
+        )
+        return self.filter(owner=user, id__in=item_ids).update(read_at=read_at)
+
+    def bulk_mark_unread(self, user, item_ids):
+        """Mark the user's items unread in one UPDATE, returning how many."""
+        return self.filter(owner=user, id__in=item_ids).update(read_at=None)
+
+    def bulk_archive(self, user, item_ids):
+        """
+        Move the user's items to the archive in one UPDATE, keeping the time
+        already archived items were archived. Returns how many were found.
+        """
+        archived_at = Coalesce(
+            F("archived_at"),
+            Value(timezone.now(), output_field=models.DateTimeField()),
+        )
+        return self.filter(owner=user, id__in=item_ids).update(
+            state=InboxState.ARCHIVED.value, archived_at=archived_at
         )
 
     def by_source(self, source):
@@ -32,7 +83,14 @@ class InboxItemManager(models.Manager):
         return self.filter(source=source)
 
     def query(
-        self, owner=None, tags=None, search=None, source=None, since=None, sort="date"
+        self,
+        owner=None,
+        tags=None,
+        search=None,
+        source=None,
+        since=None,
+        sort="date",
+        states=None,
     ):
         """Query inbox items with filtering and sorting."""
         queryset = self.get_queryset()
@@ -40,11 +98,14 @@ class InboxItemManager(models.Manager):
         if owner:
             queryset = queryset.filter(owner=owner)
 
+        if states:
+            queryset = queryset.filter(state__in=states)
+
         if tags:
             from pebbling_apps.bookmarks.models import Tag
 
             tag_ids = Tag.objects.filter(name__in=tags).values_list("id", flat=True)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = queryset.filter(tags__id__in=tag_ids).distinct()
 
         if search:
             from django.db.models import Q
@@ -74,11 +135,9 @@ class InboxItemManager(models.Manager):
 
 
 # mypy cannot analyze this pattern, but it's the standard django-prometheus usage
-class InboxItem(TimestampedModel):
+class InboxItem(UnfurledModel, TimestampedModel):
     """Inbox item model - potential bookmarks for user review."""
 
-    omit_html = getattr(settings, "OMIT_HTML_FROM_UNFURL_METADATA", True)
-
     objects = InboxItemManager()
 
     url = models.URLField(verbose_name="URL", max_length=10240)
@@ -89,7 +148,6 @@ class InboxItem(TimestampedModel):
     tags = models.ManyToManyField(
         "bookmarks.Tag", related_name="inbox_items", blank=True
     )
-    unfurl_metadata = UnfurlMetadataField(blank=True, null=True, omit_html=omit_html)
     feed_url = models.URLField(blank=True, null=True, verbose_name="Feed URL")
     source = models.CharField(max_length=255, help_text="Source of this inbox item")
     source_type = models.CharField(
@@ -103,6 +161,14 @@ class InboxItem(TimestampedModel):
         blank=True,
         help_text="Source-specific metadata (e.g., Mastodon status ID, feed item ID)",
     )
+    state = models.CharField(
+        max_length=16,
+        choices=InboxState.choices(),
+        default=InboxState.INBOX.value,
+    )
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(null=True, blank=True)
+    trashed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ["owner", "unique_hash", "source"]
@@ -110,6 +176,8 @@ class InboxItem(TimestampedModel):
             models.Index(fields=["owner", "created_at"]),
             models.Index(fields=["source"]),
             models.Index(fields=["owner", "source"]),
+            models.Index(fields=["owner", "state", "-created_at"]),
+            models.Index(fields=["owner", "state", "read_at"]),
         ]
 
     def __str__(self):
@@ -130,28 +198,40 @@ class InboxItem(TimestampedModel):
         return urlparse(self.url).hostname
 
     def is_read(self):
-        """Check if item has inbox:read tag."""
-        return self.tags.filter(name="inbox:read", is_system=True).exists()
+        """Check if item has been marked read."""
+        return self.read_at is not None
 
     def is_archived(self):
-        """Check if item has inbox:archived tag."""
-        return self.tags.filter(name="inbox:archived", is_system=True).exists()
+        """Check if item has been archived."""
+        return self.state == InboxState.ARCHIVED.value
+
+    def is_trashed(self):
+        """Check if item has been trashed."""
+        return self.state == InboxState.TRASHED.value
+
+    def _set_state(self, **changes):
+        """Save state changes without a full save() of the item."""
+        for name, value in changes.items():
+            setattr(self, name, value)
+        self.__class__.objects.filter(pk=self.pk).update(**changes)
 
     def mark_read(self):
-        """Add inbox:read system tag."""
-        from pebbling_apps.bookmarks.models import Tag
+        """Mark the item read, keeping the time it was first read."""
+        if self.read_at is None:
+            self._set_state(read_at=timezone.now())
 
-        read_tag = Tag.objects.get_or_create_system_tag("inbox:read", self.owner)
-        self.tags.add(read_tag)
+    def mark_unread(self):
+        """Mark the item unread."""
+        self._set_state(read_at=None)
 
     def mark_archived(self):
-        """Add inbox:archived system tag."""
-        from pebbling_apps.bookmarks.models import Tag
+        """Move the item to the archive."""
+        if not self.is_archived():
+            self._set_state(state=InboxState.ARCHIVED.value, archived_at=timezone.now())
 
-        archived_tag = Tag.objects.get_or_create_system_tag(
-            "inbox:archived", self.owner
-        )
-        self.tags.add(archived_tag)
+    def mark_unarchived(self):
+        """Move the item back to the inbox."""
+        self._set_state(state=InboxState.INBOX.value, archived_at=None)
 
     def get_mastodon_status_url(self):
         """Get the original Mastodon status URL if this item came from Mastodon."""
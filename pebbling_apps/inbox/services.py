@@ -1,6 +1,9 @@
 import logging
-from typing import List, Dict, Any, Optional, Callable
-from django.db import IntegrityError
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+from django.db import IntegrityError, router, transaction
+from pebbling_apps.bookmarks.models import Bookmark, BookmarkCount, Tag
+from pebbling_apps.bookmarks.search import BookmarkSearchIndex
 from .models import InboxItem
 
 logger = logging.getLogger(__name__)
@@ -182,3 +185,105 @@ class InboxItemCreationService:
         )
 
         return created_items[0] if created_items else None
+
+
+class InboxCollectionService:
+    """
+    Copies inbox items into the bookmark collection as a batch: one upsert
+    for the bookmarks keyed on (owner, unique_hash), one insert for their
+    tag links, and one UPDATE to archive the items, whatever the batch size.
+    """
+
+    # Bookmark columns overwritten from the inbox item on an existing bookmark
+    UPSERT_FIELDS = ["title", "description", "feed_url", "image_url", "site_name"]
+
+    @classmethod
+    def add_items(cls, owner, item_ids: Iterable[int]) -> Tuple[int, int]:
+        """
+        Add the owner's inbox items to their collection and archive them.
+        Items sharing a URL become one bookmark. Returns the number of
+        bookmarks added and the number of existing bookmarks updated.
+        """
+        items = list(
+            InboxItem.objects.filter(owner=owner, id__in=item_ids).order_by("id")
+        )
+        if not items:
+            return 0, 0
+
+        # Later items win for the bookmark's fields, as when added one by one
+        items_by_hash = {item.unique_hash: item for item in items}
+        tag_ids_by_hash = defaultdict(set)
+        links = InboxItem.tags.through.objects.filter(
+            inboxitem_id__in=[item.id for item in items], tag__is_system=False
+        ).values_list("inboxitem_id", "tag_id")
+        hash_by_item_id = {item.id: item.unique_hash for item in items}
+        for item_id, tag_id in links:
+            tag_ids_by_hash[hash_by_item_id[item_id]].add(tag_id)
+
+        with transaction.atomic(using=router.db_for_write(Bookmark)):
+            existing_ids = dict(
+                Bookmark.objects.filter(
+                    owner=owner, unique_hash__in=items_by_hash
+                ).values_list("unique_hash", "id")
+            )
+            bookmarks = Bookmark.objects.bulk_create(
+                [
+                    Bookmark(
+                        url=item.url,
+                        owner=owner,
+                        unique_hash=unique_hash,
+                        title=item.title,
+                        description=item.description,
+                        feed_url=item.feed_url,
+                        image_url=item.image_url,
+                        site_name=item.site_name,
+                    )
+                    for unique_hash, item in items_by_hash.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["owner", "unique_hash"],
+                update_fields=cls.UPSERT_FIELDS,
+            )
+            bookmark_ids = {bookmark.unique_hash: bookmark.pk for bookmark in bookmarks}
+            added = len(bookmarks) - len(existing_ids)
+
+            cls._copy_tags(owner, bookmark_ids, existing_ids, tag_ids_by_hash)
+            if added:
+                BookmarkCount.objects.adjust(owner.id, delta=added)
+            BookmarkSearchIndex().index_bookmarks(bookmark_ids.values())
+
+        InboxItem.objects.bulk_archive(owner, [item.id for item in items])
+        return added, len(existing_ids)
+
+    @classmethod
+    def _copy_tags(cls, owner, bookmark_ids, existing_ids, tag_ids_by_hash):
+        """
+        Link the bookmarks to their items' tags and count the links actually
+        added. Bulk inserts skip m2m_changed, so the tag usage counters
+        those signals maintain are adjusted here instead.
+        """
+        through = Bookmark.tags.through
+        linked = set(
+            through.objects.filter(bookmark_id__in=existing_ids.values()).values_list(
+                "bookmark_id", "tag_id"
+            )
+        )
+        new_links = [
+            (bookmark_ids[unique_hash], tag_id)
+            for unique_hash, tag_ids in tag_ids_by_hash.items()
+            for tag_id in tag_ids
+            if (bookmark_ids[unique_hash], tag_id) not in linked
+        ]
+        if not new_links:
+            return
+
+        through.objects.bulk_create(
+            [through(bookmark_id=b_id, tag_id=t_id) for b_id, t_id in new_links],
+            ignore_conflicts=True,
+        )
+        tag_ids_by_delta = defaultdict(list)
+        for tag_id, delta in Counter(t_id for _, t_id in new_links).items():
+            tag_ids_by_delta[delta].append(tag_id)
+        for delta, tag_ids in tag_ids_by_delta.items():
+            BookmarkCount.objects.adjust(owner.id, tag_ids, delta=delta)
+            Tag.objects.adjust_usage(tag_ids, "bookmark_count", delta)
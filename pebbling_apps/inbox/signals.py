@@ -0,0 +1,55 @@
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.dispatch import receiver
+from pebbling_apps.bookmarks.models import Tag
+from .models import InboxItem
+
+
+@receiver(pre_delete, sender=InboxItem)
+def remember_tags_on_inbox_item_delete(sender, instance, **kwargs):
+    """Deleting an item drops its tag links without m2m_changed signals."""
+    instance._usage_tag_ids = list(instance.tags.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=InboxItem)
+def count_tags_on_inbox_item_delete(sender, instance, using=None, **kwargs):
+    tag_ids = getattr(instance, "_usage_tag_ids", [])
+    Tag.objects.db_manager(using).adjust_usage(tag_ids, "inbox_item_count", -1)
+
+
+@receiver(m2m_changed, sender=InboxItem.tags.through)
+def count_tags_on_inbox_tags_changed(
+    sender, instance, action, reverse, pk_set, using=None, **kwargs
+):
+    """Keep tag inbox_item_count in step with tag links, from either side."""
+    tags = Tag.objects.db_manager(using)
+
+    if not reverse:
+        # instance is an InboxItem and pk_set holds tag ids. Removal pk_sets
+        # may name tags that were never linked, so record the real ones first.
+        if action == "pre_remove":
+            instance._usage_removed_tag_ids = list(
+                instance.tags.filter(id__in=pk_set).values_list("id", flat=True)
+            )
+        elif action == "pre_clear":
+            instance._usage_removed_tag_ids = list(
+                instance.tags.values_list("id", flat=True)
+            )
+        elif action == "post_add":
+            tags.adjust_usage(pk_set, "inbox_item_count", 1)
+        elif action in ("post_remove", "post_clear"):
+            tag_ids = getattr(instance, "_usage_removed_tag_ids", [])
+            tags.adjust_usage(tag_ids, "inbox_item_count", -1)
+        return
+
+    # Reverse side: instance is a Tag and pk_set holds inbox item ids
+    if action == "pre_remove":
+        instance._usage_removed_count = instance.inbox_items.filter(
+            id__in=pk_set
+        ).count()
+    elif action == "pre_clear":
+        instance._usage_removed_count = instance.inbox_items.count()
+    elif action == "post_add":
+        tags.adjust_usage([instance.pk], "inbox_item_count", len(pk_set or []))
+    elif action in ("post_remove", "post_clear"):
+        removed = getattr(instance, "_usage_removed_count", 0)
+        tags.adjust_usage([instance.pk], "inbox_item_count", -removed)
@@ -0,0 +1,193 @@
+import importlib
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from pebbling_apps.bookmarks.models import Bookmark, BookmarkCount, Tag
+from pebbling_apps.inbox.constants import InboxState
+from pebbling_apps.inbox.models import InboxItem
+from pebbling_apps.inbox.services import InboxCollectionService
+
+User = get_user_model()
+
+state_migration = importlib.import_module(
+    "pebbling_apps.inbox.migrations.0008_move_system_tags_to_state"
+)
+
+
+class InboxStateTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="12345"
+        )
+        self.items = [
+            InboxItem.objects.create(
+                url=f"https://example.com/{i}",
+                owner=self.user,
+                title=f"Item {i}",
+                source="test",
+            )
+            for i in range(4)
+        ]
+
+    def test_state_changes(self):
+        item = self.items[0]
+        self.assertFalse(item.is_read())
+
+        item.mark_read()
+        read_at = item.read_at
+        item.mark_read()
+        item.refresh_from_db()
+        self.assertTrue(item.is_read())
+        self.assertEqual(item.read_at, read_at)
+
+        item.mark_archived()
+        item.refresh_from_db()
+        self.assertTrue(item.is_archived())
+        self.assertIsNotNone(item.archived_at)
+
+        item.mark_unarchived()
+        item.mark_unread()
+        item.refresh_from_db()
+        self.assertEqual(item.state, InboxState.INBOX.value)
+        self.assertFalse(item.is_read())
+        self.assertFalse(item.tags.exists())
+
+    def test_unread_count_and_visible_states(self):
+        self.items[0].mark_read()
+        self.items[1].mark_archived()
+
+        self.assertEqual(InboxItem.objects.unread_count(self.user), 2)
+        self.assertEqual(InboxItem.objects.in_states(self.user).count(), 3)
+        self.assertEqual(
+            InboxItem.objects.in_states(self.user, show_archived=True).count(), 4
+        )
+
+    def test_list_view_filters_by_state(self):
+        self.items[1].mark_archived()
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("inbox:list"))
+
+        self.assertEqual(response.status_code, 200)
+        listed = {item.id for item in response.context["inbox_items"]}
+        self.assertEqual(listed, {self.items[i].id for i in (0, 2, 3)})
+        self.assertEqual(response.context["unread_count"], 3)
+
+    def test_system_tags_migrate_to_state_columns(self):
+        read = Tag.objects.get_or_create_system_tag("inbox:read", self.user)
+        archived = Tag.objects.get_or_create_system_tag("inbox:archived", self.user)
+        trashed = Tag.objects.get_or_create_system_tag("inbox:trashed", self.user)
+        python = Tag.objects.create(name="python", owner=self.user)
+        self.items[0].tags.add(read, python)
+        self.items[1].tags.add(archived)
+        self.items[2].tags.add(archived, trashed)
+
+        schema_editor = SimpleNamespace(connection=connection)
+        state_migration.move_system_tags_to_state(apps, schema_editor)
+
+        for item in self.items:
+            item.refresh_from_db()
+        self.assertTrue(self.items[0].is_read())
+        self.assertEqual(self.items[1].state, InboxState.ARCHIVED.value)
+        self.assertEqual(self.items[2].state, InboxState.TRASHED.value)
+        self.assertEqual(self.items[3].state, InboxState.INBOX.value)
+        self.assertEqual(list(self.items[0].tags.all()), [python])
+        self.assertFalse(Tag.objects.filter(is_system=True).exists())
+
+        state_migration.move_state_to_system_tags(apps, schema_editor)
+        self.assertEqual(
+            set(self.items[2].tags.values_list("name", flat=True)),
+            {"inbox:archived", "inbox:trashed"},
+        )
+
+
+class InboxBulkActionsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="12345"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="12345"
+        )
+        self.items = [
+            InboxItem.objects.create(
+                url=f"https://example.com/{i}",
+                owner=self.user,
+                title=f"Item {i}",
+                source="test",
+            )
+            for i in range(3)
+        ]
+        self.item_ids = [item.id for item in self.items]
+
+    def test_bulk_state_changes_are_single_updates(self):
+        self.items[0].mark_read()
+        read_at = self.items[0].read_at
+        foreign = InboxItem.objects.create(
+            url="https://example.com/other", owner=self.other, title="x", source="t"
+        )
+
+        with self.assertNumQueries(1):
+            count = InboxItem.objects.bulk_mark_read(
+                self.user, self.item_ids + [foreign.id]
+            )
+
+        self.assertEqual(count, 3)
+        self.assertEqual(InboxItem.objects.unread_count(self.user), 0)
+        self.items[0].refresh_from_db()
+        self.assertEqual(self.items[0].read_at, read_at)
+        foreign.refresh_from_db()
+        self.assertFalse(foreign.is_read())
+
+        self.assertEqual(InboxItem.objects.bulk_archive(self.user, self.item_ids), 3)
+        self.assertEqual(
+            InboxItem.objects.archived_for_user(self.user).count(), len(self.items)
+        )
+        self.assertEqual(InboxItem.objects.bulk_mark_unread(self.user, [foreign.id]), 0)
+
+    def test_add_items_to_collection(self):
+        python = Tag.objects.create(name="python", owner=self.user)
+        django = Tag.objects.create(name="django", owner=self.user)
+        self.items[0].tags.add(python, django)
+        self.items[1].tags.add(python)
+        existing = Bookmark.objects.create(
+            url=self.items[0].url, owner=self.user, title="Old title"
+        )
+        existing.tags.add(django)
+
+        added, updated = InboxCollectionService.add_items(self.user, self.item_ids)
+
+        self.assertEqual((added, updated), (2, 1))
+        existing.refresh_from_db()
+        self.assertEqual(existing.title, "Item 0")
+        self.assertEqual(
+            set(existing.tags.values_list("name", flat=True)), {"python", "django"}
+        )
+        new = Bookmark.objects.get(owner=self.user, url=self.items[1].url)
+        self.assertEqual(list(new.tags.all()), [python])
+        self.assertEqual(Bookmark.objects.filter(owner=self.user).count(), 3)
+        self.assertEqual(BookmarkCount.objects.for_query(owner=self.user), 3)
+        self.assertEqual(BookmarkCount.objects.for_query(self.user, ["python"]), 2)
+        python.refresh_from_db()
+        django.refresh_from_db()
+        self.assertEqual((python.bookmark_count, django.bookmark_count), (2, 1))
+        self.assertEqual(InboxItem.objects.archived_for_user(self.user).count(), 3)
+
+    def test_bulk_add_view_reports_counts(self):
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            reverse("inbox:bulk_add_to_collection"),
+            {"selected_items": ",".join(str(pk) for pk in self.item_ids)},
+        )
+
+        self.assertRedirects(response, reverse("inbox:list"))
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            ["Added 3 items to collection."],
+        )
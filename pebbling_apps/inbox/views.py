@@ -9,6 +9,7 @@ from django.urls import reverse_lazy
 from django.views.decorators.clickjacking import xframe_options_exempt
 import bleach
 from .models import InboxItem
+from .services import InboxCollectionService
 
 
 class InboxListView(LoginRequiredMixin, ListView):
@@ -27,56 +28,33 @@ class InboxListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         """Filter items by current user and apply query parameters."""
         try:
-            # Start with user's items
-            queryset = InboxItem.objects.filter(owner=self.request.user)
-
-            # Default filter: exclude archived and trashed items (show unread)
-            if not self.request.GET.get("show_archived"):
-                queryset = queryset.exclude(
-                    tags__name="inbox:archived", tags__is_system=True
-                )
-            if not self.request.GET.get("show_trashed"):
-                queryset = queryset.exclude(
-                    tags__name="inbox:trashed", tags__is_system=True
-                )
-
             # Apply query parameters
             search = self.request.GET.get("q", "")
             source = self.request.GET.get("source", "")
             tags = self.request.GET.getlist("tags")
             sort = self.request.GET.get("sort", "date")
 
+            # Default filter: exclude archived and trashed items
+            states = InboxItem.objects.visible_states(
+                show_archived=bool(self.request.GET.get("show_archived")),
+                show_trashed=bool(self.request.GET.get("show_trashed")),
+            )
+
             # Use the manager's query method
-            queryset = InboxItem.objects.query(
+            return InboxItem.objects.query(
                 owner=self.request.user,
                 search=search if search else None,
                 source=source if source else None,
                 tags=tags if tags else None,
                 sort=sort,
+                states=states,
             )
 
-            # Apply the same archive/trash filters to the query result
-            if not self.request.GET.get("show_archived"):
-                queryset = queryset.exclude(
-                    tags__name="inbox:archived", tags__is_system=True
-                )
-            if not self.request.GET.get("show_trashed"):
-                queryset = queryset.exclude(
-                    tags__name="inbox:trashed", tags__is_system=True
-                )
-
-            return queryset.distinct()
-
         except Exception as e:
             # Handle invalid query parameters gracefully
             messages.error(self.request, f"Error filtering inbox items: {e}")
-            return (
-                InboxItem.objects.filter(owner=self.request.user)
-                .exclude(
-                    tags__name__in=["inbox:archived", "inbox:trashed"],
-                    tags__is_system=True,
-                )
-                .order_by("-created_at")
+            return InboxItem.objects.in_states(self.request.user).order_by(
+                "-created_at"
             )
 
     def get_context_data(self, **kwargs):
@@ -98,14 +76,7 @@ class InboxListView(LoginRequiredMixin, ListView):
         )
 
         # Count unread items (exclude archived and trashed)
-        context["unread_count"] = (
-            InboxItem.objects.filter(owner=self.request.user)
-            .exclude(
-                tags__name__in=["inbox:read", "inbox:archived", "inbox:trashed"],
-                tags__is_system=True,
-            )
-            .count()
-        )
+        context["unread_count"] = InboxItem.objects.unread_count(self.request.user)
 
         return context
 
@@ -137,14 +108,7 @@ def mark_item_unread(request, item_id):
 
     try:
         item = get_object_or_404(InboxItem, id=item_id, owner=request.user)
-        # Remove the read tag
-        from pebbling_apps.bookmarks.models import Tag
-
-        read_tag = Tag.objects.filter(
-            name="inbox:read", owner=request.user, is_system=True
-        ).first()
-        if read_tag:
-            item.tags.remove(read_tag)
+        item.mark_unread()
         messages.success(request, f"'{item.title}' marked as unread.")
     except Exception as e:
         messages.error(request, f"Error marking item as unread: {e}")
@@ -176,14 +140,7 @@ def unarchive_item(request, item_id):
 
     try:
         item = get_object_or_404(InboxItem, id=item_id, owner=request.user)
-        # Remove the archived tag
-        from pebbling_apps.bookmarks.models import Tag
-
-        archived_tag = Tag.objects.filter(
-            name="inbox:archived", owner=request.user, is_system=True
-        ).first()
-        if archived_tag:
-            item.tags.remove(archived_tag)
+        item.mark_unarchived()
         messages.success(request, f"'{item.title}' unarchived.")
     except Exception as e:
         messages.error(request, f"Error unarchiving item: {e}")
@@ -413,23 +370,13 @@ def bulk_mark_read(request):
 
         item_ids = [int(id.strip()) for id in selected_items.split(",") if id.strip()]
 
-        # Get items belonging to the current user
-        items = InboxItem.objects.filter(id__in=item_ids, owner=request.user)
+        # One UPDATE, counting only items belonging to the current user
+        count = InboxItem.objects.bulk_mark_read(request.user, item_ids)
 
-        if not items.exists():
+        if not count:
             messages.error(request, "No valid items found.")
             return redirect("inbox:list")
 
-        # Add read tag to all items
-        from pebbling_apps.bookmarks.models import Tag
-
-        read_tag = Tag.objects.get_or_create_system_tag("inbox:read", request.user)
-
-        count = 0
-        for item in items:
-            item.tags.add(read_tag)
-            count += 1
-
         messages.success(request, f"Marked {count} items as read.")
 
     except Exception as e:
@@ -453,26 +400,13 @@ def bulk_mark_unread(request):
 
         item_ids = [int(id.strip()) for id in selected_items.split(",") if id.strip()]
 
-        # Get items belonging to the current user
-        items = InboxItem.objects.filter(id__in=item_ids, owner=request.user)
+        # One UPDATE, counting only items belonging to the current user
+        count = InboxItem.objects.bulk_mark_unread(request.user, item_ids)
 
-        if not items.exists():
+        if not count:
             messages.error(request, "No valid items found.")
             return redirect("inbox:list")
 
-        # Remove read tag from all items
-        from pebbling_apps.bookmarks.models import Tag
-
-        read_tag = Tag.objects.filter(
-            name="inbox:read", owner=request.user, is_system=True
-        ).first()
-
-        count = 0
-        if read_tag:
-            for item in items:
-                item.tags.remove(read_tag)
-                count += 1
-
         messages.success(request, f"Marked {count} items as unread.")
 
     except Exception as e:
@@ -496,25 +430,13 @@ def bulk_archive(request):
 
         item_ids = [int(id.strip()) for id in selected_items.split(",") if id.strip()]
 
-        # Get items belonging to the current user
-        items = InboxItem.objects.filter(id__in=item_ids, owner=request.user)
+        # One UPDATE, counting only items belonging to the current user
+        count = InboxItem.objects.bulk_archive(request.user, item_ids)
 
-        if not items.exists():
+        if not count:
             messages.error(request, "No valid items found.")
             return redirect("inbox:list")
 
-        # Add archived tag to all items
-        from pebbling_apps.bookmarks.models import Tag
-
-        archived_tag = Tag.objects.get_or_create_system_tag(
-            "inbox:archived", request.user
-        )
-
-        count = 0
-        for item in items:
-            item.tags.add(archived_tag)
-            count += 1
-
         messages.success(request, f"Archived {count} items.")
 
     except Exception as e:
@@ -538,17 +460,15 @@ def bulk_trash(request):
 
         item_ids = [int(id.strip()) for id in selected_items.split(",") if id.strip()]
 
-        # Get items belonging to the current user
+        # Delete items belonging to the current user permanently
         items = InboxItem.objects.filter(id__in=item_ids, owner=request.user)
+        _, deleted = items.delete()
+        count = deleted.get(InboxItem._meta.label, 0)
 
-        if not items.exists():
+        if not count:
             messages.error(request, "No valid items found.")
             return redirect("inbox:list")
 
-        # Delete items permanently
-        count = items.count()
-        items.delete()
-
         messages.success(request, f"Permanently deleted {count} items.")
 
     except Exception as e:
@@ -572,65 +492,9 @@ def bulk_add_to_collection(request):
 
         item_ids = [int(id.strip()) for id in selected_items.split(",") if id.strip()]
 
-        # Get items belonging to the current user
-        items = InboxItem.objects.filter(id__in=item_ids, owner=request.user)
-
-        if not items.exists():
-            messages.error(request, "No valid items found.")
-            return redirect("inbox:list")
-
-        # Import bookmark model
-        from pebbling_apps.bookmarks.models import Bookmark
-
-        added_count = 0
-        updated_count = 0
-        error_count = 0
-
-        for item in items:
-            try:
-                # Check for existing bookmark with same unique hash
-                existing_bookmark = Bookmark.objects.filter(
-                    owner=request.user, unique_hash=item.unique_hash
-                ).first()
-
-                if existing_bookmark:
-                    # Update existing bookmark with inbox item data
-                    existing_bookmark.title = item.title
-                    existing_bookmark.description = item.description
-                    existing_bookmark.unfurl_metadata = item.unfurl_metadata
-                    existing_bookmark.feed_url = item.feed_url
-                    existing_bookmark.save()
-
-                    # Copy user tags (exclude system tags)
-                    user_tags = item.tags.filter(is_system=False)
-                    for tag in user_tags:
-                        existing_bookmark.tags.add(tag)
-
-                    updated_count += 1
-                else:
-                    # Create new bookmark
-                    bookmark = Bookmark.objects.create(
-                        url=item.url,
-                        owner=request.user,
-                        title=item.title,
-                        description=item.description,
-                        unfurl_metadata=item.unfurl_metadata,
-                        feed_url=item.feed_url,
-                    )
-
-                    # Copy user tags (exclude system tags)
-                    user_tags = item.tags.filter(is_system=False)
-                    for tag in user_tags:
-                        bookmark.tags.add(tag)
-
-                    added_count += 1
-
-                # Archive the inbox item after successful addition
-                item.mark_archived()
-
-            except Exception as e:
-                error_count += 1
-                print(f"Error processing item {item.id}: {e}")  # For debugging
+        added_count, updated_count = InboxCollectionService.add_items(
+            request.user, item_ids
+        )
 
         # Provide feedback
         if added_count > 0 and updated_count > 0:
@@ -642,9 +506,8 @@ def bulk_add_to_collection(request):
             messages.success(request, f"Added {added_count} items to collection.")
         elif updated_count > 0:
             messages.success(request, f"Updated {updated_count} existing bookmarks.")
-
-        if error_count > 0:
-            messages.warning(request, f"{error_count} items could not be processed.")
+        else:
+            messages.error(request, "No valid items found.")
 
     except Exception as e:
         messages.error(request, f"Error adding items to collection: {e}")
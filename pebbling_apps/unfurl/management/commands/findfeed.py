@@ -41,7 +41,7 @@ class Command(BaseCommand):
 
             # Run _findfeed() directly
             self.stdout.write("\nRunning _findfeed()...")
-            feeds = unfurl_metadata._findfeed(parsed_url)
+            feeds = unfurl_metadata._findfeed()
 
             if feeds:
                 self.stdout.write(
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from pebbling_apps.common import metrics
+from ...models import UnfurlRecord
+from ...services import (
+    METRIC_HIT,
+    METRIC_MISS,
+    METRIC_NEGATIVE,
+    METRIC_STALE,
+    METRICS,
+)
+
+
+class Command(BaseCommand):
+    help = """Show hit and miss counts for the shared unfurl cache.
+
+    Counts accumulate across web and worker processes until reset.
+
+    Examples:
+        python manage.py unfurl_cache_stats
+        python manage.py unfurl_cache_stats --reset
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counters to zero after showing them",
+        )
+
+    def handle(self, *args, **options):
+        counts = metrics.get_counts(METRICS)
+        for name, value in counts.items():
+            self.stdout.write(f"{name}: {value}")
+
+        lookups = sum(
+            counts[name]
+            for name in [METRIC_HIT, METRIC_STALE, METRIC_NEGATIVE, METRIC_MISS]
+        )
+        if lookups:
+            served = counts[METRIC_HIT] + counts[METRIC_STALE] + counts[METRIC_NEGATIVE]
+            self.stdout.write(f"Hit rate: {served / lookups:.1%} of {lookups} lookups")
+
+        self.stdout.write(f"Cached URLs: {UnfurlRecord.objects.count()}")
+
+        if options["reset"]:
+            metrics.reset(METRICS)
+            self.stdout.write(self.style.SUCCESS("Counters reset"))
@@ -0,0 +1,131 @@
+"""
+Data migration steps shared by the apps whose rows moved their inline
+unfurl_metadata into UnfurlRecord. Historical migrations run these, so
+they read the stored JSON with plain json and historical models only,
+never the live unfurl classes.
+"""
+
+import json
+
+from django.db import models
+from django.db.models.functions import Cast
+
+BATCH_SIZE = 500
+
+
+def _metadata_columns(unfurl_json):
+    """
+    Return (image, site_name, feed) from a stored metadata JSON string.
+    Every stored document carries image and feed at the top level; only
+    newer ones carry site_name, so older ones fall back to OpenGraph.
+    """
+    data = json.loads(unfurl_json)
+    if not isinstance(data, dict):
+        raise ValueError("Unfurl metadata is not an object")
+    header = data.get("header") or {}
+    image = header.get("image", data.get("image"))
+    feed = header.get("feed", data.get("feed"))
+    site_name = header.get("site_name", data.get("site_name"))
+    if site_name is None:
+        opengraph = (data.get("metadata") or {}).get("opengraph") or [{}]
+        site_name = next(
+            (
+                value
+                for key, value in opengraph[0].get("properties", [])
+                if key == "og:site_name"
+            ),
+            None,
+        )
+    return image, site_name, feed
+
+
+def move_unfurl_metadata(app_label, model_name):
+    """
+    Build a RunPython step moving a model's inline metadata into shared
+    unfurl records and the narrow columns, a batch of rows at a time so
+    large tables are never loaded whole.
+    """
+
+    def forwards(apps, schema_editor):
+        Model = apps.get_model(app_label, model_name)
+        UnfurlRecord = apps.get_model("unfurl", "UnfurlRecord")
+        db = schema_editor.connection.alias
+
+        # Read the raw text so a malformed row is skipped rather than
+        # failing the whole batch when the field decodes it
+        rows = (
+            Model.objects.using(db)
+            .filter(unfurl_metadata__isnull=False)
+            .annotate(unfurl_json=Cast("unfurl_metadata", models.TextField()))
+            .only("id", "url", "unique_hash", "feed_url")
+            .order_by("id")
+        )
+        last_id = 0
+        while True:
+            batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            records = {}
+            for row in batch:
+                try:
+                    image, site_name, feed = _metadata_columns(row.unfurl_json)
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+                records.setdefault(
+                    row.unique_hash,
+                    UnfurlRecord(
+                        url_hash=row.unique_hash,
+                        url=row.url,
+                        metadata=row.unfurl_json,
+                    ),
+                )
+                row.image_url = image
+                row.site_name = site_name[:255] if isinstance(site_name, str) else None
+                row.feed_url = row.feed_url or feed
+
+            UnfurlRecord.objects.using(db).bulk_create(
+                records.values(), ignore_conflicts=True
+            )
+            Model.objects.using(db).bulk_update(
+                batch, ["image_url", "site_name", "feed_url"]
+            )
+
+    return forwards
+
+
+def restore_unfurl_metadata(app_label, model_name):
+    """
+    Build the reverse of move_unfurl_metadata, copying each row's shared
+    unfurl record back into its restored unfurl_metadata column.
+    """
+
+    def backwards(apps, schema_editor):
+        Model = apps.get_model(app_label, model_name)
+        UnfurlRecord = apps.get_model("unfurl", "UnfurlRecord")
+        db = schema_editor.connection.alias
+
+        rows = Model.objects.using(db).only("id", "unique_hash").order_by("id")
+        last_id = 0
+        while True:
+            batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            stored = dict(
+                UnfurlRecord.objects.using(db)
+                .filter(url_hash__in={row.unique_hash for row in batch})
+                .exclude(metadata__isnull=True)
+                .annotate(unfurl_json=Cast("metadata", models.TextField()))
+                .values_list("url_hash", "unfurl_json")
+            )
+            restored = []
+            for row in batch:
+                if stored.get(row.unique_hash):
+                    row.unfurl_metadata = stored[row.unique_hash]
+                    restored.append(row)
+            Model.objects.using(db).bulk_update(restored, ["unfurl_metadata"])
+
+    return backwards
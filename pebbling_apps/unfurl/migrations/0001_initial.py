@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:14
+
+import django.utils.timezone
+import pebbling_apps.unfurl.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies: list[tuple[str, str]] = []
+
+    operations = [
+        migrations.CreateModel(
+            name="UnfurlRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("updated_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("url_hash", models.CharField(max_length=255, unique=True)),
+                ("url", models.URLField(max_length=10240, verbose_name="URL")),
+                (
+                    "metadata",
+                    pebbling_apps.unfurl.models.UnfurlMetadataField(
+                        blank=True, null=True
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
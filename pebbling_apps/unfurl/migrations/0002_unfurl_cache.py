@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-16 23:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("unfurl", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="unfurlrecord",
+            name="error",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="unfurlrecord",
+            name="failed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="unfurlrecord",
+            name="fetched_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,5 +1,9 @@
+import json
+from django.conf import settings
 from django.db import models
-from .unfurl import UnfurlMetadata
+from django.utils.timezone import now
+from pebbling_apps.common.models import TimestampedModel
+from .unfurl import LazyUnfurlMetadata, UnfurlMetadata
 from .forms import UnfurlMetadataFormField
 
 
@@ -22,7 +26,8 @@ class UnfurlMetadataField(models.Field):
         """Convert the JSON string back to an UnfurlMetadata instance."""
         if value is None or value == "":  # Handle None or empty string gracefully
             return None
-        return UnfurlMetadata.from_json(json_str=value, omit_html=self.omit_html)
+        # Decoding is deferred until something beyond the header is needed
+        return LazyUnfurlMetadata(value, omit_html=self.omit_html)
 
     def to_python(self, value):
         """Convert the value from the database to an UnfurlMetadata instance."""
@@ -40,3 +45,145 @@ class UnfurlMetadataField(models.Field):
         defaults = {"form_class": UnfurlMetadataFormField, "omit_html": self.omit_html}
         defaults.update(kwargs)
         return super().formfield(**defaults)
+
+
+class UnfurlRecordManager(models.Manager):
+    def store(self, url_hash, url, metadata):
+        """Save metadata for a normalized URL hash, replacing any earlier unfurl."""
+        record, created = self.update_or_create(
+            url_hash=url_hash,
+            defaults={
+                "url": url,
+                "metadata": metadata,
+                "fetched_at": now(),
+                "failed_at": None,
+                "error": "",
+            },
+        )
+        return record
+
+    def store_failure(self, url_hash, url, error):
+        """
+        Record a failed unfurl for a normalized URL hash. Metadata from an
+        earlier successful unfurl is kept.
+        """
+        failure = {"failed_at": now(), "error": str(error)[:1000]}
+        record, created = self.update_or_create(
+            url_hash=url_hash,
+            defaults=failure,
+            create_defaults={"url": url, **failure},
+        )
+        return record
+
+
+class UnfurlRecord(TimestampedModel):
+    """
+    Full unfurl metadata for a URL, keyed by its normalized URL hash and
+    shared by every bookmark and inbox item for that URL, across users.
+    Doubles as the unfurl cache, see UnfurlService.
+    """
+
+    omit_html = getattr(settings, "OMIT_HTML_FROM_UNFURL_METADATA", True)
+
+    objects = UnfurlRecordManager()
+
+    url_hash = models.CharField(max_length=255, unique=True)
+    url = models.URLField(verbose_name="URL", max_length=10240)
+    metadata = UnfurlMetadataField(blank=True, null=True, omit_html=omit_html)
+    fetched_at = models.DateTimeField(default=now)
+    failed_at = models.DateTimeField(blank=True, null=True)
+    error = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return self.url
+
+
+def unfurl_columns(value):
+    """
+    The narrow columns copied onto a row from unfurl metadata, given as an
+    UnfurlMetadata or as its stored JSON string.
+    """
+    if isinstance(value, str):
+        # Stored JSON carries the derived fields at the top level
+        try:
+            data = json.loads(value)
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            data = {}
+    elif value:
+        data = {
+            name: getattr(value, name, None) for name in ("feed", "image", "site_name")
+        }
+    else:
+        data = {}
+
+    site_name = data.get("site_name")
+    return {
+        "feed_url": data.get("feed"),
+        "image_url": data.get("image"),
+        "site_name": site_name[:255] if isinstance(site_name, str) else None,
+    }
+
+
+class UnfurledModel(models.Model):
+    """
+    Abstract base for rows carrying unfurl metadata. The metadata itself
+    lives in a shared UnfurlRecord matched on unique_hash, and only the
+    columns list pages display are stored on the row.
+    """
+
+    image_url = models.URLField(
+        blank=True, null=True, max_length=10240, verbose_name="Image URL"
+    )
+    site_name = models.CharField(max_length=255, blank=True, null=True)
+    unfurl_record = models.ForeignObject(
+        UnfurlRecord,
+        on_delete=models.DO_NOTHING,
+        from_fields=["unique_hash"],
+        to_fields=["url_hash"],
+        null=True,
+        related_name="+",
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def unfurl_metadata(self):
+        """Metadata assigned since the last save, else the shared record's."""
+        if "_unfurl_metadata" in self.__dict__:
+            return self._unfurl_metadata
+        if not self.unique_hash:
+            return None
+        try:
+            record = self.unfurl_record
+        except UnfurlRecord.DoesNotExist:
+            # Remember the miss so later reads do not query again
+            type(self).unfurl_record.field.set_cached_value(self, None)
+            return None
+        return record.metadata if record is not None else None
+
+    @unfurl_metadata.setter
+    def unfurl_metadata(self, value):
+        self._unfurl_metadata = value
+        columns = unfurl_columns(value)
+        self.image_url = columns["image_url"]
+        self.site_name = columns["site_name"]
+        if columns["feed_url"] and not self.feed_url:
+            self.feed_url = columns["feed_url"]
+
+    def set_unfurl_record(self, record):
+        """Use an already stored record, filling the narrow columns from it."""
+        self.unfurl_metadata = record.metadata
+        del self.__dict__["_unfurl_metadata"]
+        self.unfurl_record = record
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        metadata = self.__dict__.pop("_unfurl_metadata", None)
+        if metadata:
+            # Clearing metadata on one row leaves the shared record in place
+            self.unfurl_record = UnfurlRecord.objects.db_manager(self._state.db).store(
+                self.unique_hash, self.url, metadata
+            )
@@ -0,0 +1,124 @@
+import datetime
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from pebbling_apps.common import metrics
+from .models import UnfurlRecord
+from .unfurl import UnfurlMetadata
+
+logger = logging.getLogger(__name__)
+
+# How long a successful unfurl is served as is
+UNFURL_CACHE_TTL = datetime.timedelta(
+    seconds=getattr(settings, "UNFURL_CACHE_TTL", 7 * 24 * 60 * 60)
+)
+# How much longer an expired unfurl is still served while it is refreshed
+UNFURL_CACHE_STALE_TTL = datetime.timedelta(
+    seconds=getattr(settings, "UNFURL_CACHE_STALE_TTL", 30 * 24 * 60 * 60)
+)
+# How long a failed unfurl is remembered before the URL is tried again
+UNFURL_CACHE_FAILURE_TTL = datetime.timedelta(
+    seconds=getattr(settings, "UNFURL_CACHE_FAILURE_TTL", 60 * 60)
+)
+
+# Counters recorded for each lookup, see pebbling_apps.common.metrics
+METRIC_HIT = "unfurl_cache.hit"
+METRIC_STALE = "unfurl_cache.stale"
+METRIC_NEGATIVE = "unfurl_cache.negative"
+METRIC_MISS = "unfurl_cache.miss"
+METRIC_FETCH_ERROR = "unfurl_cache.fetch_error"
+METRICS = [METRIC_HIT, METRIC_STALE, METRIC_NEGATIVE, METRIC_MISS, METRIC_FETCH_ERROR]
+
+# Each URL queues at most one background unfurl within this many seconds
+REFRESH_LOCK_TIMEOUT = 5 * 60
+
+
+class UnfurlFailed(Exception):
+    """The URL could not be unfurled, recently enough to not try again yet."""
+
+
+class UnfurlService:
+    """
+    Unfurl URLs through a cache shared across users, keyed by normalized
+    URL hash and stored in UnfurlRecord.
+    """
+
+    def url_hash(self, url: str) -> str:
+        from pebbling_apps.bookmarks.services import URLNormalizer
+
+        return URLNormalizer().generate_hash(url)
+
+    def get_metadata(self, url: str, fetch: bool = True) -> Optional[UnfurlMetadata]:
+        """Return metadata for url, see get_record()."""
+        record = self.get_record(url, fetch=fetch)
+        return record.metadata if record is not None else None
+
+    def get_record(self, url: str, fetch: bool = True) -> Optional[UnfurlRecord]:
+        """
+        Return the cached record for url. Fresh entries are returned as is,
+        stale ones are returned while a refresh is queued, and on a miss the
+        URL is unfurled now - or, when fetch is False, None is returned and
+        the unfurl is queued instead. Raises UnfurlFailed while a failure is
+        cached.
+        """
+        url_hash = self.url_hash(url)
+        record = UnfurlRecord.objects.filter(url_hash=url_hash).first()
+        current_time = now()
+
+        if record is not None:
+            failed_recently = (
+                record.failed_at is not None
+                and current_time - record.failed_at < UNFURL_CACHE_FAILURE_TTL
+            )
+            age = current_time - record.fetched_at
+
+            if record.metadata is not None and age < UNFURL_CACHE_TTL:
+                metrics.increment(METRIC_HIT)
+                return record
+
+            if record.metadata is not None and (
+                failed_recently or age < UNFURL_CACHE_TTL + UNFURL_CACHE_STALE_TTL
+            ):
+                # Serve what we have; a recent failure means the refresh
+                # would most likely fail again
+                metrics.increment(METRIC_STALE)
+                if not failed_recently:
+                    self.schedule_refresh(url, url_hash)
+                return record
+
+            if failed_recently:
+                metrics.increment(METRIC_NEGATIVE)
+                raise UnfurlFailed(record.error)
+
+        metrics.increment(METRIC_MISS)
+        if not fetch:
+            self.schedule_refresh(url, url_hash)
+            return None
+
+        record = self.refresh(url, url_hash)
+        if record.failed_at is not None:
+            raise UnfurlFailed(record.error)
+        return record
+
+    def refresh(self, url: str, url_hash: Optional[str] = None) -> UnfurlRecord:
+        """Unfurl url now and cache the result, whether it worked or not."""
+        url_hash = url_hash or self.url_hash(url)
+        metadata = UnfurlMetadata(url=url)
+        try:
+            metadata.unfurl()
+        except Exception as e:
+            logger.warning(f"Failed to unfurl {url}: {e}")
+            metrics.increment(METRIC_FETCH_ERROR)
+            return UnfurlRecord.objects.store_failure(url_hash, url, e)
+        return UnfurlRecord.objects.store(url_hash, url, metadata)
+
+    def schedule_refresh(self, url: str, url_hash: str) -> None:
+        """Queue a background unfurl, unless one was queued recently."""
+        from .tasks import refresh_unfurl_metadata
+
+        if cache.add(f"unfurl:refresh:{url_hash}", 1, timeout=REFRESH_LOCK_TIMEOUT):
+            refresh_unfurl_metadata.apply_async(args=[url], priority=9)
@@ -0,0 +1,8 @@
+from celery import shared_task
+from .services import UnfurlService
+
+
+@shared_task(name="refresh_unfurl_metadata")
+def refresh_unfurl_metadata(url: str):
+    """Celery task to refresh the cached unfurl metadata for a URL."""
+    UnfurlService().refresh(url)
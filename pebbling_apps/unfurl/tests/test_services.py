@@ -0,0 +1,181 @@
+import datetime
+import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from pebbling_apps.bookmarks.models import Bookmark
+from pebbling_apps.bookmarks.services import BookmarksService
+from pebbling_apps.common import metrics
+from ..models import UnfurlRecord
+from ..services import (
+    METRIC_HIT,
+    METRIC_MISS,
+    METRIC_NEGATIVE,
+    METRIC_STALE,
+    METRICS,
+    UNFURL_CACHE_FAILURE_TTL,
+    UNFURL_CACHE_TTL,
+    UnfurlFailed,
+    UnfurlService,
+)
+from ..unfurl import UnfurlMetadata
+
+User = get_user_model()
+
+URL = "https://example.com/article"
+
+
+def fake_unfurl(metadata):
+    metadata.feeds = ["https://example.com/feed"]
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class UnfurlServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = UnfurlService()
+
+    def age_record(self, **kwargs):
+        UnfurlRecord.objects.filter(url_hash=self.service.url_hash(URL)).update(
+            **kwargs
+        )
+
+    @mock.patch.object(UnfurlMetadata, "unfurl", autospec=True)
+    def test_miss_then_hit(self, mock_unfurl):
+        mock_unfurl.side_effect = fake_unfurl
+
+        first = self.service.get_metadata(URL)
+        second = self.service.get_metadata(URL + "?utm_source=newsletter")
+
+        self.assertEqual(mock_unfurl.call_count, 1)
+        self.assertEqual(first.feed, "https://example.com/feed")
+        self.assertEqual(second.feed, "https://example.com/feed")
+        counts = metrics.get_counts(METRICS)
+        self.assertEqual(counts[METRIC_MISS], 1)
+        self.assertEqual(counts[METRIC_HIT], 1)
+
+    @mock.patch("pebbling_apps.unfurl.tasks.refresh_unfurl_metadata.apply_async")
+    @mock.patch.object(UnfurlMetadata, "unfurl", autospec=True)
+    def test_stale_entry_is_served_while_refresh_is_queued(
+        self, mock_unfurl, mock_refresh
+    ):
+        mock_unfurl.side_effect = fake_unfurl
+        self.service.get_metadata(URL)
+        self.age_record(fetched_at=timezone.now() - UNFURL_CACHE_TTL * 2)
+
+        for _ in range(2):
+            metadata = self.service.get_metadata(URL)
+            self.assertEqual(metadata.feed, "https://example.com/feed")
+
+        self.assertEqual(mock_unfurl.call_count, 1)
+        mock_refresh.assert_called_once_with(args=[URL], priority=9)
+        self.assertEqual(metrics.get_counts(METRICS)[METRIC_STALE], 2)
+
+    @mock.patch.object(UnfurlMetadata, "unfurl", autospec=True)
+    def test_failures_are_cached(self, mock_unfurl):
+        mock_unfurl.side_effect = ConnectionError("connection refused")
+
+        for _ in range(2):
+            with self.assertRaises(UnfurlFailed):
+                self.service.get_metadata(URL)
+        self.assertEqual(mock_unfurl.call_count, 1)
+        self.assertEqual(metrics.get_counts(METRICS)[METRIC_NEGATIVE], 1)
+
+        # Once the failure expires the URL is tried again
+        self.age_record(failed_at=timezone.now() - UNFURL_CACHE_FAILURE_TTL * 2)
+        mock_unfurl.side_effect = fake_unfurl
+        metadata = self.service.get_metadata(URL)
+        self.assertEqual(metadata.feed, "https://example.com/feed")
+        self.assertEqual(mock_unfurl.call_count, 2)
+
+    @mock.patch.object(UnfurlMetadata, "unfurl", autospec=True)
+    def test_failed_refresh_keeps_previous_metadata(self, mock_unfurl):
+        mock_unfurl.side_effect = fake_unfurl
+        self.service.get_metadata(URL)
+
+        mock_unfurl.side_effect = ConnectionError("connection refused")
+        record = self.service.refresh(URL)
+
+        self.assertEqual(record.error, "connection refused")
+        self.assertEqual(record.metadata.feed, "https://example.com/feed")
+        self.assertEqual(self.service.get_metadata(URL).feed, record.metadata.feed)
+
+    @mock.patch.object(UnfurlMetadata, "unfurl", autospec=True)
+    def test_bookmark_unfurls_share_one_fetch(self, mock_unfurl):
+        mock_unfurl.side_effect = fake_unfurl
+        bookmarks = [
+            Bookmark.objects.create(
+                url=URL,
+                title="Article",
+                owner=User.objects.create_user(
+                    username=f"user{i}", email=f"user{i}@example.com", password="x"
+                ),
+            )
+            for i in range(3)
+        ]
+
+        for bookmark in bookmarks:
+            BookmarksService().unfurl_bookmark_metadata(bookmark.id)
+
+        self.assertEqual(mock_unfurl.call_count, 1)
+        self.assertEqual(UnfurlRecord.objects.count(), 1)
+        for bookmark in Bookmark.objects.all():
+            self.assertEqual(bookmark.feed_url, "https://example.com/feed")
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+@mock.patch.object(UnfurlMetadata, "unfurl", autospec=True)
+@mock.patch("pebbling_apps.unfurl.tasks.refresh_unfurl_metadata.apply_async")
+class BookmarkFormUnfurlTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username="testuser", password="12345")
+        self.client.login(username="testuser", password="12345")
+
+    def test_form_does_not_wait_for_unfurl(self, mock_refresh, mock_unfurl):
+        response = self.client.get(reverse("bookmarks:add"), {"url": URL})
+
+        self.assertContains(response, "unfurl-pending")
+        mock_unfurl.assert_not_called()
+        mock_refresh.assert_called_once_with(args=[URL], priority=9)
+
+    def test_form_uses_cached_metadata(self, mock_refresh, mock_unfurl):
+        mock_unfurl.side_effect = fake_unfurl
+        UnfurlService().refresh(URL)
+
+        response = self.client.get(reverse("bookmarks:add"), {"url": URL})
+
+        self.assertNotContains(response, "unfurl-pending")
+        self.assertContains(response, "https://example.com/feed")
+        mock_refresh.assert_not_called()
+
+    def test_api_answers_pending_until_unfurled(self, mock_refresh, mock_unfurl):
+        mock_unfurl.side_effect = fake_unfurl
+        url = reverse("bookmarks:unfurl")
+
+        response = self.client.get(url, {"href": URL, "cached": "1"})
+        self.assertEqual(response.status_code, 202)
+        mock_unfurl.assert_not_called()
+
+        UnfurlService().refresh(URL)
+        response = self.client.get(url, {"href": URL, "cached": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["feed"], "https://example.com/feed")
+
+    @mock.patch("pebbling_apps.bookmarks.views.bookmarks.unfurl_bookmark_metadata")
+    def test_submit_before_unfurl_queues_it(self, mock_task, mock_refresh, mock_unfurl):
+        response = self.client.post(
+            reverse("bookmarks:add"),
+            {"url": URL, "title": "Article", "description": "", "tags": ""},
+        )
+
+        self.assertEqual(response.status_code, 302)
+        bookmark = Bookmark.objects.get()
+        mock_task.apply_async.assert_called_once_with(args=[bookmark.id], priority=9)
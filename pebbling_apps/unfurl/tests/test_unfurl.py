@@ -1,10 +1,22 @@
+import feedparser
+import json
 import os
 import mock
 from django.test import TestCase
 from django.core.exceptions import ValidationError
-import urllib.parse
 
-from ..unfurl import UnfurlMetadata
+from ..migration_helpers import _metadata_columns
+from ..unfurl import (
+    FETCH_CHUNK_SIZE,
+    FETCH_CONNECT_TIMEOUT,
+    FETCH_MAX_BYTES,
+    FETCH_READ_TIMEOUT,
+    FEED_PROBE_MAX_BYTES,
+    FEED_PROBE_MAX_CANDIDATES,
+    LazyUnfurlMetadata,
+    UnfurlMetadata,
+    probe_feed,
+)
 
 
 class UnfurlMetadataTests(TestCase):
@@ -37,9 +49,25 @@ class UnfurlMetadataTests(TestCase):
 
     @mock.patch("requests.get")
     def test_fetch(self, mock_get):
-        mock_get.return_value.content = self.test_html
+        mock_get.return_value.iter_content.return_value = [self.test_html.encode()]
         self.metadata.fetch()
-        self.assertEqual(self.metadata.html, self.test_html)
+        self.assertEqual(self.metadata.html, self.test_html.encode())
+        self.assertEqual(
+            mock_get.call_args.kwargs["timeout"],
+            (FETCH_CONNECT_TIMEOUT, FETCH_READ_TIMEOUT),
+        )
+        mock_get.return_value.close.assert_called_once()
+
+    @mock.patch("requests.get")
+    def test_fetch_stops_at_byte_cap(self, mock_get):
+        chunk = b"x" * FETCH_CHUNK_SIZE
+        chunks = iter([chunk] * (FETCH_MAX_BYTES // FETCH_CHUNK_SIZE + 10))
+        mock_get.return_value.iter_content.return_value = chunks
+
+        self.metadata.fetch()
+
+        self.assertEqual(len(self.metadata.html), FETCH_MAX_BYTES)
+        self.assertEqual(len(list(chunks)), 10)
 
     def test_title_extraction(self):
         self.metadata.parse()
@@ -57,9 +85,9 @@ class UnfurlMetadataTests(TestCase):
         self.metadata.parse()
         self.assertEqual(self.metadata.author, "OG Test Author")
 
-    @mock.patch("feedparser.parse")
-    def test_feed_detection(self, mock_feedparser):
-        mock_feedparser.return_value.entries = [{"title": "Test Entry"}]
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_feed_detection(self, mock_probe):
+        mock_probe.return_value = True
         self.metadata.parse()
         self.assertTrue(len(self.metadata.feeds) > 0)
         self.assertTrue(any("/rss.xml" in feed for feed in self.metadata.feeds))
@@ -85,9 +113,9 @@ class UnfurlMetadataTests(TestCase):
         )
         self.assertEqual(str(self.metadata), expected_str)
 
-    @mock.patch("feedparser.parse")
-    def test_feed_parsing(self, mock_feedparser):
-        mock_feedparser.return_value.entries = [{"title": "Test Entry"}]
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_feed_parsing(self, mock_probe):
+        mock_probe.return_value = True
         self.metadata.parse()
         self.assertTrue(len(self.metadata.feeds) > 0)
 
@@ -97,10 +125,9 @@ class TestFindFeed(TestCase):
 
     def setUp(self):
         self.base_url = "https://example.com/blog/"
-        self.parsed_url = urllib.parse.urlparse(self.base_url)
 
-    @mock.patch("feedparser.parse")
-    def test_findfeed_with_link_tags(self, mock_feedparser):
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_with_link_tags(self, mock_probe):
         """Test finding feeds from <link> tags with various types"""
         html = """
         <html>
@@ -115,20 +142,15 @@ class TestFindFeed(TestCase):
         </html>
         """
 
-        # Setup feedparser mock to return entries for valid feeds
-        def mock_parse(url):
-            result = mock.Mock()
-            if url.endswith(".xml"):
-                result.entries = [{"title": f"Entry for {url}"}]
-            else:
-                result.entries = []
-            return result
+        # Only the .xml candidates are feeds
+        def is_feed(url):
+            return url.endswith(".xml")
 
-        mock_feedparser.side_effect = mock_parse
+        mock_probe.side_effect = is_feed
 
         metadata = UnfurlMetadata(url=self.base_url)
         metadata.html = html
-        feeds = metadata._findfeed(self.parsed_url)
+        feeds = metadata._findfeed()
 
         # Should find 3 feeds (RSS, Atom, and All feeds)
         self.assertEqual(len(feeds), 3)
@@ -136,8 +158,8 @@ class TestFindFeed(TestCase):
         self.assertIn("https://example.com/atom.xml", feeds)
         self.assertIn("https://example.com/feeds/all.xml", feeds)
 
-    @mock.patch("feedparser.parse")
-    def test_findfeed_with_anchor_tags(self, mock_feedparser):
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_with_anchor_tags(self, mock_probe):
         """Test finding feeds from <a> tags with feed-related keywords"""
         html = """
         <html>
@@ -152,28 +174,23 @@ class TestFindFeed(TestCase):
         </html>
         """
 
-        # Mock feedparser to return entries for XML files
-        def mock_parse(url):
-            result = mock.Mock()
-            if "rss" in url or "feed" in url or url.endswith(".xml"):
-                result.entries = [{"title": f"Entry for {url}"}]
-            else:
-                result.entries = []
-            return result
+        # Only candidates that look like feeds are feeds
+        def is_feed(url):
+            return "rss" in url or "feed" in url or url.endswith(".xml")
 
-        mock_feedparser.side_effect = mock_parse
+        mock_probe.side_effect = is_feed
 
         metadata = UnfurlMetadata(url=self.base_url)
         metadata.html = html
-        feeds = metadata._findfeed(self.parsed_url)
+        feeds = metadata._findfeed()
 
         # Should find feeds with keywords
         self.assertGreater(len(feeds), 0)
         # Check that relative URLs are properly joined
         self.assertTrue(any("https://example.com/" in feed for feed in feeds))
 
-    @mock.patch("feedparser.parse")
-    def test_findfeed_no_feeds(self, mock_feedparser):
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_no_feeds(self, mock_probe):
         """Test when no feeds are found"""
         html = """
         <html>
@@ -187,16 +204,16 @@ class TestFindFeed(TestCase):
         </html>
         """
 
-        mock_feedparser.return_value.entries = []
+        mock_probe.return_value = False
 
         metadata = UnfurlMetadata(url=self.base_url)
         metadata.html = html
-        feeds = metadata._findfeed(self.parsed_url)
+        feeds = metadata._findfeed()
 
         self.assertEqual(len(feeds), 0)
 
-    @mock.patch("feedparser.parse")
-    def test_findfeed_duplicate_removal(self, mock_feedparser):
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_duplicate_removal(self, mock_probe):
         """Test that duplicate feed URLs are removed"""
         html = """
         <html>
@@ -211,21 +228,20 @@ class TestFindFeed(TestCase):
         </html>
         """
 
-        mock_feedparser.return_value.entries = [{"title": "Test Entry"}]
+        mock_probe.return_value = True
 
         metadata = UnfurlMetadata(url=self.base_url)
         metadata.html = html
-        feeds = metadata._findfeed(self.parsed_url)
+        feeds = metadata._findfeed()
 
         # Should only have one feed URL despite multiple references
         self.assertEqual(len(feeds), 1)
         self.assertEqual(feeds[0], "https://example.com/feed.xml")
 
-    @mock.patch("feedparser.parse")
-    def test_findfeed_with_port(self, mock_feedparser):
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_with_port(self, mock_probe):
         """Test URL handling when base URL has a port"""
         base_url_with_port = "https://example.com:8080/blog/"
-        parsed_url_with_port = urllib.parse.urlparse(base_url_with_port)
 
         html = """
         <html>
@@ -235,17 +251,17 @@ class TestFindFeed(TestCase):
         </html>
         """
 
-        mock_feedparser.return_value.entries = [{"title": "Test Entry"}]
+        mock_probe.return_value = True
 
         metadata = UnfurlMetadata(url=base_url_with_port)
         metadata.html = html
-        feeds = metadata._findfeed(parsed_url_with_port)
+        feeds = metadata._findfeed()
 
         self.assertEqual(len(feeds), 1)
         self.assertEqual(feeds[0], "https://example.com:8080/feed.xml")
 
-    @mock.patch("feedparser.parse")
-    def test_findfeed_parse_errors(self, mock_feedparser):
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_parse_errors(self, mock_probe):
         """Test that parse errors are handled gracefully"""
         html = """
         <html>
@@ -256,25 +272,23 @@ class TestFindFeed(TestCase):
         </html>
         """
 
-        def mock_parse(url):
+        def is_feed(url):
             if "bad-feed" in url:
                 raise Exception("Parse error")
-            result = mock.Mock()
-            result.entries = [{"title": "Good Entry"}]
-            return result
+            return True
 
-        mock_feedparser.side_effect = mock_parse
+        mock_probe.side_effect = is_feed
 
         metadata = UnfurlMetadata(url=self.base_url)
         metadata.html = html
-        feeds = metadata._findfeed(self.parsed_url)
+        feeds = metadata._findfeed()
 
         # Should only return the good feed
         self.assertEqual(len(feeds), 1)
         self.assertIn("good-feed.xml", feeds[0])
 
-    @mock.patch("feedparser.parse")
-    def test_findfeed_empty_entries(self, mock_feedparser):
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_empty_entries(self, mock_probe):
         """Test that feeds with no entries are excluded"""
         html = """
         <html>
@@ -285,26 +299,21 @@ class TestFindFeed(TestCase):
         </html>
         """
 
-        def mock_parse(url):
-            result = mock.Mock()
-            if "empty-feed" in url:
-                result.entries = []
-            else:
-                result.entries = [{"title": "Entry"}]
-            return result
+        def is_feed(url):
+            return "empty-feed" not in url
 
-        mock_feedparser.side_effect = mock_parse
+        mock_probe.side_effect = is_feed
 
         metadata = UnfurlMetadata(url=self.base_url)
         metadata.html = html
-        feeds = metadata._findfeed(self.parsed_url)
+        feeds = metadata._findfeed()
 
         # Should only return the feed with entries
         self.assertEqual(len(feeds), 1)
         self.assertIn("full-feed.xml", feeds[0])
 
-    @mock.patch("feedparser.parse")
-    def test_findfeed_relative_url_bug(self, mock_feedparser):
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_relative_url_bug(self, mock_probe):
         """Test the bug where relative URLs from <a> tags were incorrectly joined"""
         # This test specifically tests the bug that was fixed where
         # base + href was concatenated instead of properly joined
@@ -319,12 +328,12 @@ class TestFindFeed(TestCase):
         </html>
         """
 
-        mock_feedparser.return_value.entries = [{"title": "Test Entry"}]
+        mock_probe.return_value = True
 
         # Test with a path that ends with /
         metadata = UnfurlMetadata(url="https://example.com/blog/")
         metadata.html = html
-        feeds = metadata._findfeed(urllib.parse.urlparse(metadata.url))
+        feeds = metadata._findfeed()
 
         # All URLs should be properly resolved relative to the base URL
         expected_feeds = [
@@ -344,7 +353,176 @@ class TestFindFeed(TestCase):
         # Also test with a path that doesn't end with /
         metadata2 = UnfurlMetadata(url="https://example.com/blog")
         metadata2.html = html
-        feeds2 = metadata2._findfeed(urllib.parse.urlparse(metadata2.url))
+        feeds2 = metadata2._findfeed()
 
         # Should still work correctly
         self.assertIn("https://example.com/feeds/main.xml", feeds2)
+
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_skips_guesses_once_advertised_feed_validates(self, mock_probe):
+        html = """
+        <html>
+        <head>
+            <link rel="alternate" type="application/rss+xml" href="/feed.xml">
+        </head>
+        <body>
+            <a href="/rss">RSS</a>
+            <a href="/comments/feed">Comments</a>
+        </body>
+        </html>
+        """
+        mock_probe.return_value = True
+
+        metadata = UnfurlMetadata(url=self.base_url)
+        metadata.html = html
+        feeds = metadata._findfeed()
+
+        self.assertEqual(feeds, ["https://example.com/feed.xml"])
+        mock_probe.assert_called_once_with("https://example.com/feed.xml")
+
+    @mock.patch("pebbling_apps.unfurl.unfurl.probe_feed")
+    def test_findfeed_ranks_and_caps_guesses(self, mock_probe):
+        links = "".join(
+            f'<a href="/page/{i}?ref=feedback">Page {i}</a>' for i in range(20)
+        )
+        html = f"""
+        <html>
+        <body>
+            {links}
+            <a href="/comments/feed">Comments</a>
+            <a href="/rss.xml">RSS</a>
+        </body>
+        </html>
+        """
+        mock_probe.return_value = False
+
+        metadata = UnfurlMetadata(url=self.base_url)
+        metadata.html = html
+        metadata._findfeed()
+
+        probed = [call.args[0] for call in mock_probe.call_args_list]
+        self.assertEqual(len(probed), FEED_PROBE_MAX_CANDIDATES)
+        self.assertIn("https://example.com/rss.xml", probed)
+        self.assertIn("https://example.com/comments/feed", probed)
+
+
+class ProbeFeedTests(TestCase):
+    def mock_response(self, content_type, body=b""):
+        response = mock.Mock(status_code=200, headers={"content-type": content_type})
+        response.iter_content.return_value = [body]
+        return response
+
+    @mock.patch("requests.get")
+    def test_html_is_rejected_without_reading_body(self, mock_get):
+        response = self.mock_response("text/html; charset=utf-8")
+        mock_get.return_value = response
+
+        self.assertFalse(probe_feed("https://example.com/feed"))
+        response.iter_content.assert_not_called()
+        response.close.assert_called_once()
+
+    @mock.patch("requests.get")
+    def test_feed_is_parsed_from_a_partial_read(self, mock_get):
+        item = b"<item><title>Entry</title><link>https://example.com/1</link></item>"
+        body = b'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>'
+        body += item * (FEED_PROBE_MAX_BYTES // len(item) + 1)
+        mock_get.return_value = self.mock_response("application/rss+xml", body)
+
+        with mock.patch("feedparser.parse", wraps=feedparser.parse) as mock_parse:
+            self.assertTrue(probe_feed("https://example.com/feed"))
+        self.assertEqual(len(mock_parse.call_args.args[0]), FEED_PROBE_MAX_BYTES)
+
+
+class LazyUnfurlMetadataTests(TestCase):
+    def setUp(self):
+        self.metadata = UnfurlMetadata(
+            url="https://example.com/post",
+            metadata={
+                "opengraph": [
+                    {
+                        "properties": [
+                            ["og:title", "OG Test Title"],
+                            ["og:description", "OG Test Description"],
+                            ["og:image", "/image.jpg"],
+                        ]
+                    }
+                ]
+            },
+            feeds=["https://example.com/comments.xml", "https://example.com/rss.xml"],
+            html="<html></html>",
+        )
+
+    def test_header_fields_do_not_decode_metadata(self):
+        lazy = LazyUnfurlMetadata(self.metadata.to_json())
+
+        with mock.patch("json.loads") as mock_loads:
+            self.assertEqual(lazy.title, "OG Test Title")
+            self.assertEqual(lazy.description, "OG Test Description")
+            self.assertEqual(lazy.image, "https://example.com/image.jpg")
+            self.assertEqual(lazy.feed, "https://example.com/rss.xml")
+            self.assertEqual(lazy.url, "https://example.com/post")
+        mock_loads.assert_not_called()
+        self.assertFalse(lazy.is_loaded)
+
+    def test_other_fields_decode_on_access(self):
+        lazy = LazyUnfurlMetadata(self.metadata.to_json(), omit_html=True)
+
+        self.assertEqual(lazy.feeds, self.metadata.feeds)
+        self.assertTrue(lazy.is_loaded)
+        self.assertEqual(lazy.metadata, self.metadata.metadata)
+        self.assertEqual(lazy.html, "")
+
+    def test_values_without_header_are_decoded_eagerly(self):
+        legacy = json.dumps(self.metadata.to_dict())
+        lazy = LazyUnfurlMetadata(legacy)
+
+        self.assertTrue(lazy.is_loaded)
+        self.assertEqual(lazy.title, "OG Test Title")
+        self.assertEqual(lazy.feed, "https://example.com/rss.xml")
+
+    def test_unchanged_value_round_trips_without_reencoding(self):
+        stored = self.metadata.to_json()
+        self.assertEqual(LazyUnfurlMetadata(stored).to_json(), stored)
+
+    def test_assignment_invalidates_memoized_properties(self):
+        lazy = LazyUnfurlMetadata(self.metadata.to_json())
+        self.assertEqual(lazy.feed, "https://example.com/rss.xml")
+
+        lazy.feeds = ["https://example.com/atom.xml"]
+
+        self.assertEqual(lazy.feed, "https://example.com/atom.xml")
+        self.assertIn("atom.xml", lazy.to_json())
+        self.assertEqual(lazy.metadata, self.metadata.metadata)
+
+    def test_derived_properties_are_memoized(self):
+        with mock.patch.object(
+            UnfurlMetadata, "_extract_metadata", return_value="Title"
+        ) as mock_extract:
+            self.metadata.title
+            self.metadata.title
+        self.assertEqual(mock_extract.call_count, 1)
+
+
+class MigrationMetadataColumnsTests(TestCase):
+    def test_columns_match_the_metadata_they_were_read_from(self):
+        metadata = UnfurlMetadata(
+            url="https://example.com/post",
+            metadata={
+                "opengraph": [
+                    {
+                        "properties": [
+                            ("og:image", "/cover.png"),
+                            ("og:site_name", "Example"),
+                        ]
+                    }
+                ]
+            },
+            feeds=["https://example.com/comments/feed", "https://example.com/feed"],
+        )
+        expected = (metadata.image, metadata.site_name, metadata.feed)
+
+        self.assertEqual(_metadata_columns(metadata.to_json()), expected)
+        # Documents stored before the header and site_name existed
+        legacy = metadata.to_dict()
+        del legacy["site_name"]
+        self.assertEqual(_metadata_columns(json.dumps(legacy)), expected)
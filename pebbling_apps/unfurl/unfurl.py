@@ -3,11 +3,133 @@ import feedparser
 import urllib.parse
 import requests
 import extruct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 from django.core.validators import URLValidator
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Union
 import json
 
+# Fields written to a small header at the front of the stored JSON, so that
+# list pages can read them without decoding the full extruct metadata
+HEADER_FIELDS = ("url", "feed", "title", "description", "image", "site_name")
+
+# Properties derived from the source fields below and memoized per instance
+DERIVED_PROPERTIES = (
+    "feed",
+    "title",
+    "description",
+    "image",
+    "site_name",
+    "author",
+    "categories",
+)
+SOURCE_FIELDS = ("url", "metadata", "feeds")
+
+# Hard limits on fetching a page, so that a slow or huge page cannot tie up
+# a worker: seconds to connect, seconds between bytes read, seconds for the
+# whole body, and bytes of HTML kept (metadata lives near the top)
+FETCH_CONNECT_TIMEOUT = getattr(settings, "UNFURL_CONNECT_TIMEOUT", 5)
+FETCH_READ_TIMEOUT = getattr(settings, "UNFURL_READ_TIMEOUT", 10)
+FETCH_TOTAL_TIMEOUT = getattr(settings, "UNFURL_TOTAL_TIMEOUT", 20)
+FETCH_MAX_BYTES = getattr(settings, "UNFURL_MAX_BYTES", 2 * 1024 * 1024)
+FETCH_CHUNK_SIZE = 64 * 1024
+
+# Limits on feed discovery: candidate URLs probed per page, probes in
+# flight at once, seconds per probe, and bytes of each candidate read -
+# enough for feedparser to find the first entries
+FEED_PROBE_MAX_CANDIDATES = getattr(settings, "UNFURL_FEED_PROBE_MAX", 8)
+FEED_PROBE_WORKERS = getattr(settings, "UNFURL_FEED_PROBE_WORKERS", 4)
+FEED_PROBE_TIMEOUT = getattr(settings, "UNFURL_FEED_PROBE_TIMEOUT", 5)
+FEED_PROBE_MAX_BYTES = getattr(settings, "UNFURL_FEED_PROBE_MAX_BYTES", 256 * 1024)
+
+# Content types that are never a feed, so the body need not be read
+NON_FEED_CONTENT_TYPES = ("text/html", "image/", "audio/", "video/", "font/")
+# Extensions and path segments that make an <a> href look like a feed
+FEED_PATH_SUFFIXES = (".xml", ".rss", ".atom", "/feed", "/rss", "/atom")
+
+HEADER_PREFIX = '{"header": '
+
+_json_decoder = json.JSONDecoder()
+
+
+def decode_header(json_str: str) -> Union[dict, None]:
+    """
+    Decode just the header object at the front of a stored JSON string,
+    stopping before the rest of the document. Returns None for values
+    written before the header existed.
+    """
+    if not json_str.startswith(HEADER_PREFIX):
+        return None
+    try:
+        header, _ = _json_decoder.raw_decode(json_str, len(HEADER_PREFIX))
+    except ValueError:
+        return None
+    return header if isinstance(header, dict) else None
+
+
+def probe_feed(url: str) -> bool:
+    """
+    Check whether url serves a feed with entries. The content type is
+    checked before any of the body is read, and at most
+    FEED_PROBE_MAX_BYTES of the body are handed to feedparser.
+    """
+    try:
+        response = requests.get(url, timeout=FEED_PROBE_TIMEOUT, stream=True)
+    except requests.RequestException:
+        return False
+    try:
+        content_type = response.headers.get("content-type", "").lower()
+        if response.status_code >= 400 or content_type.startswith(
+            NON_FEED_CONTENT_TYPES
+        ):
+            return False
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= FEED_PROBE_MAX_BYTES:
+                break
+    except requests.RequestException:
+        return False
+    finally:
+        response.close()
+
+    parsed = feedparser.parse(
+        b"".join(chunks)[:FEED_PROBE_MAX_BYTES],
+        response_headers={"content-location": url, "content-type": content_type},
+    )
+    return len(parsed.entries) > 0
+
+
+def _probe_feeds(urls: list) -> list:
+    """Probe urls concurrently, returning those that are feeds in order."""
+    if not urls:
+        return []
+
+    def probe(url):
+        try:
+            return probe_feed(url)
+        except Exception:
+            return False  # Silently ignore parse errors
+
+    with ThreadPoolExecutor(max_workers=FEED_PROBE_WORKERS) as executor:
+        found = list(executor.map(probe, urls))
+    return [url for url, is_feed in zip(urls, found) if is_feed]
+
+
+def _dedupe(urls: list) -> list:
+    return list(dict.fromkeys(urls))
+
+
+def _guessed_feed_rank(url: str) -> tuple:
+    """Sort key putting the most feed-like <a> hrefs first."""
+    path = urllib.parse.urlparse(url).path.lower().rstrip("/")
+    return (not path.endswith(FEED_PATH_SUFFIXES), "comment" in url)
+
 
 @dataclass
 class UnfurlMetadata:
@@ -16,6 +138,13 @@ class UnfurlMetadata:
     feeds: list[str] = field(default_factory=list)
     html: str = ""
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in SOURCE_FIELDS:
+            # Drop memoized properties derived from the old value
+            for prop in DERIVED_PROPERTIES:
+                self.__dict__.pop(prop, None)
+
     @classmethod
     def from_json(
         cls, json_str: str, omit_html: bool = False
@@ -42,14 +171,20 @@ class UnfurlMetadata:
             "title": self.title,
             "description": self.description,
             "image": self.image,
+            "site_name": self.site_name,
         }
         if not omit_html:
             data["html"] = self.html
         return data
 
+    def header(self) -> dict:
+        """The hot fields shown on list pages."""
+        return {name: getattr(self, name) for name in HEADER_FIELDS}
+
     def to_json(self, omit_html: bool = False) -> str:
         """Convert the UnfurlMetadata instance to a JSON string."""
-        return json.dumps(self.to_dict(omit_html=omit_html))
+        # The header must come first for decode_header() to find it
+        return json.dumps({"header": self.header(), **self.to_dict(omit_html)})
 
     def unfurl(self):
         """Fetch and parse the URL."""
@@ -61,18 +196,36 @@ class UnfurlMetadata:
         url_validator = URLValidator()
         url_validator(self.url)
 
-        response = requests.get(self.url)
-        response.encoding = response.apparent_encoding  # Ensure correct encoding
-        self.html = response.content  # Use bytes content instead of text
+        response = requests.get(
+            self.url,
+            timeout=(FETCH_CONNECT_TIMEOUT, FETCH_READ_TIMEOUT),
+            stream=True,
+        )
+        deadline = time.monotonic() + FETCH_TOTAL_TIMEOUT
+        chunks = []
+        size = 0
+        try:
+            for chunk in response.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= FETCH_MAX_BYTES:
+                    break  # Parse the truncated page rather than fail
+                if time.monotonic() > deadline:
+                    raise requests.Timeout(
+                        f"Fetching {self.url} took over {FETCH_TOTAL_TIMEOUT}s"
+                    )
+        finally:
+            response.close()
+
+        # Keep bytes and let the parsers detect the encoding
+        self.html = b"".join(chunks)[:FETCH_MAX_BYTES]
 
     def parse(self):
         """Parse the fetched HTML to extract feeds and metadata."""
-        parsed_url = urllib.parse.urlparse(self.url)
-
-        self.feeds = self._findfeed(parsed_url)
+        self.feeds = self._findfeed()
         self.metadata = extruct.extract(self.html, base_url=self.url)
 
-    @property
+    @cached_property
     def feed(self):
         if len(self.feeds) > 0:
             # HACK: Sort feeds by whether they contain "comment" in the URL, so that we deprioritize comment feeds
@@ -80,7 +233,7 @@ class UnfurlMetadata:
             return sorted_feeds[0]
         return None
 
-    @property
+    @cached_property
     def title(self):
         return self._extract_first_metadata(
             [
@@ -92,7 +245,7 @@ class UnfurlMetadata:
             ]
         )
 
-    @property
+    @cached_property
     def description(self):
         return self._extract_first_metadata(
             [
@@ -104,7 +257,7 @@ class UnfurlMetadata:
             ]
         )
 
-    @property
+    @cached_property
     def image(self):
         image_url = self._extract_first_metadata(
             [
@@ -119,7 +272,16 @@ class UnfurlMetadata:
             return urllib.parse.urljoin(self.url, image_url)
         return None
 
-    @property
+    @cached_property
+    def site_name(self):
+        return self._extract_first_metadata(
+            [
+                ("opengraph", "og:site_name"),
+                ("rdfa", "http://ogp.me/ns#site_name"),
+            ]
+        )
+
+    @cached_property
     def author(self):
         return self._extract_first_metadata(
             [
@@ -131,7 +293,7 @@ class UnfurlMetadata:
             ]
         )
 
-    @property
+    @cached_property
     def categories(self):
         return self._extract_metadata("microdata", "category")
 
@@ -207,54 +369,39 @@ class UnfurlMetadata:
                     return properties[metadata_key]
 
     # https://alexmiller.phd/posts/python-3-feedfinder-rss-detection-from-url/
-    def _findfeed(self, parsed_url):
-        result = []
-        possible_feeds = []
+    def _findfeed(self):
+        """
+        Find feeds advertised by or linked from the page. Candidates are
+        ranked and capped, then probed concurrently. Feeds advertised with
+        <link rel="alternate"> are trusted most: once one of them validates,
+        the guesses made from <a> tags are not probed at all.
+        """
         html = bs4(self.html, features="lxml")
 
         # Look for <link> tags with alternate rel
-        feed_urls = html.findAll("link", rel="alternate")
-
-        if len(feed_urls) > 0:
-            for f in feed_urls:
-                t = f.get("type", None)
-                if t:
-                    if "rss" in t or "xml" in t:
-                        href = f.get("href", None)
-                        if href:
-                            # Handle relative URLs properly
-                            full_url = urllib.parse.urljoin(self.url, href)
-                            possible_feeds.append(full_url)
+        advertised = []
+        for f in html.findAll("link", rel="alternate"):
+            t = f.get("type", None)
+            href = f.get("href", None)
+            if t and href and ("rss" in t or "xml" in t):
+                # Handle relative URLs properly
+                advertised.append(urllib.parse.urljoin(self.url, href))
 
         # Look for <a> tags with feed-related keywords
-        base_url = f"{parsed_url.scheme}://{parsed_url.hostname}"
-        if parsed_url.port:
-            base_url += f":{parsed_url.port}"
+        guessed = []
+        for a in html.findAll("a"):
+            href = a.get("href", None)
+            if href and ("xml" in href or "rss" in href or "feed" in href):
+                guessed.append(urllib.parse.urljoin(self.url, href))
 
-        atags = html.findAll("a")
+        advertised = _dedupe(advertised)[:FEED_PROBE_MAX_CANDIDATES]
+        result = _probe_feeds(advertised)
+        if result:
+            return result
 
-        for a in atags:
-            href = a.get("href", None)
-            if href:
-                if "xml" in href or "rss" in href or "feed" in href:
-                    # Handle relative and absolute URLs properly
-                    full_url = urllib.parse.urljoin(self.url, href)
-                    possible_feeds.append(full_url)
-
-        # Remove duplicates
-        unique_feeds = list(set(possible_feeds))
-
-        # Test each possible feed URL
-        for url in unique_feeds:
-            try:
-                f = feedparser.parse(url)
-                if len(f.entries) > 0:
-                    if url not in result:
-                        result.append(url)
-            except Exception as e:
-                pass  # Silently ignore parse errors
-
-        return result
+        guessed = [url for url in _dedupe(guessed) if url not in advertised]
+        guessed.sort(key=_guessed_feed_rank)
+        return _probe_feeds(guessed[: FEED_PROBE_MAX_CANDIDATES - len(advertised)])
 
     def __str__(self):
         title = self.title or "No Title"
@@ -265,3 +412,58 @@ class UnfurlMetadata:
 
     def __repr__(self):
         return self.__str__()
+
+
+class LazyUnfurlMetadata(UnfurlMetadata):
+    """
+    UnfurlMetadata read from the database, which keeps the stored JSON
+    string and only decodes it when a field outside the header is touched.
+    """
+
+    def __init__(self, json_str: str, omit_html: bool = False):
+        self._json_str = json_str
+        self._omit_html = omit_html
+        header = decode_header(json_str)
+        if header is None:
+            self._load()
+        else:
+            # Seed the memoized properties straight from the header
+            self.__dict__.update(
+                {name: header[name] for name in HEADER_FIELDS if name in header}
+            )
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._json_str is None
+
+    def _load(self):
+        data = json.loads(self._json_str)
+        self.__dict__.update(
+            url=data["url"],
+            metadata=data.get("metadata", {}),
+            feeds=data.get("feeds", []),
+            html=data.get("html", "") if not self._omit_html else "",
+        )
+        self._json_str = None
+
+    def __setattr__(self, name, value):
+        # Decode first so an assigned field is not clobbered by a later load
+        # and the stored string is not written back stale
+        if name in SOURCE_FIELDS + ("html",) and not self.is_loaded:
+            self._load()
+        super().__setattr__(name, value)
+
+    def __getattr__(self, name):
+        # Only called for attributes missing from the instance, i.e. the
+        # dataclass fields that have not been decoded yet
+        if name.startswith("_") or self.__dict__.get("_json_str") is None:
+            raise AttributeError(name)
+        self._load()
+        return getattr(self, name)
+
+    def to_json(self, omit_html: bool = False) -> str:
+        # Unchanged values are written back as read, skipping a decode and
+        # re-encode, as long as html was handled the same way when read
+        if not self.is_loaded and omit_html == self._omit_html:
+            return self._json_str
+        return super().to_json(omit_html=omit_html)